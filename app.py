@@ -10,12 +10,17 @@ import numpy as np
 from datetime import datetime
 import os
 import json
+import hashlib
+import threading
+import copy
 
 # Importar módulos del sistema
 from backend.data_processor import DataProcessor
 from backend.clustering import ClusteringAnalyzer
 from backend.regression import RegressionPredictor
 from backend.alerts import AlertSystem
+from backend.dataset_cache import DatasetCache
+from backend.model_registry import ModelRegistry
 
 app = Flask(__name__, 
             static_folder='frontend',
@@ -23,15 +28,43 @@ app = Flask(__name__,
 CORS(app)
 
 # Inicializar componentes
-data_processor = DataProcessor()
-clustering_analyzer = ClusteringAnalyzer()
+data_processor = DataProcessor(compact=os.environ.get('SAEM_COMPACT_DATA') == '1')
+clustering_analyzer = ClusteringAnalyzer(
+    minibatch_threshold=int(os.environ.get(
+        'SAEM_MINIBATCH_THRESHOLD', ClusteringAnalyzer.MINIBATCH_THRESHOLD
+    )),
+    backend=os.environ.get('SAEM_KMEANS_BACKEND', 'sklearn')
+)
 regression_predictor = RegressionPredictor()
 alert_system = AlertSystem()
+dataset_cache = DatasetCache(
+    max_bytes=int(os.environ.get('SAEM_CACHE_MAX_MB', 512)) * 1024 * 1024,
+    format_version=data_processor.format_version()
+)
+model_registry = ModelRegistry(os.environ.get('SAEM_MODELS_DIR'))
 
 # Variables globales para almacenar estado
 current_data = None
 clustering_results = None
 regression_results = None
+current_dataset_hash = None
+optimal_k_job = {'estado': 'inactivo', 'completados': 0, 'total': 0, 'resultados': None}
+optimal_k_lock = threading.Lock()
+
+# Versión del registro de la que provienen los modelos en uso
+model_versions = {'clustering': None, 'regresion': None}
+
+# Tipos cuyo modelo en uso es el objeto compartido de la caché del registro
+shared_models = set()
+
+# Con gunicorn --preload las versiones activas se deserializan antes del
+# fork y los workers comparten esas páginas (copy-on-write)
+if os.environ.get('SAEM_PRELOAD_MODELS') == '1':
+    for tipo in ModelRegistry.TYPES:
+        model_registry.get_active(tipo)
+
+# Archivos más grandes que este umbral se procesan en modo streaming
+STREAMING_THRESHOLD_BYTES = 20 * 1024 * 1024
 
 # ========== RUTAS PRINCIPALES ==========
 
@@ -80,6 +113,84 @@ def serve_demo_assets(filename):
     except Exception as e:
         return jsonify({'error': f'Asset no encontrado: {filename}'}), 404
 
+# ========== REGISTRO DE MODELOS ==========
+
+def _install_model(version):
+    """Reemplaza el modelo en uso por una versión del registro"""
+    global clustering_analyzer, clustering_results, regression_predictor, regression_results
+    
+    meta = model_registry.get_meta(version)
+    if meta is None:
+        raise ValueError(f'Versión de modelo inexistente: {version}')
+    
+    # Se instala el objeto de la caché del registro sin copiarlo (con
+    # --preload lo comparten los workers); se copia recién cuando algo lo
+    # va a modificar (ver _writable_model)
+    payload = model_registry.load(version)
+    
+    if meta['tipo'] == 'clustering':
+        clustering_analyzer = payload['modelo']
+        clustering_results = dict(payload['resultados'])
+    else:
+        regression_predictor = payload['modelo']
+        regression_results = dict(payload['resultados'])
+    
+    shared_models.add(meta['tipo'])
+    model_versions[meta['tipo']] = version
+    return meta
+
+def _writable_model(tipo):
+    """
+    Modelo en uso listo para modificarse (reentrenar, aplicar un delta)
+    
+    Si es el objeto compartido de la caché del registro se reemplaza antes
+    por una copia propia, para no alterar la versión registrada.
+    """
+    global clustering_analyzer, regression_predictor
+    
+    if tipo in shared_models:
+        shared_models.discard(tipo)
+        if tipo == 'clustering':
+            clustering_analyzer = copy.deepcopy(clustering_analyzer)
+        else:
+            regression_predictor = copy.deepcopy(regression_predictor)
+    
+    return clustering_analyzer if tipo == 'clustering' else regression_predictor
+
+def _register_model(tipo, modelo, resultados, parametros, features, metricas):
+    """Guarda y activa el modelo recién entrenado (reemplaza la versión previa)"""
+    try:
+        version = model_registry.save(
+            tipo, {'modelo': modelo, 'resultados': resultados},
+            current_dataset_hash, parametros, features=features, metricas=metricas,
+            overwrite=True
+        )
+        model_registry.activate(version)
+    except OSError as e:
+        app.logger.warning('No se pudo guardar el modelo %s en el registro: %s', tipo, e)
+        version = None
+    
+    model_versions[tipo] = version
+    return version
+
+def _install_active_models(dataset_hash):
+    """
+    Carga diferida: al cargar un dataset se instalan las versiones activas
+    entrenadas sobre él, si todavía no hay modelos en uso
+    """
+    if clustering_results is not None:
+        return
+    
+    for tipo in ModelRegistry.TYPES:
+        version = model_registry.active_version(tipo)
+        meta = model_registry.get_meta(version) if version else None
+        if meta is None or meta['dataset_hash'] != dataset_hash:
+            continue
+        # La regresión solo vale con las etiquetas del clustering instalado
+        if tipo == 'regresion' and meta['parametros']['clustering'] != model_versions['clustering']:
+            continue
+        _install_model(version)
+
 # ========== API ENDPOINTS ==========
 
 @app.route('/api/upload', methods=['POST'])
@@ -105,9 +216,93 @@ def upload_file():
                 'error': 'Formato inválido. Solo se aceptan archivos CSV'
             }), 400
         
-        # Procesar archivo
-        global current_data
-        current_data, validation_result = data_processor.process_csv(file)
+        # Procesar archivo (por bloques si es muy grande)
+        chunksize = None
+        if request.content_length and request.content_length > STREAMING_THRESHOLD_BYTES:
+            chunksize = DataProcessor.DEFAULT_CHUNKSIZE
+        
+        global current_data, current_dataset_hash
+        
+        # Reutilizar el dataset validado si el mismo archivo ya fue cargado
+        # con el mismo esquema y reglas de procesamiento
+        digest = dataset_cache.file_key(file.stream)
+        cached = dataset_cache.get(digest)
+        
+        if cached is not None:
+            current_data = data_processor.set_data(cached)
+        else:
+            current_data, validation_result = data_processor.process_csv(file, chunksize=chunksize)
+            
+            if not validation_result['valid']:
+                return jsonify({
+                    'error': validation_result['error'],
+                    'details': validation_result.get('details', []),
+                    'filas_muestra': validation_result.get('filas_muestra', {})
+                }), 400
+            
+            dataset_cache.put(digest, current_data)
+        
+        current_dataset_hash = digest
+        _install_active_models(digest)
+        
+        return _upload_response(current_data)
+        
+    except Exception as e:
+        return jsonify({
+            'error': f'Error al procesar archivo: {str(e)}'
+        }), 500
+
+@app.route('/api/upload/eventos', methods=['POST'])
+def upload_event_log():
+    """
+    Endpoint para cargar el log crudo de eventos de Moodle
+    (logstore_standard_log) y agregarlo por estudiante
+    
+    Archivos:
+    - file: log de eventos en CSV
+    - calificaciones (opcional): CSV con columnas userid, calificacion_final
+    - fechas_limite (opcional): CSV con columnas contextinstanceid, timestamp
+      (fecha límite unix de cada tarea, para contar entregas tarde)
+    """
+    try:
+        if 'file' not in request.files:
+            return jsonify({
+                'error': 'No se seleccionó ningún archivo'
+            }), 400
+        
+        file = request.files['file']
+        
+        if not file.filename.endswith('.csv'):
+            return jsonify({
+                'error': 'Formato inválido. Solo se aceptan archivos CSV'
+            }), 400
+        
+        calificaciones = None
+        if 'calificaciones' in request.files:
+            grades = pd.read_csv(request.files['calificaciones'], encoding='utf-8')
+            faltantes = {'userid', 'calificacion_final'} - set(grades.columns)
+            if faltantes:
+                return jsonify({
+                    'error': 'Columnas faltantes en el archivo de calificaciones',
+                    'details': sorted(faltantes)
+                }), 400
+            calificaciones = grades.set_index('userid')['calificacion_final']
+        
+        fechas_limite = None
+        if 'fechas_limite' in request.files:
+            deadlines = pd.read_csv(request.files['fechas_limite'], encoding='utf-8')
+            faltantes = {'contextinstanceid', 'timestamp'} - set(deadlines.columns)
+            if faltantes:
+                return jsonify({
+                    'error': 'Columnas faltantes en el archivo de fechas límite',
+                    'details': sorted(faltantes)
+                }), 400
+            fechas_limite = dict(zip(deadlines['contextinstanceid'], deadlines['timestamp']))
+        
+        global current_data, current_dataset_hash
+        current_data, validation_result = data_processor.process_event_log(
+            file, calificaciones=calificaciones, fechas_limite=fechas_limite
+        )
         
         if not validation_result['valid']:
             return jsonify({
@@ -115,33 +310,180 @@ def upload_file():
                 'details': validation_result.get('details', [])
             }), 400
         
-        # Validar cantidad mínima de registros
-        if len(current_data) < 50:
+        current_dataset_hash = DatasetCache.hash_dataframe(current_data)
+        _install_active_models(current_dataset_hash)
+        
+        return _upload_response(
+            current_data, {'sin_calificacion': validation_result['sin_calificacion']}
+        )
+        
+    except Exception as e:
+        return jsonify({
+            'error': f'Error al procesar log de eventos: {str(e)}'
+        }), 500
+
+@app.route('/api/upload/delta', methods=['POST'])
+def upload_delta():
+    """
+    Endpoint para carga incremental (upsert por estudiante_id)
+    
+    Fusiona una exportación parcial con los datos ya cargados y reasigna
+    clusters solo a los estudiantes insertados o modificados.
+    """
+    try:
+        global current_data, current_dataset_hash, clustering_results
+        
+        if current_data is None:
             return jsonify({
-                'error': 'Datos insuficientes',
-                'registros': len(current_data),
-                'minimo': 50,
-                'message': 'El archivo debe contener al menos 50 registros de actividad'
+                'error': 'No hay datos cargados. Por favor, cargue un archivo CSV primero'
             }), 400
         
+        if 'file' not in request.files:
+            return jsonify({
+                'error': 'No se seleccionó ningún archivo'
+            }), 400
+        
+        file = request.files['file']
+        
+        if not file.filename.endswith('.csv'):
+            return jsonify({
+                'error': 'Formato inválido. Solo se aceptan archivos CSV'
+            }), 400
+        
+        delta_hash = DatasetCache.hash_file(file.stream)
+        merged, validation_result = data_processor.process_delta_csv(file)
+        
+        if not validation_result['valid']:
+            return jsonify({
+                'error': validation_result['error'],
+                'details': validation_result.get('details', []),
+                'filas_muestra': validation_result.get('filas_muestra', {})
+            }), 400
+        
+        current_data = merged
+        cambios = validation_result['cambios']
+        
+        # El dataset resultante se identifica por el hash previo + el delta
+        current_dataset_hash = hashlib.sha256(
+            f'{current_dataset_hash}:{delta_hash}'.encode('utf-8')
+        ).hexdigest()
+        
+        # Recalcular solo los estudiantes afectados
+        regresion_actualizada = False
+        if clustering_results is not None:
+            regresion_actualizada = _apply_delta_to_models(cambios)
+        
         return jsonify({
             'success': True,
-            'message': f'{len(current_data)} registros cargados exitosamente',
+            'message': validation_result['message'],
             'registros': len(current_data),
-            'columnas': list(current_data.columns),
-            'preview': current_data.head(5).to_dict('records'),
-            'estadisticas': {
-                'total_estudiantes': current_data['estudiante_id'].nunique(),
-                'promedio_actividades': float(current_data['actividades_completadas'].mean()),
-                'promedio_tiempo': float(current_data['tiempo_plataforma_horas'].mean())
+            'insertados': len(cambios['insertados']),
+            'actualizados': len(cambios['actualizados']),
+            'sin_cambios': len(cambios['sin_cambios']),
+            'regresion_actualizada': regresion_actualizada,
+            'cambios': {
+                'insertados': cambios['insertados'],
+                'actualizados': cambios['actualizados'],
+                'sin_cambios': cambios['sin_cambios']
             }
         })
         
     except Exception as e:
         return jsonify({
-            'error': f'Error al procesar archivo: {str(e)}'
+            'error': f'Error al procesar archivo incremental: {str(e)}'
         }), 500
 
+def _apply_delta_to_models(cambios):
+    """
+    Propaga una carga incremental a los modelos en uso sin reentrenar
+    
+    El clustering reasigna solo las filas afectadas; si el modelo previo
+    estaba registrado, el resultado se registra como versión derivada (sus
+    parámetros más 'delta_de'). La regresión en modo 'estadisticas'
+    entrenada con ese clustering resta las filas anteriores y suma las
+    nuevas, y también se registra para que /api/prediction la reutilice.
+    
+    Returns:
+        True si la regresión se actualizó
+    """
+    global clustering_results, regression_results
+    
+    previous_labels = clustering_results['labels']
+    previous_version = model_versions['clustering']
+    clustering_results.update(_writable_model('clustering').update_assignments(
+        current_data, cambios['posiciones_afectadas']
+    ))
+    
+    # El modelo en uso ya no coincide con la versión registrada
+    model_versions['clustering'] = None
+    clustering_meta = model_registry.get_meta(previous_version) if previous_version else None
+    if clustering_meta is not None:
+        _register_model(
+            'clustering', clustering_analyzer, clustering_results,
+            dict(clustering_meta['parametros'], delta_de=previous_version),
+            ClusteringAnalyzer.FEATURES_FOR_CLUSTERING,
+            {
+                'silhouette_score': clustering_results['silhouette_score'],
+                'inertia': clustering_results['inertia']
+            }
+        )
+    
+    # La regresión solo se actualiza si se entrenó con las etiquetas previas
+    regression_version = model_versions['regresion']
+    model_versions['regresion'] = None
+    regression_meta = model_registry.get_meta(regression_version) if regression_version else None
+    if (regression_meta is None or clustering_meta is None or
+            regression_meta['parametros']['clustering'] != previous_version or
+            regression_predictor.ols is None or regression_predictor.train_positions_ is None):
+        return False
+    
+    positions = cambios['posiciones_afectadas']
+    updated = positions[:len(cambios['actualizados'])]
+    inserted = positions[len(cambios['actualizados']):]
+    
+    data_with_clusters = current_data.copy()
+    data_with_clusters['cluster'] = clustering_results['labels']
+    regression_results = _writable_model('regresion').apply_delta(
+        data_with_clusters, updated,
+        cambios['filas_anteriores'].assign(cluster=previous_labels[updated]),
+        inserted
+    )
+    
+    if model_versions['clustering'] is not None:
+        _register_model(
+            'regresion', regression_predictor, regression_results,
+            dict(regression_meta['parametros'], clustering=model_versions['clustering']),
+            RegressionPredictor.FEATURES_FOR_REGRESSION,
+            {key: regression_results[key] for key in ('r2_score', 'mae', 'rmse', 'cv_r2_mean')}
+        )
+    
+    return True
+
+def _upload_response(data, extra=None):
+    """Arma la respuesta común de los endpoints de carga"""
+    # Validar cantidad mínima de registros
+    if len(data) < 50:
+        return jsonify({
+            'error': 'Datos insuficientes',
+            'registros': len(data),
+            'minimo': 50,
+            'message': 'El archivo debe contener al menos 50 registros de actividad'
+        }), 400
+    
+    return jsonify({
+        'success': True,
+        'message': f'{len(data)} registros cargados exitosamente',
+        'registros': len(data),
+        'columnas': list(data.columns),
+        'preview': data.head(5).to_dict('records'),
+        'estadisticas': {
+            'total_estudiantes': data_processor.stats.rows,
+            'promedio_actividades': data_processor.stats.mean('actividades_completadas'),
+            'promedio_tiempo': data_processor.stats.mean('tiempo_plataforma_horas')
+        },
+        **(extra or {})
+    })
+
 @app.route('/api/clustering', methods=['POST'])
 def execute_clustering():
     """
@@ -158,6 +500,10 @@ def execute_clustering():
         # Obtener parámetros
         data = request.get_json()
         k = data.get('k', 3)
+        modo = data.get('modo', 'auto')
+        silhouette_modo = data.get('silhouette_modo')
+        incremental = data.get('incremental', True)
+        reentrenar = data.get('reentrenar', False)
         
         # Validar K
         if k > len(current_data):
@@ -166,8 +512,34 @@ def execute_clustering():
                 'sugerencia': f'Por favor, reduzca K o cargue más datos. Máximo K permitido: {len(current_data)}'
             }), 400
         
-        # Ejecutar clustering
-        clustering_results = clustering_analyzer.fit_predict(current_data, k=k)
+        # Reutilizar la versión registrada para este dataset y parámetros
+        parametros = {
+            'k': k,
+            'modo': modo,
+            'silhouette_modo': silhouette_modo,
+            'backend': clustering_analyzer.backend
+        }
+        version = ModelRegistry.version_id('clustering', current_dataset_hash, parametros)
+        desde_registro = not reentrenar and model_registry.exists(version)
+        
+        if desde_registro:
+            if model_versions['clustering'] != version:
+                _install_model(version)
+                model_registry.activate(version)
+        else:
+            # Ejecutar clustering
+            clustering_results = _writable_model('clustering').fit_predict(
+                current_data, k=k, modo=modo, silhouette_modo=silhouette_modo,
+                incremental=incremental
+            )
+            version = _register_model(
+                'clustering', clustering_analyzer, clustering_results, parametros,
+                ClusteringAnalyzer.FEATURES_FOR_CLUSTERING,
+                {
+                    'silhouette_score': clustering_results['silhouette_score'],
+                    'inertia': clustering_results['inertia']
+                }
+            )
         
         # Validar calidad del clustering
         if clustering_results['silhouette_score'] < 0:
@@ -187,7 +559,18 @@ def execute_clustering():
             'inertia': float(clustering_results['inertia']),
             'distribucion': clustering_results['distribucion'],
             'warning': warning,
-            'interpretacion': clustering_results['interpretacion']
+            'interpretacion': clustering_results['interpretacion'],
+            'caracteristicas': clustering_analyzer.get_cluster_characteristics(
+                current_data, clustering_results['labels']
+            ),
+            'modo': clustering_results['modo'],
+            'silhouette_modo': clustering_results['silhouette_modo'],
+            'silhouette_intervalo': clustering_results['silhouette_intervalo'],
+            'inicializacion': clustering_results['inicializacion'],
+            'deriva': clustering_results['deriva'],
+            'version': version,
+            'desde_registro': desde_registro,
+            'registrado': version is not None
         })
         
     except Exception as e:
@@ -195,6 +578,312 @@ def execute_clustering():
             'error': f'Error en clustering: {str(e)}'
         }), 500
 
+@app.route('/api/clusters/assign', methods=['POST'])
+def assign_clusters():
+    """
+    Endpoint para asignar clusters a un lote de estudiantes nuevos
+    
+    Acepta un archivo CSV ('file') o JSON {'estudiantes': [...]}; todas las
+    filas se asignan en un único cálculo vectorizado.
+    """
+    try:
+        global clustering_results
+        
+        if clustering_results is None:
+            return jsonify({
+                'error': 'Debe ejecutar clustering primero'
+            }), 400
+        
+        if 'file' in request.files:
+            file = request.files['file']
+            
+            if not file.filename.endswith('.csv'):
+                return jsonify({
+                    'error': 'Formato inválido. Solo se aceptan archivos CSV'
+                }), 400
+            
+            batch = pd.read_csv(file, encoding='utf-8')
+        else:
+            params = request.get_json(silent=True) or {}
+            batch = pd.DataFrame(params.get('estudiantes', []))
+        
+        if batch.empty:
+            return jsonify({'error': 'No se recibieron estudiantes'}), 400
+        
+        assignment = clustering_analyzer.assign_clusters(batch)
+        interpretacion = clustering_results['interpretacion']
+        labels = assignment['labels']
+        
+        if 'estudiante_id' in batch.columns:
+            ids = batch['estudiante_id'].astype(str).tolist()
+        else:
+            ids = [None] * len(batch)
+        
+        return jsonify({
+            'success': True,
+            'total': len(batch),
+            'asignaciones': [
+                {
+                    'estudiante_id': ids[i],
+                    'cluster': int(labels[i]),
+                    'perfil': interpretacion.get(f'cluster_{labels[i]}', {}).get('perfil'),
+                    'distancias': assignment['distancias'][i].tolist()
+                }
+                for i in range(len(batch))
+            ]
+        })
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({
+            'error': f'Error al asignar clusters: {str(e)}'
+        }), 500
+
+@app.route('/api/clustering/stability', methods=['POST'])
+def clustering_stability():
+    """
+    Endpoint para evaluar la estabilidad del clustering actual (bootstrap)
+    
+    Parámetros JSON:
+    - n_bootstrap: cantidad de réplicas (por defecto 50, como máximo
+      ClusteringAnalyzer.MAX_BOOTSTRAP)
+    """
+    try:
+        global current_data, clustering_results
+        
+        if current_data is None or clustering_results is None:
+            return jsonify({
+                'error': 'Debe ejecutar clustering primero'
+            }), 400
+        
+        params = request.get_json(silent=True) or {}
+        n_bootstrap = min(int(params.get('n_bootstrap', 50)), ClusteringAnalyzer.MAX_BOOTSTRAP)
+        
+        stability = clustering_analyzer.bootstrap_stability(current_data, n_bootstrap=n_bootstrap)
+        interpretacion = clustering_results['interpretacion']
+        
+        for cluster_id, info in stability['clusters'].items():
+            info['perfil'] = interpretacion.get(cluster_id, {}).get('perfil')
+        
+        confianza = stability['confianza']
+        inestables = np.flatnonzero(confianza < 0.5)
+        
+        return jsonify({
+            'success': True,
+            'n_bootstrap': stability['n_bootstrap'],
+            'clusters': stability['clusters'],
+            'confianza_media': stability['confianza_media'],
+            'estudiantes_inestables': [
+                {
+                    'estudiante_id': str(current_data['estudiante_id'].iloc[i]),
+                    'confianza': float(confianza[i])
+                }
+                for i in inestables
+            ]
+        })
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({
+            'error': f'Error al evaluar estabilidad: {str(e)}'
+        }), 500
+
+@app.route('/api/students/similar', methods=['GET', 'POST'])
+def similar_students():
+    """
+    Endpoint para buscar estudiantes con comportamiento similar
+    
+    GET: ?estudiante_id=EST001&n=5 (estudiante ya cargado)
+    POST: {'estudiante': {features...}, 'n': 5} (perfil hipotético)
+    """
+    try:
+        global current_data, clustering_results
+        
+        if current_data is None or clustering_results is None:
+            return jsonify({
+                'error': 'Debe ejecutar clustering primero'
+            }), 400
+        
+        if request.method == 'GET':
+            estudiante_id = request.args.get('estudiante_id')
+            n_vecinos = request.args.get('n', 5, type=int)
+            position = data_processor.find_position(estudiante_id)
+            
+            if position is None:
+                return jsonify({
+                    'error': f'Estudiante no encontrado: {estudiante_id}'
+                }), 404
+            
+            result = clustering_analyzer.find_similar(position=position, n_vecinos=n_vecinos)
+        else:
+            params = request.get_json(silent=True) or {}
+            n_vecinos = int(params.get('n', 5))
+            result = clustering_analyzer.find_similar(
+                student=params.get('estudiante', {}), n_vecinos=n_vecinos
+            )
+        
+        ids = current_data['estudiante_id']
+        labels = clustering_results['labels']
+        cluster = result['cluster']
+        
+        return jsonify({
+            'success': True,
+            'cluster': cluster,
+            'perfil': clustering_results['interpretacion'].get(f'cluster_{cluster}', {}).get('perfil'),
+            'distancia_centroide': result['distancia_centroide'],
+            'similares': [
+                {
+                    'estudiante_id': str(ids.iloc[position]),
+                    'cluster': int(labels[position]),
+                    'distancia': float(distance)
+                }
+                for position, distance in zip(result['posiciones'], result['distancias'])
+            ]
+        })
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({
+            'error': f'Error al buscar estudiantes similares: {str(e)}'
+        }), 500
+
+@app.route('/api/models', methods=['GET'])
+def list_models():
+    """
+    Endpoint para listar las versiones de modelos registradas
+    
+    Query params: tipo ('clustering' o 'regresion', opcional)
+    """
+    try:
+        tipo = request.args.get('tipo')
+        if tipo is not None and tipo not in ModelRegistry.TYPES:
+            return jsonify({
+                'error': f'Tipo de modelo inválido: {tipo}. Opciones: {", ".join(ModelRegistry.TYPES)}'
+            }), 400
+        
+        return jsonify({
+            'success': True,
+            'versiones': model_registry.list_versions(tipo),
+            'en_uso': model_versions
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'error': f'Error al listar modelos: {str(e)}'
+        }), 500
+
+@app.route('/api/models/<version>/activate', methods=['POST'])
+def activate_model(version):
+    """
+    Endpoint para activar una versión registrada sin reentrenar
+    """
+    try:
+        meta = model_registry.get_meta(version)
+        if meta is None:
+            return jsonify({
+                'error': f'Versión de modelo inexistente: {version}'
+            }), 404
+        
+        # Las etiquetas de un clustering solo valen para su propio dataset
+        if (meta['tipo'] == 'clustering' and current_data is not None and
+                meta['dataset_hash'] != current_dataset_hash):
+            return jsonify({
+                'error': 'La versión de clustering corresponde a otro dataset'
+            }), 400
+        
+        _install_model(version)
+        meta = model_registry.activate(version)
+        
+        return jsonify({
+            'success': True,
+            'version': meta
+        })
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({
+            'error': f'Error al activar modelo: {str(e)}'
+        }), 500
+
+def _run_optimal_k(data, k_range):
+    """Ejecuta el barrido de K en segundo plano actualizando el progreso"""
+    global optimal_k_job
+    
+    def progress(done, total):
+        with optimal_k_lock:
+            optimal_k_job['completados'] = done
+            optimal_k_job['total'] = total
+    
+    try:
+        results = clustering_analyzer.get_optimal_k(data, k_range=k_range, progress=progress)
+        with optimal_k_lock:
+            optimal_k_job['resultados'] = results
+            optimal_k_job['estado'] = 'completado'
+    except Exception as e:
+        with optimal_k_lock:
+            optimal_k_job['estado'] = 'error'
+            optimal_k_job['error'] = f'Error al buscar K óptimo: {str(e)}'
+
+@app.route('/api/clustering/optimal-k', methods=['POST'])
+def start_optimal_k():
+    """
+    Endpoint para iniciar la búsqueda del K óptimo (método del codo)
+    
+    El barrido corre en segundo plano; el progreso se consulta con GET.
+    """
+    try:
+        global current_data, optimal_k_job
+        
+        if current_data is None:
+            return jsonify({'error': 'No hay datos cargados'}), 400
+        
+        params = request.get_json(silent=True) or {}
+        k_min = int(params.get('k_min', 2))
+        k_max = int(params.get('k_max', 10))
+        
+        with optimal_k_lock:
+            if optimal_k_job['estado'] == 'en_progreso':
+                return jsonify({'error': 'Ya hay una búsqueda de K en curso'}), 409
+            
+            optimal_k_job = {
+                'estado': 'en_progreso',
+                'completados': 0,
+                'total': 0,
+                'resultados': None
+            }
+        
+        thread = threading.Thread(
+            target=_run_optimal_k,
+            args=(current_data, range(k_min, k_max + 1)),
+            daemon=True
+        )
+        thread.start()
+        
+        return jsonify({'success': True, 'estado': 'en_progreso'}), 202
+        
+    except Exception as e:
+        return jsonify({
+            'error': f'Error al buscar K óptimo: {str(e)}'
+        }), 500
+
+@app.route('/api/clustering/optimal-k', methods=['GET'])
+def get_optimal_k_progress():
+    """
+    Endpoint para consultar el progreso y resultado de la búsqueda de K
+    """
+    with optimal_k_lock:
+        job = dict(optimal_k_job)
+    
+    job['progreso'] = (
+        float(job['completados'] / job['total'] * 100) if job['total'] else 0.0
+    )
+    
+    return jsonify(job)
+
 @app.route('/api/prediction', methods=['POST'])
 def execute_prediction():
     """
@@ -213,21 +902,64 @@ def execute_prediction():
                 'error': 'Debe ejecutar clustering primero'
             }), 400
         
+        params = request.get_json(silent=True) or {}
+        # 'completo' (sklearn) por defecto; 'estadisticas' habilita las
+        # actualizaciones incrementales con cargas delta
+        modo = params.get('modo', 'completo')
+        cv_modo = params.get('cv_modo', 'kfold')
+        reentrenar = params.get('reentrenar', False)
+        intervalo = params.get('intervalo', 'ols')
+        n_bootstrap = int(params.get('n_bootstrap', 1000))
+        
         # Preparar datos con clusters
         data_with_clusters = current_data.copy()
         data_with_clusters['cluster'] = clustering_results['labels']
         
-        # Entrenar modelo de regresión
-        regression_results = regression_predictor.train(data_with_clusters)
+        # El modelo depende también de las etiquetas del clustering en uso
+        parametros = {
+            'modo': modo,
+            'cv_modo': cv_modo,
+            'clustering': model_versions['clustering']
+        }
+        version = ModelRegistry.version_id('regresion', current_dataset_hash, parametros)
+        desde_registro = (
+            not reentrenar and model_versions['clustering'] is not None and
+            model_registry.exists(version)
+        )
         
-        # Obtener predicciones
-        predictions = regression_predictor.predict(data_with_clusters)
+        if desde_registro:
+            if model_versions['regresion'] != version:
+                _install_model(version)
+                model_registry.activate(version)
+        else:
+            # Entrenar modelo de regresión
+            regression_results = _writable_model('regresion').train(
+                data_with_clusters, modo=modo, cv_modo=cv_modo
+            )
+            
+            # Sin versión de clustering (p. ej. tras una carga incremental)
+            # las etiquetas no son reproducibles y el modelo no se registra
+            version = None
+            model_versions['regresion'] = None
+            if model_versions['clustering'] is not None:
+                version = _register_model(
+                    'regresion', regression_predictor, regression_results, parametros,
+                    RegressionPredictor.FEATURES_FOR_REGRESSION,
+                    {
+                        key: regression_results[key]
+                        for key in ('r2_score', 'mae', 'rmse', 'cv_r2_mean')
+                    }
+                )
         
-        # Aplicar clamping para mantener rango 0-10
-        predictions_clamped = np.clip(predictions, 0, 10)
+        # Obtener predicciones (ya ajustadas al rango 0-10) con intervalos
+        resultado = regression_predictor.predict_with_confidence(
+            data_with_clusters, formato='columnas', metodo=intervalo,
+            n_bootstrap=n_bootstrap
+        )
+        predictions_clamped = resultado['prediccion']
         
         # Detectar predicciones ajustadas
-        adjustments = predictions != predictions_clamped
+        adjustments = resultado['ajustada']
         warnings = []
         if adjustments.any():
             n_adjusted = adjustments.sum()
@@ -236,6 +968,12 @@ def execute_prediction():
         return jsonify({
             'success': True,
             'predicciones': predictions_clamped.tolist(),
+            'intervalos': {
+                'metodo': intervalo,
+                'inferior': resultado['intervalo_inferior'].tolist(),
+                'superior': resultado['intervalo_superior'].tolist(),
+                'confianza': resultado['confianza'].tolist()
+            },
             'r2_score': float(regression_results['r2_score']),
             'mae': float(regression_results['mae']),
             'rmse': float(regression_results['rmse']),
@@ -248,9 +986,21 @@ def execute_prediction():
                 'calidad': 'Excelente' if regression_results['r2_score'] > 0.7 else 
                           'Buena' if regression_results['r2_score'] > 0.6 else 
                           'Aceptable' if regression_results['r2_score'] > 0.5 else 'Baja'
+            },
+            'modo_entrenamiento': regression_results['modo_entrenamiento'],
+            'segmentos': regression_results.get('segmentos'),
+            'version': version,
+            'desde_registro': desde_registro,
+            'registrado': version is not None,
+            'validacion_cruzada': {
+                'modo': regression_results['cv_modo'],
+                'r2_promedio': float(regression_results['cv_r2_mean']),
+                'r2_desviacion': float(regression_results['cv_r2_std'])
             }
         })
         
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({
             'error': f'Error en predicción: {str(e)}'
@@ -398,19 +1148,29 @@ def get_statistics():
         if current_data is None:
             return jsonify({'error': 'No hay datos cargados'}), 400
         
+        # Estadísticas incrementales del procesador (sin recorrer los datos)
+        summary = data_processor.get_statistics()
+        
         stats = {
-            'total_estudiantes': int(current_data['estudiante_id'].nunique()),
-            'promedio_actividades': float(current_data['actividades_completadas'].mean()),
-            'promedio_tiempo': float(current_data['tiempo_plataforma_horas'].mean()),
-            'promedio_entregas_tarde': float(current_data['entregas_tarde'].mean()),
-            'promedio_foros': float(current_data['foros_participacion'].mean()),
-            'promedio_calificacion': float(current_data['calificacion_final'].mean())
+            'total_estudiantes': summary['estudiantes_unicos'],
+            'promedio_actividades': summary['promedios']['actividades'],
+            'promedio_tiempo': summary['promedios']['tiempo_horas'],
+            'promedio_entregas_tarde': summary['promedios']['entregas_tarde'],
+            'promedio_foros': summary['promedios']['foros'],
+            'promedio_calificacion': summary['promedios']['calificacion'],
+            'medianas': summary['medianas'],
+            'desviaciones': summary['desviaciones']
         }
         
         if clustering_results:
             stats['clustering'] = {
                 'silhouette_score': float(clustering_results['silhouette_score']),
-                'distribucion': clustering_results['distribucion']
+                'silhouette_modo': clustering_results.get('silhouette_modo'),
+                'distribucion': clustering_results['distribucion'],
+                # Agregación por cluster cacheada junto con las etiquetas
+                'caracteristicas': clustering_analyzer.get_cluster_characteristics(
+                    current_data, clustering_results['labels']
+                )
             }
         
         if regression_results:
@@ -427,6 +1187,95 @@ def get_statistics():
             'error': f'Error al obtener estadísticas: {str(e)}'
         }), 500
 
+@app.route('/api/outliers', methods=['GET'])
+def get_outliers():
+    """
+    Endpoint para detectar outliers en todas las features a la vez
+    
+    Parámetros (query string):
+    - metodo: zscore | mad | iqr (por defecto mad)
+    - columnas: lista separada por comas (opcional)
+    - umbral: número de escalas (opcional)
+    """
+    try:
+        global current_data
+        
+        if current_data is None:
+            return jsonify({'error': 'No hay datos cargados'}), 400
+        
+        method = request.args.get('metodo', 'mad')
+        columns = request.args.get('columnas')
+        columns = columns.split(',') if columns else None
+        threshold = request.args.get('umbral', type=float)
+        
+        results = data_processor.detect_outliers(columns, method=method, threshold=threshold)
+        ids = current_data['estudiante_id'].to_numpy()
+        
+        return jsonify({
+            'success': True,
+            'metodo': method,
+            'outliers': {
+                col: {
+                    'cantidad': info['cantidad'],
+                    'centro': info['centro'],
+                    'escala': info['escala'],
+                    'limites': [info['limite_inferior'], info['limite_superior']],
+                    'estudiantes': [str(i) for i in ids[info['indices']]]
+                }
+                for col, info in results.items()
+            }
+        })
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({
+            'error': f'Error al detectar outliers: {str(e)}'
+        }), 500
+
+@app.route('/api/query', methods=['POST'])
+def query_data():
+    """
+    Endpoint para consultar estudiantes por rangos en varias columnas
+    
+    Cuerpo JSON:
+    - condiciones: [{'columna', 'min', 'max'}, ...] (extremos inclusivos)
+    - solo_conteo: si es true solo devuelve la cantidad
+    - limite: máximo de registros a devolver (por defecto 100)
+    """
+    try:
+        global current_data
+        
+        if current_data is None:
+            return jsonify({'error': 'No hay datos cargados'}), 400
+        
+        params = request.get_json() or {}
+        conditions = params.get('condiciones', [])
+        engine = data_processor.get_query_engine()
+        
+        if params.get('solo_conteo', False):
+            return jsonify({
+                'success': True,
+                'total': int(engine.count(conditions))
+            })
+        
+        positions = engine.where(conditions)
+        limit = int(params.get('limite', 100))
+        rows = engine.rows(positions[:limit])
+        
+        return jsonify({
+            'success': True,
+            'total': int(len(positions)),
+            'registros': json.loads(rows.to_json(orient='records'))
+        })
+        
+    except (ValueError, KeyError) as e:
+        return jsonify({'error': f'Consulta inválida: {str(e)}'}), 400
+    except Exception as e:
+        return jsonify({
+            'error': f'Error al consultar datos: {str(e)}'
+        }), 500
+
 # ========== HEALTH CHECK (COMENTADO - Útil para producción) ==========
 """
 @app.route('/health', methods=['GET'])
@@ -459,11 +1308,20 @@ def not_found(error):
             '/',
             '/demos/',
             '/api/upload',
+            '/api/upload/eventos',
+            '/api/upload/delta',
             '/api/clustering',
+            '/api/clustering/optimal-k',
+            '/api/clustering/stability',
+            '/api/clusters/assign',
+            '/api/students/similar',
             '/api/prediction',
+            '/api/models',
             '/api/alerts',
             '/api/export',
-            '/api/statistics'
+            '/api/statistics',
+            '/api/outliers',
+            '/api/query'
         ]
     }), 404
 
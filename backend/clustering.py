@@ -3,14 +3,75 @@ Módulo de Clustering K-means para SAEM
 Implementa segmentación de estudiantes por patrones de actividad
 """
 
+import copy
+import hashlib
 import numpy as np
 import pandas as pd
-from sklearn.cluster import KMeans
+from joblib import Parallel, delayed
+from sklearn.cluster import KMeans, MiniBatchKMeans
 from sklearn.preprocessing import StandardScaler
-from sklearn.metrics import silhouette_score
+from scipy.optimize import linear_sum_assignment
+from scipy.spatial.distance import cdist
+from backend.silhouette import SilhouetteEngine
+from backend.kmeans_engine import NumpyKMeans
+from backend.similarity_index import SimilarityIndex
 import warnings
 warnings.filterwarnings('ignore')
 
+def _fit_k(X_scaled, k, random_state, max_iter, silhouette_engine, kmeans_class=KMeans):
+    """
+    Entrena K-means para un K del barrido (se ejecuta en un proceso aparte)
+    
+    X_scaled llega mapeado en memoria y en solo lectura, compartido entre
+    los procesos del pool.
+    """
+    model = kmeans_class(
+        n_clusters=k,
+        init='k-means++',
+        random_state=random_state,
+        max_iter=max_iter,
+        n_init=10
+    )
+    labels = model.fit_predict(X_scaled)
+    silhouette = silhouette_engine.score(X_scaled, labels, model.cluster_centers_)
+    
+    return k, model, labels, silhouette
+
+def _bootstrap_run(X_scaled, reference_labels, reference_centers, seed, max_iter,
+                   kmeans_class=KMeans):
+    """
+    Reentrena K-means sobre una réplica bootstrap (en un proceso aparte)
+    
+    La réplica se expresa como pesos por fila (cuántas veces se sorteó cada
+    estudiante) sobre la matriz compartida, sin copiar filas. Los clusters
+    se alinean con los de referencia antes de comparar.
+    
+    Returns:
+        (Jaccard por cluster de referencia, coincidencia por estudiante)
+    """
+    n = len(X_scaled)
+    k = len(reference_centers)
+    rng = np.random.default_rng(seed)
+    weights = np.bincount(rng.integers(0, n, n), minlength=n).astype('float64')
+    
+    model = kmeans_class(n_clusters=k, init='k-means++', random_state=seed,
+                         max_iter=max_iter, n_init=3)
+    model.fit(X_scaled, sample_weight=weights)
+    
+    _, order = linear_sum_assignment(cdist(reference_centers, model.cluster_centers_))
+    labels = np.argsort(order)[model.predict(X_scaled)]
+    
+    # Jaccard entre cluster de referencia y su par, solo sobre los sorteados
+    in_bag = weights > 0
+    jaccard = np.empty(k)
+    for cluster in range(k):
+        reference = (reference_labels == cluster) & in_bag
+        replica = (labels == cluster) & in_bag
+        union = (reference | replica).sum()
+        jaccard[cluster] = (reference & replica).sum() / union if union else 0.0
+    
+    return jaccard, labels == reference_labels
+
 class ClusteringAnalyzer:
     """Clase para análisis de clustering de estudiantes"""
     
@@ -21,15 +82,74 @@ class ClusteringAnalyzer:
         'foros_participacion'
     ]
     
-    def __init__(self):
+    MODES = ('auto', 'completo', 'minibatch')
+    KMEANS_BACKENDS = {
+        'sklearn': KMeans,
+        'numpy': NumpyKMeans
+    }
+    NUMPY_MAX_ROWS = 5000
+    MINIBATCH_THRESHOLD = 50000
+    MINIBATCH_CHUNKSIZE = 10000
+    MINIBATCH_EPOCHS = 3
+    SWEEP_PARALLEL_MIN_ROWS = 5000
+    DRIFT_THRESHOLD = 0.2
+    MAX_BOOTSTRAP = 1000
+    ASSIGN_CHUNKSIZE = 50000
+    STABILITY_LEVELS = [
+        (0.85, 'muy estable'),
+        (0.75, 'estable'),
+        (0.6, 'patrón débil'),
+        (0.0, 'inestable')
+    ]
+    
+    def __init__(self, minibatch_threshold=None, silhouette_mode='auto', backend='sklearn'):
+        """
+        Args:
+            minibatch_threshold: Cantidad de registros a partir de la cual
+                el modo 'auto' usa K-means por mini-lotes
+            silhouette_mode: Modo de cálculo del silhouette
+                (ver SilhouetteEngine.MODES)
+            backend: Implementación de K-means para el modo completo:
+                'sklearn' o 'numpy' (NumpyKMeans, float32 con cotas de
+                Hamerly; más rápida en cohortes chicas). Por encima de
+                NUMPY_MAX_ROWS registros se usa sklearn de todos modos
+        """
+        if backend not in self.KMEANS_BACKENDS:
+            raise ValueError(
+                f'Backend inválido: {backend}. Opciones: {", ".join(self.KMEANS_BACKENDS)}'
+            )
+        self.backend = backend
+        self.kmeans_class = self.KMEANS_BACKENDS[backend]
+        self.silhouette_engine = SilhouetteEngine(silhouette_mode)
+        self.minibatch_threshold = (
+            minibatch_threshold if minibatch_threshold is not None
+            else self.MINIBATCH_THRESHOLD
+        )
         self.model = None
         self.scaler = StandardScaler()
         self.labels_ = None
         self.centroids_ = None
         self.silhouette_score_ = None
+        self.silhouette_ = None
         self.inertia_ = None
+        self.cluster_stats_ = None
+        self.similarity_index = None
+        self._sweep_cache = None
     
-    def fit_predict(self, data, k=3, random_state=42, max_iter=300):
+    def __getstate__(self):
+        """
+        Estado serializable (registro de modelos, copias)
+        
+        Se omiten las cachés de ejecución: el barrido de K guarda un modelo
+        por K y las estadísticas por cluster referencian el DataFrame.
+        """
+        state = self.__dict__.copy()
+        state['_sweep_cache'] = None
+        state['cluster_stats_'] = None
+        return state
+    
+    def fit_predict(self, data, k=3, random_state=42, max_iter=300, modo='auto',
+                    silhouette_modo=None, incremental=False):
         """
         Ejecuta clustering K-means en los datos
         
@@ -38,11 +158,30 @@ class ClusteringAnalyzer:
             k: Número de clusters (por defecto 3)
             random_state: Semilla aleatoria para reproducibilidad
             max_iter: Máximo número de iteraciones
+            modo: 'completo' (KMeans sobre toda la matriz), 'minibatch'
+                (partial_fit por bloques) o 'auto' (minibatch a partir de
+                minibatch_threshold registros)
+            silhouette_modo: Modo de silhouette para esta ejecución
+                (por defecto el del analizador)
+            incremental: Si hay un clustering previo con el mismo K, parte de
+                sus centroides cuando la deriva de los datos es menor a
+                DRIFT_THRESHOLD y conserva la numeración de los clusters
             
         Returns:
             dict con resultados del clustering
         """
         try:
+            if modo not in self.MODES:
+                raise ValueError(f'Modo inválido: {modo}. Opciones: {", ".join(self.MODES)}')
+            
+            if modo == 'auto':
+                modo = 'minibatch' if len(data) > self.minibatch_threshold else 'completo'
+            
+            if modo == 'minibatch':
+                return self._fit_predict_minibatch(
+                    data, k, random_state, silhouette_modo, incremental
+                )
+            
             # Validar que K no exceda número de registros
             if k > len(data):
                 raise ValueError(
@@ -56,28 +195,75 @@ class ClusteringAnalyzer:
             # Extraer features
             X = data[self.FEATURES_FOR_CLUSTERING].values
             
-            # Normalizar datos
-            X_scaled = self.scaler.fit_transform(X)
+            previous = self._previous_fit(k) if incremental else None
+            scaler = StandardScaler().fit(X)
+            drift = self._drift(previous, scaler) if previous else None
+            cached = None
             
-            # Aplicar K-means con K-means++
-            self.model = KMeans(
-                n_clusters=k,
-                init='k-means++',
-                random_state=random_state,
-                max_iter=max_iter,
-                n_init=10
-            )
+            if previous and drift <= self.DRIFT_THRESHOLD:
+                # Pocas iteraciones de Lloyd desde los centroides anteriores
+                self.scaler = scaler
+                X_scaled = scaler.transform(X)
+                self.model = self._kmeans_class_for(len(X))(
+                    n_clusters=k,
+                    init=scaler.transform(previous['centroids']),
+                    random_state=random_state,
+                    max_iter=max_iter,
+                    n_init=1
+                )
+                self.labels_ = self.model.fit_predict(X_scaled)
+                inicializacion = 'centroides_previos'
+            else:
+                # Reutilizar el modelo si el barrido de K ya lo entrenó
+                cached = self._get_sweep_result(X, k, random_state, max_iter)
+                inicializacion = 'k-means++'
+                
+                if cached is not None:
+                    self.scaler = self._sweep_cache['scaler']
+                    self.model = cached['model']
+                    self.labels_ = cached['labels'].copy()
+                    X_scaled = None
+                else:
+                    # Normalizar datos
+                    self.scaler = scaler
+                    X_scaled = scaler.transform(X)
+                    
+                    # Aplicar K-means con K-means++
+                    self.model = self._kmeans_class_for(len(X))(
+                        n_clusters=k,
+                        init='k-means++',
+                        random_state=random_state,
+                        max_iter=max_iter,
+                        n_init=10
+                    )
+                    
+                    # Entrenar y predecir
+                    self.labels_ = self.model.fit_predict(X_scaled)
+            
+            if previous:
+                self.labels_ = self._align_clusters(previous['centroids'])[self.labels_]
             
-            # Entrenar y predecir
-            self.labels_ = self.model.fit_predict(X_scaled)
             self.centroids_ = self.scaler.inverse_transform(self.model.cluster_centers_)
             self.inertia_ = self.model.inertia_
             
             # Calcular silhouette score
-            if k > 1 and len(data) > k:
-                self.silhouette_score_ = silhouette_score(X_scaled, self.labels_)
+            if (cached is not None and
+                    cached['silhouette']['modo'] ==
+                    self.silhouette_engine.resolve_mode(len(X), silhouette_modo)):
+                self.silhouette_ = cached['silhouette']
             else:
-                self.silhouette_score_ = 0.0
+                if X_scaled is None:
+                    X_scaled = self.scaler.transform(X)
+                self.silhouette_ = self.silhouette_engine.score(
+                    X_scaled, self.labels_, self.model.cluster_centers_, silhouette_modo
+                )
+            self.silhouette_score_ = self.silhouette_['valor']
+            
+            # Índice de estudiantes similares sobre la matriz normalizada
+            self.similarity_index = SimilarityIndex().build(
+                X_scaled if X_scaled is not None else self.scaler.transform(X),
+                self.model.cluster_centers_
+            )
             
             # Analizar distribución de clusters
             distribucion = self._analyze_distribution(data, self.labels_)
@@ -92,33 +278,289 @@ class ClusteringAnalyzer:
                 'inertia': self.inertia_,
                 'distribucion': distribucion,
                 'interpretacion': interpretacion,
-                'n_clusters': k
+                'n_clusters': k,
+                'modo': 'completo',
+                'silhouette_modo': self.silhouette_['modo'],
+                'silhouette_intervalo': self.silhouette_['intervalo'],
+                'inicializacion': inicializacion,
+                'deriva': drift,
+                'iteraciones': int(self.model.n_iter_)
             }
             
         except Exception as e:
             raise Exception(f'Error en clustering: {str(e)}')
     
+    def _previous_fit(self, k):
+        """Centroides y normalización del clustering anterior con el mismo K"""
+        if self.model is None or self.centroids_ is None or len(self.centroids_) != k:
+            return None
+        
+        return {
+            'centroids': self.centroids_.copy(),
+            'mean': self.scaler.mean_.copy(),
+            'scale': self.scaler.scale_.copy()
+        }
+    
+    @staticmethod
+    def _drift(previous, scaler):
+        """
+        Deriva de los datos respecto del clustering anterior
+        
+        Máximo, entre features, del desplazamiento de la media (en desvíos
+        anteriores) y del cambio relativo del desvío.
+        """
+        shift = np.abs(scaler.mean_ - previous['mean']) / previous['scale']
+        spread = np.abs(scaler.scale_ / previous['scale'] - 1)
+        
+        return float(max(shift.max(), spread.max()))
+    
+    def _align_clusters(self, previous_centroids):
+        """
+        Renumera los clusters para que coincidan con los anteriores
+        
+        Empareja centroides nuevos y anteriores con el algoritmo húngaro
+        (mínima distancia total), de modo que un estudiante no cambie de
+        número de cluster solo por el orden en que K-means los encontró.
+        
+        Returns:
+            Array que traduce cada etiqueta nueva a la numeración anterior
+        """
+        reference = self.scaler.transform(previous_centroids)
+        centers = self.model.cluster_centers_
+        _, order = linear_sum_assignment(cdist(reference, centers))
+        relabel = np.argsort(order)
+        
+        if np.array_equal(order, np.arange(len(order))):
+            return relabel
+        
+        # Copia para no alterar modelos compartidos con la caché del barrido
+        self.model = copy.deepcopy(self.model)
+        self.model.cluster_centers_ = centers[order]
+        if hasattr(self.model, 'labels_'):
+            self.model.labels_ = relabel[self.model.labels_]
+        
+        return relabel
+    
+    def _kmeans_class_for(self, n):
+        """
+        Implementación de K-means para n registros
+
+        NumpyKMeans solo gana en cohortes chicas; desde NUMPY_MAX_ROWS
+        registros sklearn es más rápido y se usa aunque el backend sea 'numpy'.
+        """
+        if self.kmeans_class is NumpyKMeans and n >= self.NUMPY_MAX_ROWS:
+            return KMeans
+        return self.kmeans_class
+    
+    def _feature_columns(self, data):
+        """
+        Columnas de features como arrays independientes
+        
+        Son vistas de los datos, por lo que datos mapeados en memoria
+        (caché de datasets) no se copian enteros.
+        """
+        return [data[f].to_numpy() for f in self.FEATURES_FOR_CLUSTERING]
+    
+    @staticmethod
+    def _take_rows(columns, rows):
+        """Arma la matriz de features para un bloque o selección de filas"""
+        return np.column_stack([col[rows] for col in columns]).astype('float64')
+    
+    def _minibatch_blocks(self, n, k):
+        """
+        Bloques contiguos de tamaño parejo (a lo sumo MINIBATCH_CHUNKSIZE)
+        
+        partial_fit falla si el primer bloque tiene menos de k filas, así
+        que no se deja un bloque final chico: todos tienen al menos k.
+        """
+        n_blocks = min(int(np.ceil(n / self.MINIBATCH_CHUNKSIZE)), max(n // k, 1))
+        bounds = np.linspace(0, n, n_blocks + 1).astype('int64')
+        return [slice(start, stop) for start, stop in zip(bounds[:-1], bounds[1:])]
+    
+    def _fit_predict_minibatch(self, data, k, random_state, silhouette_modo=None,
+                               incremental=False):
+        """
+        Clustering con MiniBatchKMeans para datasets grandes
+        
+        La normalización y el entrenamiento se hacen con partial_fit por
+        bloques. La única matriz completa es la normalizada que guarda el
+        índice de similitud, llenada bloque a bloque.
+        """
+        if k > len(data):
+            raise ValueError(
+                f'K ({k}) no puede ser mayor que el número de registros ({len(data)})'
+            )
+        
+        if k < 2:
+            raise ValueError('K debe ser al menos 2')
+        
+        n = len(data)
+        rng = np.random.default_rng(random_state)
+        columns = self._feature_columns(data)
+        blocks = self._minibatch_blocks(n, k)
+        
+        previous = self._previous_fit(k) if incremental else None
+        
+        # Primera pasada: media y desvío para normalizar
+        self.scaler = StandardScaler()
+        for block in blocks:
+            self.scaler.partial_fit(self._take_rows(columns, block))
+        
+        drift = self._drift(previous, self.scaler) if previous else None
+        
+        if previous and drift <= self.DRIFT_THRESHOLD:
+            init = self.scaler.transform(previous['centroids'])
+            inicializacion = 'centroides_previos'
+        else:
+            init = 'k-means++'
+            inicializacion = 'k-means++'
+        
+        self.model = MiniBatchKMeans(
+            n_clusters=k,
+            init=init,
+            random_state=random_state,
+            batch_size=min(self.MINIBATCH_CHUNKSIZE, n),
+            n_init=1 if inicializacion == 'centroides_previos' else 3
+        )
+        
+        # Épocas de entrenamiento; el orden de los bloques se mezcla en cada
+        # una para no sesgar los centroides si el archivo viene ordenado
+        for _ in range(self.MINIBATCH_EPOCHS):
+            for i in rng.permutation(len(blocks)):
+                chunk = self._take_rows(columns, blocks[i])
+                self.model.partial_fit(self.scaler.transform(chunk))
+        
+        if previous:
+            self._align_clusters(previous['centroids'])
+        
+        # Pasada final: etiquetas e inercia sobre todos los registros. La
+        # matriz normalizada (la que guarda el índice de similitud) se llena
+        # por bloques, sin una copia completa de las features sin normalizar
+        labels = np.empty(n, dtype='int32')
+        X_scaled = np.empty((n, len(columns)))
+        inertia = 0.0
+        for block in blocks:
+            chunk_scaled = self.scaler.transform(self._take_rows(columns, block))
+            X_scaled[block] = chunk_scaled
+            labels[block] = self.model.predict(chunk_scaled)
+            inertia -= self.model.score(chunk_scaled)
+        
+        self.labels_ = labels
+        self.centroids_ = self.scaler.inverse_transform(self.model.cluster_centers_)
+        self.inertia_ = inertia
+        
+        engine = self.silhouette_engine
+        silhouette_modo = engine.resolve_mode(n, silhouette_modo)
+        if silhouette_modo == 'muestreo':
+            sample = engine.sample_indices(labels)
+            self.silhouette_ = engine.score_sample(
+                X_scaled[sample], labels[sample], np.bincount(labels)
+            )
+        elif silhouette_modo == 'simplificado':
+            self.silhouette_ = engine.score_simplified(
+                ((X_scaled[block], labels[block]) for block in blocks),
+                self.model.cluster_centers_
+            )
+        else:
+            self.silhouette_ = engine.score(
+                X_scaled, labels, self.model.cluster_centers_, silhouette_modo
+            )
+        self.silhouette_score_ = self.silhouette_['valor']
+        
+        self.similarity_index = SimilarityIndex().build(X_scaled, self.model.cluster_centers_)
+        
+        return {
+            'labels': self.labels_,
+            'centroids': self.centroids_,
+            'silhouette_score': self.silhouette_score_,
+            'inertia': self.inertia_,
+            'distribucion': self._analyze_distribution(data, self.labels_),
+            'interpretacion': self._interpret_clusters(self.centroids_),
+            'n_clusters': k,
+            'modo': 'minibatch',
+            'silhouette_modo': self.silhouette_['modo'],
+            'silhouette_intervalo': self.silhouette_['intervalo'],
+            'inicializacion': inicializacion,
+            'deriva': drift,
+            'iteraciones': int(self.model.n_steps_)
+        }
+    
     def _analyze_distribution(self, data, labels):
         """Analiza la distribución de estudiantes en clusters"""
+        stats = self.get_cluster_stats(data, labels)
+        features = stats['features']
         distribucion = {}
         
-        for cluster_id in range(len(np.unique(labels))):
-            mask = labels == cluster_id
-            cluster_data = data[mask]
-            
+        for i, cluster_id in enumerate(stats['clusters']):
             distribucion[f'cluster_{cluster_id}'] = {
-                'cantidad': int(mask.sum()),
-                'porcentaje': float(mask.sum() / len(labels) * 100),
+                'cantidad': int(stats['cantidad'][i]),
+                'porcentaje': float(stats['cantidad'][i] / len(labels) * 100),
                 'promedios': {
-                    'actividades': float(cluster_data['actividades_completadas'].mean()),
-                    'tiempo': float(cluster_data['tiempo_plataforma_horas'].mean()),
-                    'entregas_tarde': float(cluster_data['entregas_tarde'].mean()),
-                    'foros': float(cluster_data['foros_participacion'].mean())
+                    'actividades': float(features['actividades_completadas']['promedio'][i]),
+                    'tiempo': float(features['tiempo_plataforma_horas']['promedio'][i]),
+                    'entregas_tarde': float(features['entregas_tarde']['promedio'][i]),
+                    'foros': float(features['foros_participacion']['promedio'][i])
                 }
             }
         
         return distribucion
     
+    def get_cluster_stats(self, data, labels):
+        """
+        Estadísticas por cluster y feature calculadas en una sola agrupación
+        
+        Las filas se ordenan una vez por cluster y cada estadística se
+        obtiene con reducciones por segmento (np.add.reduceat) sobre ese
+        orden, sin copiar subconjuntos del DataFrame. El resultado queda en
+        cluster_stats_ mientras no cambien las etiquetas ni los datos.
+        
+        Returns:
+            dict con clusters, cantidad y, por feature, arrays de promedio,
+            mediana, min, max y desv_std alineados con clusters
+        """
+        if (self.cluster_stats_ is not None and
+                self.cluster_stats_['labels'] is labels and
+                self.cluster_stats_['data'] is data):
+            return self.cluster_stats_
+        
+        labels_array = np.asarray(labels)
+        order = np.argsort(labels_array, kind='stable')
+        sorted_labels = labels_array[order]
+        clusters, starts, counts = np.unique(
+            sorted_labels, return_index=True, return_counts=True
+        )
+        ends = starts + counts - 1
+        
+        features = {}
+        for feature in self.FEATURES_FOR_CLUSTERING:
+            values = data[feature].to_numpy(dtype='float64')
+            
+            # Orden por cluster y, dentro de cada cluster, por valor
+            values = values[order][np.lexsort((values[order], sorted_labels))]
+            
+            means = np.add.reduceat(values, starts) / counts
+            squares = np.add.reduceat((values - np.repeat(means, counts)) ** 2, starts)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                std = np.where(counts > 1, np.sqrt(squares / (counts - 1)), np.nan)
+            
+            features[feature] = {
+                'promedio': means,
+                'mediana': (values[starts + (counts - 1) // 2] + values[starts + counts // 2]) / 2,
+                'min': values[starts],
+                'max': values[ends],
+                'desv_std': std
+            }
+        
+        self.cluster_stats_ = {
+            'labels': labels,
+            'data': data,
+            'clusters': clusters,
+            'cantidad': counts,
+            'features': features
+        }
+        
+        return self.cluster_stats_
+    
     def _interpret_clusters(self, centroids):
         """Interpreta el significado de cada cluster"""
         interpretacion = {}
@@ -178,79 +620,332 @@ class ClusteringAnalyzer:
     
     def predict_cluster(self, student_data):
         """Predice el cluster para un nuevo estudiante"""
+        if isinstance(student_data, pd.Series):
+            student_data = student_data.to_frame().T
+        
+        return int(self.assign_clusters(student_data)['labels'][0])
+    
+    def assign_clusters(self, data, chunksize=None):
+        """
+        Asigna el cluster más cercano a un lote de estudiantes
+        
+        Calcula en forma vectorizada la distancia de cada fila a todos los
+        centroides (en el espacio normalizado del modelo), por bloques de
+        filas para acotar la memoria.
+        
+        Args:
+            data: DataFrame con las features de clustering
+            chunksize: Filas por bloque (por defecto ASSIGN_CHUNKSIZE)
+            
+        Returns:
+            dict con labels (n,) y distancias (n, k) a cada centroide
+        """
         if self.model is None:
             raise ValueError('Debe entrenar el modelo primero')
         
-        # Extraer features
-        X = student_data[self.FEATURES_FOR_CLUSTERING].values.reshape(1, -1)
+        missing = [f for f in self.FEATURES_FOR_CLUSTERING if f not in data.columns]
+        if missing:
+            raise ValueError(f'Faltan columnas: {", ".join(missing)}')
         
-        # Normalizar
-        X_scaled = self.scaler.transform(X)
+        chunksize = chunksize or self.ASSIGN_CHUNKSIZE
+        columns = self._feature_columns(data)
+        centers = self.model.cluster_centers_
+        centers_sq = (centers ** 2).sum(axis=1)
+        n = len(data)
         
-        # Predecir
-        cluster = self.model.predict(X_scaled)[0]
+        labels = np.empty(n, dtype='int32')
+        distances = np.empty((n, len(centers)))
         
-        return int(cluster)
+        for start in range(0, n, chunksize):
+            block = slice(start, start + chunksize)
+            X = (self._take_rows(columns, block) - self.scaler.mean_) / self.scaler.scale_
+            
+            # ||x - c||² = ||x||² - 2 x·c + ||c||²
+            sq = (X ** 2).sum(axis=1)[:, None] - 2 * X @ centers.T + centers_sq
+            np.sqrt(np.maximum(sq, 0), out=distances[block])
+            labels[block] = distances[block].argmin(axis=1)
+        
+        return {
+            'labels': labels,
+            'distancias': distances
+        }
     
-    def get_optimal_k(self, data, k_range=range(2, 11)):
+    def update_assignments(self, data, positions):
+        """
+        Reasigna el cluster solo de las filas indicadas, sin reentrenar
+        
+        Pensado para cargas incrementales: las filas nuevas se agregan al
+        final y las posiciones existentes se conservan.
+        
+        Args:
+            data: DataFrame completo actualizado
+            positions: Posiciones de fila insertadas o modificadas
+            
+        Returns:
+            dict con labels y distribucion actualizados
+        """
+        if self.model is None:
+            raise ValueError('Debe entrenar el modelo primero')
+        
+        labels = np.zeros(len(data), dtype=self.labels_.dtype)
+        n_previous = min(len(self.labels_), len(data))
+        labels[:n_previous] = self.labels_[:n_previous]
+        
+        if len(positions) > 0:
+            labels[positions] = self.assign_clusters(data.iloc[positions])['labels']
+            
+            if self.similarity_index is not None:
+                self.similarity_index.update(
+                    positions,
+                    self.scaler.transform(self._take_rows(self._feature_columns(data), positions))
+                )
+        
+        self.labels_ = labels
+        
+        return {
+            'labels': labels,
+            'distribucion': self._analyze_distribution(data, labels)
+        }
+    
+    def find_similar(self, student=None, position=None, n_vecinos=5):
+        """
+        Busca los estudiantes de comportamiento más parecido
+        
+        Usa el índice espacial construido al entrenar (KD-tree sobre las
+        features normalizadas), sin recorrer el dataset.
+        
+        Args:
+            student: Features de un estudiante (Series o dict) a consultar
+            position: Posición de fila de un estudiante ya cargado
+                (se excluye de los resultados)
+            n_vecinos: Cantidad de estudiantes similares
+            
+        Returns:
+            dict con posiciones y distancias de los similares, y el cluster
+            más cercano al punto consultado
+        """
+        if self.similarity_index is None:
+            raise ValueError('Debe entrenar el modelo primero')
+        
+        if position is not None:
+            x = self.similarity_index.vector(position)
+        elif student is not None:
+            row = pd.DataFrame([dict(student)])
+            missing = [f for f in self.FEATURES_FOR_CLUSTERING if f not in row.columns]
+            if missing:
+                raise ValueError(f'Faltan columnas: {", ".join(missing)}')
+            x = self.scaler.transform(row[self.FEATURES_FOR_CLUSTERING].to_numpy(dtype='float64'))[0]
+        else:
+            raise ValueError('Debe indicar un estudiante o una posición')
+        
+        positions, distances = self.similarity_index.query(x, n_vecinos, exclude=position)
+        cluster, distance = self.similarity_index.nearest_centroid(x)
+        
+        return {
+            'posiciones': positions,
+            'distancias': distances,
+            'cluster': cluster,
+            'distancia_centroide': distance
+        }
+    
+    @staticmethod
+    def _fingerprint(X, random_state, max_iter):
+        """Huella de la matriz de features y parámetros del entrenamiento"""
+        digest = hashlib.sha1(np.ascontiguousarray(X, dtype='float64').tobytes())
+        digest.update(f'{X.shape}|{random_state}|{max_iter}'.encode())
+        return digest.hexdigest()
+    
+    def _get_sweep_result(self, X, k, random_state, max_iter):
+        """Modelo ya entrenado por get_optimal_k para estos datos y K"""
+        if self._sweep_cache is None or k not in self._sweep_cache['resultados']:
+            return None
+        
+        if self._sweep_cache['huella'] != self._fingerprint(X, random_state, max_iter):
+            return None
+        
+        return self._sweep_cache['resultados'][k]
+    
+    def get_optimal_k(self, data, k_range=range(2, 11), random_state=42, max_iter=300,
+                      n_jobs=-1, progress=None):
         """
         Encuentra el número óptimo de clusters usando método del codo
         
+        Cada K se entrena en paralelo en un pool de procesos que comparte
+        la matriz normalizada en solo lectura. Los modelos quedan en caché,
+        de modo que fit_predict con uno de esos K no vuelve a entrenar.
+        El escalador del modelo activo no se modifica.
+        
         Args:
             data: DataFrame con datos
             k_range: Rango de valores K a evaluar
+            random_state: Semilla aleatoria para reproducibilidad
+            max_iter: Máximo número de iteraciones
+            n_jobs: Procesos del pool (-1 = todos los núcleos)
+            progress: Función opcional llamada con (completados, total)
             
         Returns:
             dict con métricas para cada K
         """
         X = data[self.FEATURES_FOR_CLUSTERING].values
-        X_scaled = self.scaler.fit_transform(X)
+        ks = [k for k in k_range if 1 < k <= len(data)]
+        fingerprint = self._fingerprint(X, random_state, max_iter)
         
-        results = []
+        if self._sweep_cache is None or self._sweep_cache['huella'] != fingerprint:
+            scaler = StandardScaler().fit(X)
+            self._sweep_cache = {
+                'huella': fingerprint,
+                'scaler': scaler,
+                'resultados': {}
+            }
         
-        for k in k_range:
-            if k > len(data):
-                continue
+        cache = self._sweep_cache
+        pending = [k for k in ks if k not in cache['resultados']]
+        done = len(ks) - len(pending)
+        
+        if progress:
+            progress(done, len(ks))
+        
+        if pending:
+            X_scaled = cache['scaler'].transform(X)
             
-            model = KMeans(n_clusters=k, random_state=42, n_init=10)
-            labels = model.fit_predict(X_scaled)
+            # Con pocos registros el arranque del pool cuesta más que el barrido
+            if len(data) < self.SWEEP_PARALLEL_MIN_ROWS:
+                n_jobs = 1
             
-            inertia = model.inertia_
-            silhouette = silhouette_score(X_scaled, labels) if k > 1 else 0
+            runner = Parallel(
+                n_jobs=n_jobs,
+                max_nbytes='1M',
+                mmap_mode='r',
+                return_as='generator_unordered'
+            )
+            tasks = runner(
+                delayed(_fit_k)(
+                    X_scaled, k, random_state, max_iter, self.silhouette_engine,
+                    self._kmeans_class_for(len(X))
+                )
+                for k in pending
+            )
             
+            for k, model, labels, silhouette in tasks:
+                cache['resultados'][k] = {
+                    'model': model,
+                    'labels': labels,
+                    'silhouette': silhouette
+                }
+                done += 1
+                if progress:
+                    progress(done, len(ks))
+        
+        results = []
+        
+        for k in ks:
+            entry = cache['resultados'][k]
             results.append({
                 'k': k,
-                'inertia': float(inertia),
-                'silhouette': float(silhouette)
+                'inertia': float(entry['model'].inertia_),
+                'silhouette': entry['silhouette']['valor'],
+                'silhouette_modo': entry['silhouette']['modo']
             })
         
         return results
     
+    def bootstrap_stability(self, data, n_bootstrap=50, random_state=42, max_iter=300,
+                            n_jobs=-1):
+        """
+        Analiza la estabilidad del clustering con réplicas bootstrap
+        
+        Cada réplica reentrena K-means en un proceso del pool sobre la misma
+        matriz normalizada (compartida en solo lectura); las réplicas son
+        pesos por fila, por lo que la memoria no crece con n_bootstrap.
+        
+        Args:
+            data: DataFrame con los datos del clustering actual
+            n_bootstrap: Cantidad de réplicas (entre 2 y MAX_BOOTSTRAP)
+            random_state: Semilla de las réplicas
+            max_iter: Máximo número de iteraciones
+            n_jobs: Procesos del pool (-1 = todos los núcleos)
+            
+        Returns:
+            dict con Jaccard por cluster (media, desvío, nivel) y confianza
+            de asignación por estudiante
+        """
+        if self.model is None:
+            raise ValueError('Debe entrenar el modelo primero')
+        
+        if not 2 <= n_bootstrap <= self.MAX_BOOTSTRAP:
+            raise ValueError(
+                f'n_bootstrap debe estar entre 2 y {self.MAX_BOOTSTRAP}'
+            )
+        
+        X_scaled = self.scaler.transform(data[self.FEATURES_FOR_CLUSTERING].values)
+        reference_centers = self.model.cluster_centers_
+        reference_labels = self.assign_clusters(data)['labels']
+        seeds = np.random.default_rng(random_state).integers(0, 2**31 - 1, n_bootstrap)
+        
+        # Con pocos registros el arranque del pool cuesta más que las réplicas
+        if len(data) < self.SWEEP_PARALLEL_MIN_ROWS:
+            n_jobs = 1
+        
+        runner = Parallel(
+            n_jobs=n_jobs,
+            max_nbytes='1M',
+            mmap_mode='r',
+            return_as='generator_unordered'
+        )
+        tasks = runner(
+            delayed(_bootstrap_run)(
+                X_scaled, reference_labels, reference_centers, int(seed), max_iter,
+                self._kmeans_class_for(len(X_scaled))
+            )
+            for seed in seeds
+        )
+        
+        # Acumulación en línea: solo se guarda un vector por estudiante
+        jaccard = np.empty((n_bootstrap, len(reference_centers)))
+        agreement = np.zeros(len(data))
+        for i, (replica_jaccard, matches) in enumerate(tasks):
+            jaccard[i] = replica_jaccard
+            agreement += matches
+        
+        confianza = agreement / n_bootstrap
+        
+        clusters = {}
+        for cluster in range(len(reference_centers)):
+            media = float(jaccard[:, cluster].mean())
+            clusters[f'cluster_{cluster}'] = {
+                'jaccard_medio': media,
+                'jaccard_desvio': float(jaccard[:, cluster].std(ddof=1)),
+                'nivel': next(label for limit, label in self.STABILITY_LEVELS if media >= limit)
+            }
+        
+        return {
+            'n_bootstrap': n_bootstrap,
+            'clusters': clusters,
+            'confianza': confianza,
+            'confianza_media': float(confianza.mean()),
+            'estudiantes_inestables': int((confianza < 0.5).sum())
+        }
+    
     def get_cluster_characteristics(self, data, labels):
         """Obtiene características detalladas de cada cluster"""
+        stats = self.get_cluster_stats(data, labels)
         characteristics = []
         
-        for cluster_id in np.unique(labels):
-            mask = labels == cluster_id
-            cluster_data = data[mask]
-            
+        for i, cluster_id in enumerate(stats['clusters']):
             chars = {
                 'cluster_id': int(cluster_id),
-                'tamaño': int(mask.sum()),
-                'porcentaje': float(mask.sum() / len(labels) * 100),
+                'tamaño': int(stats['cantidad'][i]),
+                'porcentaje': float(stats['cantidad'][i] / len(labels) * 100),
                 'estadisticas': {}
             }
             
-            # Calcular estadísticas por feature
+            # Estadísticas por feature ya agregadas
             for feature in self.FEATURES_FOR_CLUSTERING:
                 chars['estadisticas'][feature] = {
-                    'promedio': float(cluster_data[feature].mean()),
-                    'mediana': float(cluster_data[feature].median()),
-                    'min': float(cluster_data[feature].min()),
-                    'max': float(cluster_data[feature].max()),
-                    'desv_std': float(cluster_data[feature].std())
+                    name: float(values[i])
+                    for name, values in stats['features'][feature].items()
                 }
             
             characteristics.append(chars)
         
-        return characteristics
\ No newline at end of file
+        return characteristics
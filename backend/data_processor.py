@@ -6,8 +6,16 @@ Maneja la carga, validación y limpieza de archivos CSV
 import pandas as pd
 import numpy as np
 from datetime import datetime
+from collections import Counter
+import hashlib
+import json
+import os
 import re
 
+from backend.event_log import EventLogAggregator
+from backend.streaming_stats import StatisticsAccumulator
+from backend.query_engine import QueryEngine
+
 class DataProcessor:
     """Clase para procesar y validar datos de logs de Moodle"""
     
@@ -20,45 +28,412 @@ class DataProcessor:
         'calificacion_final'
     ]
     
-    def __init__(self):
+    # Columnas que no admiten valores negativos
+    NON_NEGATIVE_COLUMNS = [
+        'actividades_completadas',
+        'tiempo_plataforma_horas',
+        'entregas_tarde',
+        'foros_participacion'
+    ]
+    
+    # Reglas de validación por fila; cada una ocupa un bit de la máscara
+    VALIDATION_RULES = (
+        ['calificaciones_invalidas'] +
+        [f'negativos_{col}' for col in NON_NEGATIVE_COLUMNS] +
+        ['duplicados', 'fechas_futuras']
+    )
+    
+    # Cantidad mínima de registros para un análisis estadístico válido
+    MIN_RECORDS = 50
+    
+    # Máximo de índices de ejemplo reportados por regla
+    MAX_SAMPLE_ROWS = 20
+    
+    # Tamaño de bloque (filas) para la ingesta en modo streaming
+    DEFAULT_CHUNKSIZE = 50000
+    
+    SCHEMA_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'schema.json')
+    
+    # Subir al cambiar las reglas de limpieza, validación o compactación:
+    # invalida los datasets ya procesados en la caché
+    PROCESSING_VERSION = 1
+    
+    # Tipos del esquema -> dtypes de pandas (enteros anulables hasta limpiar)
+    SCHEMA_DTYPES = {
+        'string': 'str',
+        'integer': 'Int64',
+        'number': 'float64'
+    }
+    
+    _schema_columns = None
+    _schema_dtypes = None
+    
+    # Columnas de conteo que admiten enteros reducidos (int16/int32)
+    COUNT_COLUMNS = [
+        'actividades_completadas',
+        'entregas_tarde',
+        'foros_participacion'
+    ]
+    
+    # Columnas decimales que se guardan como float32 en modo compacto
+    FLOAT_COLUMNS = [
+        'tiempo_plataforma_horas',
+        'calificacion_final'
+    ]
+    
+    # Columnas con estadísticas incrementales (momentos y cuantiles)
+    STATISTICS_COLUMNS = [
+        'actividades_completadas',
+        'tiempo_plataforma_horas',
+        'entregas_tarde',
+        'foros_participacion',
+        'calificacion_final'
+    ]
+    
+    # Umbrales por defecto de cada método de detección de outliers
+    OUTLIER_THRESHOLDS = {
+        'zscore': 3.0,
+        'mad': 3.5,
+        'iqr': 1.5
+    }
+    
+    # Factores para que MAD / desvío absoluto medio estimen el desvío estándar
+    MAD_SCALE = 1.4826
+    MEAN_AD_SCALE = 1.2533
+    
+    def __init__(self, compact=False):
+        """
+        Args:
+            compact: Si es True, los datos cargados se guardan con la
+                representación compacta (ver to_compact)
+        """
         self.data = None
         self.validation_errors = []
+        self.compact = compact
+        self.last_changes = None
+        self.stats = None
+        self._id_index = None
+        self._memory_footprint = None
+        self._outlier_params = {}
+        self._query_engine = None
     
-    def process_csv(self, file):
+    def process_csv(self, file, chunksize=None):
         """
         Procesa y valida un archivo CSV
         
         Args:
             file: Archivo CSV cargado
+            chunksize: Si se indica, el archivo se lee en bloques de ese
+                tamaño (modo streaming para exportaciones grandes)
             
         Returns:
             tuple: (DataFrame, dict con resultado de validación)
         """
         try:
-            # Leer CSV con encoding UTF-8
-            df = pd.read_csv(file, encoding='utf-8')
+            try:
+                return self._process_csv_file(file, chunksize, typed=True)
+            except UnicodeDecodeError:
+                raise
+            except ValueError:
+                # Valores no numéricos en columnas tipadas: releer sin dtypes
+                # para que la limpieza los convierta como antes
+                file.seek(0)
+                return self._process_csv_file(file, chunksize, typed=False)
             
-            # Validar estructura
-            validation_result = self._validate_structure(df)
+        except UnicodeDecodeError:
+            return None, {
+                'valid': False,
+                'error': 'Error de encoding. Asegúrese de que el archivo esté en formato UTF-8'
+            }
+        except Exception as e:
+            return None, {
+                'valid': False,
+                'error': f'Error al procesar archivo: {str(e)}'
+            }
+    
+    def _process_csv_file(self, file, chunksize, typed):
+        """Lee, limpia y valida el CSV (completo o por bloques)"""
+        read_options = self._get_read_options(typed)
+        
+        if chunksize:
+            return self._process_csv_chunked(file, chunksize, read_options)
+        
+        # Leer CSV con encoding UTF-8
+        df = pd.read_csv(file, encoding='utf-8', **read_options)
+        
+        # Validar estructura
+        validation_result = self._validate_structure(df)
+        
+        if not validation_result['valid']:
+            return None, validation_result
+        
+        # Limpiar y transformar datos
+        df = self._clean_data(df)
+        
+        # Validar datos
+        validation_result = self._validate_data(df)
+        
+        if not validation_result['valid']:
+            return None, validation_result
+        
+        df = self.set_data(df)
+        
+        return df, {
+            'valid': True,
+            'message': 'Datos procesados correctamente',
+            'registros': len(df)
+        }
+    
+    def process_delta_csv(self, file):
+        """
+        Procesa un CSV incremental y lo fusiona con los datos cargados
+        
+        Los estudiantes nuevos se insertan y los existentes se actualizan
+        (upsert por estudiante_id). El archivo puede tener menos de 50
+        registros; no se admiten estudiante_id repetidos dentro del delta.
+        
+        Args:
+            file: Archivo CSV con los registros nuevos o modificados
+            
+        Returns:
+            tuple: (DataFrame fusionado, dict con resultado y cambios)
+        """
+        if self.data is None:
+            return None, {
+                'valid': False,
+                'error': 'No hay datos cargados para actualizar'
+            }
+        
+        try:
+            try:
+                delta = pd.read_csv(file, encoding='utf-8', **self._get_read_options())
+            except UnicodeDecodeError:
+                raise
+            except ValueError:
+                file.seek(0)
+                delta = pd.read_csv(file, encoding='utf-8',
+                                    **self._get_read_options(typed=False))
             
+            validation_result = self._validate_structure(delta)
             if not validation_result['valid']:
                 return None, validation_result
             
-            # Limpiar y transformar datos
-            df = self._clean_data(df)
+            delta = self._clean_data(delta)
             
-            # Validar datos
-            validation_result = self._validate_data(df)
+            validation_result = self._validate_data(delta, min_records=1)
+            if not validation_result['valid']:
+                return None, validation_result
+            
+            df, cambios = self.merge_delta(delta)
+            
+            return df, {
+                'valid': True,
+                'message': 'Datos actualizados correctamente',
+                'registros': len(df),
+                'cambios': cambios
+            }
+            
+        except UnicodeDecodeError:
+            return None, {
+                'valid': False,
+                'error': 'Error de encoding. Asegúrese de que el archivo esté en formato UTF-8'
+            }
+        except Exception as e:
+            return None, {
+                'valid': False,
+                'error': f'Error al procesar archivo incremental: {str(e)}'
+            }
+    
+    def _get_id_index(self):
+        """Índice hash estudiante_id -> posición de fila en self.data"""
+        if self._id_index is None:
+            self._id_index = pd.Index(self.data['estudiante_id'].astype(str).to_numpy())
+        return self._id_index
+    
+    def find_position(self, estudiante_id):
+        """Posición de fila de un estudiante, o None si no está cargado"""
+        if self.data is None:
+            return None
+        
+        position = self._get_id_index().get_indexer([str(estudiante_id)])[0]
+        return int(position) if position >= 0 else None
+    
+    def merge_delta(self, delta):
+        """
+        Fusiona registros validados con el dataset actual (upsert)
+        
+        El conjunto de cambios permite recalcular solo lo afectado: las
+        estadísticas incrementales se actualizan acá, el clustering reasigna
+        posiciones_afectadas y la regresión en modo 'estadisticas' resta
+        filas_anteriores y suma las filas nuevas (ver app.upload_delta).
+        Los parámetros de outliers (percentiles) y el índice de consultas no
+        admiten una actualización exacta por posición: se invalidan y se
+        reconstruyen en la siguiente consulta.
+        
+        Args:
+            delta: DataFrame limpio y validado
+            
+        Returns:
+            tuple: (DataFrame fusionado, dict con el conjunto de cambios:
+            insertados, actualizados, sin_cambios, posiciones_afectadas
+            (actualizadas y luego insertadas) y filas_anteriores)
+        """
+        existing = self.data
+        index = self._get_id_index()
+        
+        delta_ids = delta['estudiante_id'].astype(str).to_numpy()
+        positions = index.get_indexer(delta_ids)
+        matched = positions >= 0
+        
+        # Comparar valores de los estudiantes ya existentes
+        columns = [col for col in existing.columns
+                   if col in delta.columns and col != 'estudiante_id']
+        matched_positions = positions[matched]
+        changed = np.zeros(matched.sum(), dtype=bool)
+        
+        for col in columns:
+            old = existing[col].to_numpy()[matched_positions]
+            new = delta[col].to_numpy()[matched]
+            if existing[col].dtype != delta[col].dtype and pd.api.types.is_numeric_dtype(existing[col]):
+                new = new.astype(existing[col].dtype)
+            changed |= ~((old == new) | (pd.isna(old) & pd.isna(new)))
+        
+        updated_positions = matched_positions[changed]
+        previous_rows = existing.iloc[updated_positions]
+        
+        # Aplicar actualizaciones sobre una copia (el original puede ser de solo lectura)
+        merged = existing.copy()
+        updates = delta.loc[matched][changed]
+        for col in columns:
+            values = updates[col].to_numpy()
+            if pd.api.types.is_numeric_dtype(merged[col]):
+                values = values.astype(merged[col].dtype)
+            merged.iloc[updated_positions, merged.columns.get_loc(col)] = values
+        
+        # Insertar estudiantes nuevos al final
+        inserts = delta.loc[~matched].reindex(columns=existing.columns)
+        start = int(existing.index.max()) + 1 if len(existing) else 0
+        inserts.index = pd.RangeIndex(start, start + len(inserts))
+        if len(inserts):
+            merged = pd.concat([merged, inserts])
+        
+        # Estadísticas incrementales: altas para inserciones, reemplazo para cambios
+        stats = self.stats
+        if len(inserts):
+            stats.update(inserts)
+        if len(updated_positions):
+            stats.replace(previous_rows, merged.iloc[updated_positions], merged)
+        
+        inserted_ids = delta_ids[~matched]
+        merged = self.set_data(merged, stats=stats)
+        
+        # Las posiciones existentes no cambian: el índice se extiende
+        self._id_index = index.append(pd.Index(inserted_ids))
+        
+        inserted_positions = np.arange(len(existing), len(merged))
+        
+        cambios = {
+            'insertados': inserted_ids.tolist(),
+            'actualizados': delta_ids[matched][changed].tolist(),
+            'sin_cambios': delta_ids[matched][~changed].tolist(),
+            'posiciones_afectadas': np.concatenate([updated_positions, inserted_positions]),
+            'filas_anteriores': previous_rows
+        }
+        self.last_changes = cambios
+        
+        return merged, cambios
+    
+    @classmethod
+    def _load_schema(cls):
+        """Carga columnas y tipos desde data/schema.json (una sola vez)"""
+        if cls._schema_columns is None:
+            with open(cls.SCHEMA_PATH, encoding='utf-8') as f:
+                properties = json.load(f)['properties']
+            
+            required = properties['columnas_requeridas']['items']['enum']
+            optional = properties['columnas_opcionales']['items']['enum']
+            definitions = properties['definiciones']['properties']
             
+            cls._schema_dtypes = {
+                col: cls.SCHEMA_DTYPES[definition['properties']['tipo']['const']]
+                for col, definition in definitions.items()
+            }
+            cls._schema_columns = frozenset(required) | frozenset(optional)
+        
+        return cls._schema_columns, cls._schema_dtypes
+    
+    def format_version(self):
+        """
+        Versión del procesamiento: hash del esquema, PROCESSING_VERSION y
+        el modo compacto (clave de la caché de datasets)
+        """
+        digest = hashlib.sha256()
+        with open(self.SCHEMA_PATH, 'rb') as f:
+            digest.update(f.read())
+        digest.update(f':{self.PROCESSING_VERSION}:{self.compact}'.encode('utf-8'))
+        return digest.hexdigest()[:16]
+    
+    def _get_read_options(self, typed=True):
+        """
+        Opciones de pd.read_csv derivadas del esquema
+        
+        Solo se cargan las columnas requeridas y opcionales; con typed=True
+        las columnas numéricas se parsean directamente a su tipo final.
+        """
+        columns, dtypes = self._load_schema()
+        
+        options = {
+            'usecols': lambda col: col in columns,
+            'engine': 'c'
+        }
+        if typed:
+            options['dtype'] = dtypes
+        
+        return options
+    
+    def process_event_log(self, file, calificaciones=None, fechas_limite=None,
+                          chunksize=None):
+        """
+        Procesa el log crudo de eventos de Moodle (logstore_standard_log)
+        
+        Args:
+            file: Archivo CSV con el log de eventos
+            calificaciones: Diccionario o Serie {userid: calificación final}
+            fechas_limite: Diccionario {contextinstanceid: timestamp unix}
+            chunksize: Filas por bloque de lectura
+            
+        Returns:
+            tuple: (DataFrame, dict con resultado de validación)
+        """
+        try:
+            aggregator = EventLogAggregator(fechas_limite=fechas_limite)
+            df = aggregator.aggregate(file, calificaciones, chunksize=chunksize)
+            
+            # Con archivo de calificaciones, los estudiantes que no figuran no
+            # entran al análisis (un 0 sesgaría el target de la regresión);
+            # sin archivo no hay target y la columna queda en 0
+            missing = df['calificacion_final'].isna()
+            sin_calificacion = int(missing.sum()) if calificaciones is not None else 0
+            if calificaciones is None:
+                df['calificacion_final'] = 0.0
+            elif sin_calificacion:
+                df = df[~missing.to_numpy()].reset_index(drop=True)
+            
+            validation_result = self._validate_structure(df)
             if not validation_result['valid']:
                 return None, validation_result
             
-            self.data = df
+            validation_result = self._validate_data(df)
+            if not validation_result['valid']:
+                return None, validation_result
+            
+            df = self.set_data(df)
             
             return df, {
                 'valid': True,
-                'message': 'Datos procesados correctamente',
-                'registros': len(df)
+                'message': 'Log de eventos agregado correctamente',
+                'registros': len(df),
+                'sin_calificacion': sin_calificacion
             }
             
         except UnicodeDecodeError:
@@ -69,9 +444,116 @@ class DataProcessor:
         except Exception as e:
             return None, {
                 'valid': False,
-                'error': f'Error al procesar archivo: {str(e)}'
+                'error': f'Error al procesar log de eventos: {str(e)}'
             }
     
+    def _process_csv_chunked(self, file, chunksize, read_options):
+        """
+        Procesa el CSV en bloques de tamaño fijo
+        
+        Cada bloque se limpia y valida al llegar, acumulando contadores de
+        errores, y se copia a columnas preasignadas que crecen al doble
+        cuando se llenan: los bloques no se guardan ni se concatenan, así que
+        la memoria máxima es la del DataFrame final más una columna.
+        """
+        reader = pd.read_csv(file, encoding='utf-8', chunksize=chunksize, **read_options)
+        
+        columns = None
+        counts = None
+        total = 0
+        stats = StatisticsAccumulator(self.STATISTICS_COLUMNS)
+        
+        for chunk in reader:
+            # La estructura se valida sobre el primer bloque
+            if counts is None:
+                validation_result = self._validate_structure(chunk)
+                if not validation_result['valid']:
+                    return None, validation_result
+                counts = Counter()
+                samples = {}
+            
+            chunk = self._clean_data(chunk)
+            
+            # Contadores acumulados de errores (los duplicados se cuentan al final)
+            chunk_counts, chunk_samples = self._count_data_errors(chunk)
+            counts.update(chunk_counts)
+            for rule, rows in chunk_samples.items():
+                kept = samples.setdefault(rule, [])
+                kept.extend(rows[:self.MAX_SAMPLE_ROWS - len(kept)])
+            
+            stats.update(chunk)
+            
+            if columns is None:
+                dtypes = chunk.dtypes
+                columns = {col: np.empty(0, dtype=chunk[col].to_numpy().dtype) for col in chunk}
+                index = np.empty(0, dtype='int64')
+            for col in chunk:
+                columns[col] = self._write_rows(columns[col], chunk[col].to_numpy(), total)
+            index = self._write_rows(index, chunk.index.to_numpy(), total)
+            total += len(chunk)
+        
+        if counts is None:
+            return None, self._validate_structure(pd.DataFrame())
+        
+        # Registros con estudiante_id repetido (equivalente a keep=False); la
+        # muestra son las primeras filas repetidas, como en la lectura completa
+        codes, uniques = pd.factorize(columns['estudiante_id'][:total])
+        id_counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+        counts['duplicados'] = int(id_counts[id_counts > 1].sum())
+        if counts['duplicados'] > 0:
+            repeated = np.flatnonzero((id_counts[codes] > 1) & (codes >= 0))
+            samples['duplicados'] = index[repeated[:self.MAX_SAMPLE_ROWS]].tolist()
+        
+        validation_result = self._build_validation_result(total, dict(counts), samples)
+        
+        if not validation_result['valid']:
+            return None, validation_result
+        
+        # Se recorta cada columna a las filas usadas, de a una por vez
+        data = {}
+        for col, dtype in dtypes.items():
+            values = columns.pop(col)
+            values = values[:total].copy() if len(values) > total else values
+            data[col] = values if isinstance(dtype, np.dtype) else pd.array(values, dtype=dtype)
+        
+        # Índice de filas del archivo (con huecos si la limpieza descartó filas)
+        if total and index[total - 1] == total - 1:
+            index = pd.RangeIndex(total)
+        else:
+            index = pd.Index(index[:total])
+        
+        df = pd.DataFrame(data, index=index, copy=False)
+        df = self.set_data(df, stats=stats)
+        
+        return df, {
+            'valid': True,
+            'message': 'Datos procesados correctamente',
+            'registros': len(df)
+        }
+    
+    @staticmethod
+    def _write_rows(buffer, values, start):
+        """
+        Copia un bloque en buffer[start:]
+        
+        Si no entra, el buffer se amplía al doble; si el bloque trae un tipo
+        más amplio (p. ej. float en una columna entera), se promueve como
+        haría pd.concat.
+        
+        Returns:
+            El buffer (el mismo o uno nuevo)
+        """
+        end = start + len(values)
+        dtype = np.result_type(buffer.dtype, values.dtype)
+        
+        if end > len(buffer) or dtype != buffer.dtype:
+            grown = np.empty(max(end, 2 * len(buffer)), dtype=dtype)
+            grown[:start] = buffer[:start]
+            buffer = grown
+        
+        buffer[start:end] = values
+        return buffer
+    
     def _validate_structure(self, df):
         """Valida la estructura del DataFrame"""
         errors = []
@@ -116,7 +598,9 @@ class DataProcessor:
         ]
         
         for col in numeric_columns:
-            df[col] = pd.to_numeric(df[col], errors='coerce')
+            # Las columnas ya tipadas por el lector no se vuelven a parsear
+            if not pd.api.types.is_numeric_dtype(df[col]):
+                df[col] = pd.to_numeric(df[col], errors='coerce')
         
         # Eliminar filas con valores nulos en columnas críticas
         df = df.dropna(subset=['estudiante_id'])
@@ -124,109 +608,262 @@ class DataProcessor:
         # Rellenar valores nulos numéricos con 0
         df[numeric_columns] = df[numeric_columns].fillna(0)
         
+        # Enteros anulables del lector tipado -> int64
+        for col in numeric_columns:
+            if isinstance(df[col].dtype, pd.Int64Dtype):
+                df[col] = df[col].astype('int64')
+        
         return df
     
-    def _validate_data(self, df):
+    def _validate_data(self, df, min_records=MIN_RECORDS):
         """Valida la calidad de los datos"""
+        counts, samples = self._count_data_errors(df, check_duplicates=True)
+        
+        return self._build_validation_result(len(df), counts, samples, min_records)
+    
+    def _error_bitfield(self, df, check_duplicates=False):
+        """
+        Evalúa todas las reglas de validación en una sola pasada
+        
+        Returns:
+            numpy array uint8 con un bit por regla (ver VALIDATION_RULES)
+        """
+        bits = np.zeros(len(df), dtype=np.uint8)
+        shifted = np.empty_like(bits)
+        
+        def set_bit(mask, rule):
+            # Las máscaras booleanas se reinterpretan como uint8 sin copiar
+            np.left_shift(mask.view(np.uint8), self.VALIDATION_RULES.index(rule), out=shifted)
+            np.bitwise_or(bits, shifted, out=bits)
+        
+        # Validar rangos de calificaciones
+        grades = df['calificacion_final'].to_numpy()
+        set_bit((grades < 0) | (grades > 10), 'calificaciones_invalidas')
+        
+        # Validar valores negativos
+        for col in self.NON_NEGATIVE_COLUMNS:
+            set_bit(df[col].to_numpy() < 0, f'negativos_{col}')
+        
+        # Validar duplicados
+        if check_duplicates:
+            codes, uniques = pd.factorize(df['estudiante_id'])
+            repeated = np.bincount(codes[codes >= 0], minlength=len(uniques)) > 1
+            set_bit(repeated[codes] & (codes >= 0), 'duplicados')
+        
+        # Validar fechas futuras si hay columna timestamp
+        if 'timestamp' in df.columns:
+            try:
+                df['timestamp'] = pd.to_datetime(df['timestamp'])
+                set_bit((df['timestamp'] > datetime.now()).to_numpy(), 'fechas_futuras')
+            except:
+                pass  # Si no se puede parsear timestamp, continuar
+        
+        return bits
+    
+    def _count_data_errors(self, df, check_duplicates=False):
+        """
+        Cuenta los registros que incumplen cada regla
+        
+        Returns:
+            tuple: (dict regla -> cantidad, dict regla -> muestra de índices)
+        """
+        bits = self._error_bitfield(df, check_duplicates)
+        
+        # Histograma de combinaciones de bits: una sola pasada para todos los conteos
+        histogram = np.bincount(bits, minlength=256)
+        combinations = np.arange(256)
+        
+        counts = {}
+        samples = {}
+        for bit, rule in enumerate(self.VALIDATION_RULES):
+            counts[rule] = int(histogram[(combinations >> bit) & 1 == 1].sum())
+            if counts[rule] > 0:
+                rows = np.flatnonzero(bits & (1 << bit))[:self.MAX_SAMPLE_ROWS]
+                samples[rule] = df.index[rows].tolist()
+        
+        return counts, samples
+    
+    def _build_validation_result(self, total, counts, samples=None,
+                                 min_records=MIN_RECORDS):
+        """Arma el resultado de validación a partir de los contadores"""
         errors = []
         
         # Validar cantidad mínima de registros
-        if len(df) < 50:
+        if total < min_records:
             return {
                 'valid': False,
                 'error': 'Datos insuficientes',
                 'details': [
-                    f'Registros encontrados: {len(df)}',
-                    'Mínimo requerido: 50 registros',
-                    'El análisis estadístico requiere al menos 50 estudiantes'
+                    f'Registros encontrados: {total}',
+                    f'Mínimo requerido: {min_records} registros',
+                    f'El análisis estadístico requiere al menos {min_records} estudiantes'
                 ]
             }
         
-        # Validar rangos de calificaciones
-        invalid_grades = df[
-            (df['calificacion_final'] < 0) | 
-            (df['calificacion_final'] > 10)
-        ]
-        
-        if len(invalid_grades) > 0:
+        if counts['calificaciones_invalidas'] > 0:
             errors.append(
-                f'{len(invalid_grades)} registros con calificaciones fuera del rango 0-10'
+                f'{counts["calificaciones_invalidas"]} registros con calificaciones fuera del rango 0-10'
             )
         
-        # Validar valores negativos
-        numeric_columns = [
-            'actividades_completadas',
-            'tiempo_plataforma_horas',
-            'entregas_tarde',
-            'foros_participacion'
-        ]
-        
-        for col in numeric_columns:
-            negative_values = df[df[col] < 0]
-            if len(negative_values) > 0:
+        for col in self.NON_NEGATIVE_COLUMNS:
+            if counts[f'negativos_{col}'] > 0:
                 errors.append(
-                    f'{len(negative_values)} registros con valores negativos en {col}'
+                    f'{counts[f"negativos_{col}"]} registros con valores negativos en {col}'
                 )
         
-        # Validar duplicados
-        duplicates = df[df.duplicated(subset=['estudiante_id'], keep=False)]
-        if len(duplicates) > 0:
+        if counts['duplicados'] > 0:
             errors.append(
-                f'{len(duplicates)} registros duplicados detectados (mismo estudiante_id)'
+                f'{counts["duplicados"]} registros duplicados detectados (mismo estudiante_id)'
             )
         
-        # Validar fechas futuras si hay columna timestamp
-        if 'timestamp' in df.columns:
-            try:
-                df['timestamp'] = pd.to_datetime(df['timestamp'])
-                future_dates = df[df['timestamp'] > datetime.now()]
-                
-                if len(future_dates) > 0:
-                    return {
-                        'valid': False,
-                        'error': 'Fechas futuras detectadas',
-                        'details': [
-                            f'{len(future_dates)} registros con timestamps en fechas futuras',
-                            'Los logs históricos no pueden contener fechas posteriores a la fecha actual'
-                        ]
-                    }
-            except:
-                pass  # Si no se puede parsear timestamp, continuar
+        if counts['fechas_futuras'] > 0:
+            return {
+                'valid': False,
+                'error': 'Fechas futuras detectadas',
+                'details': [
+                    f'{counts["fechas_futuras"]} registros con timestamps en fechas futuras',
+                    'Los logs históricos no pueden contener fechas posteriores a la fecha actual'
+                ],
+                'conteos': counts,
+                'filas_muestra': samples or {}
+            }
         
         if errors:
             return {
                 'valid': False,
                 'error': 'Errores de validación en los datos',
-                'details': errors
+                'details': errors,
+                'conteos': counts,
+                'filas_muestra': samples or {}
             }
         
         return {'valid': True}
     
+    def set_data(self, df, stats=None):
+        """
+        Registra un DataFrame ya validado (por ejemplo, desde la caché)
+        
+        Args:
+            df: DataFrame validado
+            stats: StatisticsAccumulator ya calculado sobre df; si no se
+                indica, se calcula en una pasada
+        """
+        if self.compact:
+            df = self.to_compact(df)
+        
+        if stats is None:
+            stats = StatisticsAccumulator(self.STATISTICS_COLUMNS)
+            stats.update(df)
+        
+        self.data = df
+        self.stats = stats
+        self._id_index = None
+        self._memory_footprint = None
+        self._outlier_params = {}
+        self._query_engine = None
+        return df
+    
+    def to_compact(self, df):
+        """
+        Convierte el dataset a una representación compacta en memoria
+        
+        - estudiante_id como categórica
+        - conteos como int16 o int32 según su rango
+        - horas y calificaciones como float32
+        
+        Args:
+            df: DataFrame validado
+            
+        Returns:
+            DataFrame compacto (el original no se modifica)
+        """
+        columns = {}
+        
+        for col in df.columns:
+            series = df[col]
+            
+            if col == 'estudiante_id':
+                series = series.astype('category')
+            elif col in self.COUNT_COLUMNS:
+                series = series.astype(self._smallest_int_dtype(series))
+            elif col in self.FLOAT_COLUMNS:
+                series = series.astype('float32')
+            
+            columns[col] = series
+        
+        return pd.DataFrame(columns, index=df.index)
+    
+    def _smallest_int_dtype(self, series):
+        """Menor tipo entero (int16/int32) que contiene todos los valores"""
+        if len(series) == 0:
+            return 'int16'
+        
+        low, high = series.min(), series.max()
+        for dtype in ('int16', 'int32'):
+            info = np.iinfo(dtype)
+            if info.min <= low and high <= info.max:
+                return dtype
+        
+        return series.dtype
+    
+    def get_memory_footprint(self, df=None):
+        """Memoria ocupada por el dataset, total y por columna"""
+        if df is None and self._memory_footprint is not None:
+            return self._memory_footprint
+        
+        target = self.data if df is None else df
+        if target is None:
+            return None
+        
+        usage = target.memory_usage(deep=True, index=False)
+        
+        footprint = {
+            'bytes_total': int(usage.sum()),
+            'por_columna': {col: int(n) for col, n in usage.items()},
+            'tipos': {col: str(dtype) for col, dtype in target.dtypes.items()},
+            'compacto': self.compact
+        }
+        
+        if df is None:
+            self._memory_footprint = footprint
+        
+        return footprint
+    
     def get_statistics(self):
-        """Obtiene estadísticas básicas de los datos"""
+        """
+        Obtiene estadísticas básicas de los datos
+        
+        Se responden desde el acumulador incremental, sin recorrer los datos;
+        las medianas son exactas hasta ~200 registros y aproximadas (KLL)
+        por encima.
+        """
         if self.data is None:
             return None
         
+        stats = self.stats
+        
         return {
-            'total_registros': len(self.data),
-            'estudiantes_unicos': self.data['estudiante_id'].nunique(),
+            'total_registros': stats.rows,
+            # Los estudiante_id duplicados se rechazan en la validación
+            'estudiantes_unicos': stats.rows,
             'promedios': {
-                'actividades': float(self.data['actividades_completadas'].mean()),
-                'tiempo_horas': float(self.data['tiempo_plataforma_horas'].mean()),
-                'entregas_tarde': float(self.data['entregas_tarde'].mean()),
-                'foros': float(self.data['foros_participacion'].mean()),
-                'calificacion': float(self.data['calificacion_final'].mean())
+                'actividades': stats.mean('actividades_completadas'),
+                'tiempo_horas': stats.mean('tiempo_plataforma_horas'),
+                'entregas_tarde': stats.mean('entregas_tarde'),
+                'foros': stats.mean('foros_participacion'),
+                'calificacion': stats.mean('calificacion_final')
             },
             'medianas': {
-                'actividades': float(self.data['actividades_completadas'].median()),
-                'tiempo_horas': float(self.data['tiempo_plataforma_horas'].median()),
-                'calificacion': float(self.data['calificacion_final'].median())
+                'actividades': stats.median('actividades_completadas'),
+                'tiempo_horas': stats.median('tiempo_plataforma_horas'),
+                'calificacion': stats.median('calificacion_final')
             },
             'desviaciones': {
-                'actividades': float(self.data['actividades_completadas'].std()),
-                'tiempo_horas': float(self.data['tiempo_plataforma_horas'].std()),
-                'calificacion': float(self.data['calificacion_final'].std())
-            }
+                'actividades': stats.std('actividades_completadas'),
+                'tiempo_horas': stats.std('tiempo_plataforma_horas'),
+                'calificacion': stats.std('calificacion_final')
+            },
+            'memoria': self.get_memory_footprint()
         }
     
     def filter_by_threshold(self, column, min_value=None, max_value=None):
@@ -234,27 +871,112 @@ class DataProcessor:
         if self.data is None:
             return None
         
-        filtered = self.data.copy()
+        positions = self.get_query_engine().where([(column, min_value, max_value)])
         
-        if min_value is not None:
-            filtered = filtered[filtered[column] >= min_value]
+        return self.data.iloc[positions]
+    
+    def get_query_engine(self):
+        """Motor de consultas indexadas sobre los datos cargados"""
+        if self.data is None:
+            return None
         
-        if max_value is not None:
-            filtered = filtered[filtered[column] <= max_value]
+        if self._query_engine is None:
+            self._query_engine = QueryEngine(self.data)
         
-        return filtered
+        return self._query_engine
     
     def get_outliers(self, column, n_std=3):
         """Detecta outliers usando desviación estándar"""
         if self.data is None:
             return None
         
-        mean = self.data[column].mean()
-        std = self.data[column].std()
+        result = self.detect_outliers([column], method='zscore', threshold=n_std)
         
-        outliers = self.data[
-            (self.data[column] > mean + n_std * std) |
-            (self.data[column] < mean - n_std * std)
-        ]
+        return self.data.iloc[result[column]['indices']]
+    
+    def _get_outlier_params(self, columns):
+        """
+        Centro y escala por columna para todos los métodos
+        
+        Se calculan una vez sobre la matriz de features y quedan en caché
+        hasta que cambian los datos.
+        """
+        key = tuple(columns)
+        if key not in self._outlier_params:
+            X = self.data[columns].to_numpy(dtype='float64')
+            
+            q1, median, q3 = np.percentile(X, [25, 50, 75], axis=0)
+            deviations = np.abs(X - median)
+            mad = np.median(deviations, axis=0)
+            
+            # Con MAD = 0 (columnas con muchos valores repetidos) se usa el
+            # desvío absoluto medio como escala robusta
+            robust_scale = np.where(
+                mad > 0,
+                self.MAD_SCALE * mad,
+                self.MEAN_AD_SCALE * deviations.mean(axis=0)
+            )
+            
+            self._outlier_params[key] = {
+                'zscore': (X.mean(axis=0), X.std(axis=0, ddof=1)),
+                'mad': (median, robust_scale),
+                'iqr': (median, q3 - q1),
+                'cuartiles': (q1, q3)
+            }
+        
+        return self._outlier_params[key]
+    
+    def detect_outliers(self, columns=None, method='mad', threshold=None):
+        """
+        Detecta outliers en varias columnas a la vez
+        
+        Args:
+            columns: Columnas numéricas a evaluar (por defecto todas)
+            method: 'zscore' (media/desvío), 'mad' (mediana/MAD) o
+                'iqr' (rango intercuartílico)
+            threshold: Cantidad de escalas (o de IQR) que define un outlier
+            
+        Returns:
+            dict por columna con centro, escala, límites y posiciones de
+            fila de los estudiantes marcados
+        """
+        if self.data is None:
+            return None
+        
+        if method not in self.OUTLIER_THRESHOLDS:
+            raise ValueError(
+                f'Método de outliers inválido: {method}. '
+                f'Opciones: {", ".join(self.OUTLIER_THRESHOLDS)}'
+            )
+        
+        columns = list(columns or self.STATISTICS_COLUMNS)
+        if threshold is None:
+            threshold = self.OUTLIER_THRESHOLDS[method]
+        
+        params = self._get_outlier_params(columns)
+        center, scale = params[method]
+        
+        if method == 'iqr':
+            q1, q3 = params['cuartiles']
+            lower, upper = q1 - threshold * scale, q3 + threshold * scale
+        else:
+            lower, upper = center - threshold * scale, center + threshold * scale
+        
+        # Una sola comparación vectorizada para todas las columnas
+        X = self.data[columns].to_numpy()
+        flagged = (X < lower) | (X > upper)
+        
+        results = {}
+        for j, col in enumerate(columns):
+            indices = np.flatnonzero(flagged[:, j])
+            results[col] = {
+                'metodo': method,
+                'centro': float(center[j]),
+                'escala': float(scale[j]),
+                'limite_inferior': float(lower[j]),
+                'limite_superior': float(upper[j]),
+                'cantidad': len(indices),
+                'indices': indices
+            }
         
-        return outliers
\ No newline at end of file
+        return results
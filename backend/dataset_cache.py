@@ -0,0 +1,212 @@
+"""
+Módulo de Caché de Datasets para SAEM
+Guarda datasets ya validados en formato columnar binario (.npy),
+direccionados por el hash del archivo original
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+
+class DatasetCache:
+    """Caché en disco de datasets validados con política de desalojo LRU"""
+
+    DEFAULT_DIR = os.path.join('data', 'cache')
+    DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+    HASH_BLOCK_SIZE = 1024 * 1024
+    META_FILE = 'meta.json'
+    INDEX_FILE = 'index.npy'
+
+    # Versión del formato de almacenamiento (.npy + meta.json); subirla
+    # invalida las entradas existentes
+    CACHE_VERSION = 1
+
+    def __init__(self, cache_dir=None, max_bytes=None, format_version=''):
+        """
+        Args:
+            cache_dir: Directorio de la caché
+            max_bytes: Tamaño máximo total de la caché en bytes
+            format_version: Versión del procesamiento que generó los datos
+                (esquema, limpieza, validación); forma parte de la clave
+        """
+        self.cache_dir = cache_dir or self.DEFAULT_DIR
+        self.max_bytes = max_bytes if max_bytes is not None else self.DEFAULT_MAX_BYTES
+        self.format_version = format_version
+
+    @classmethod
+    def hash_file(cls, file):
+        """
+        Calcula el hash SHA-256 del contenido de un archivo
+
+        Lee por bloques y deja el archivo posicionado al inicio.
+        """
+        digest = hashlib.sha256()
+
+        file.seek(0)
+        while True:
+            block = file.read(cls.HASH_BLOCK_SIZE)
+            if not block:
+                break
+            if isinstance(block, str):
+                block = block.encode('utf-8')
+            digest.update(block)
+        file.seek(0)
+
+        return digest.hexdigest()
+
+    def file_key(self, file):
+        """
+        Clave de caché de un archivo
+
+        Combina el hash del contenido con CACHE_VERSION y format_version: un
+        cambio de esquema o de reglas de procesamiento no reutiliza datasets
+        procesados con las reglas anteriores.
+        """
+        key = f'{self.CACHE_VERSION}:{self.format_version}:{self.hash_file(file)}'
+        return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def hash_dataframe(df):
+        """Hash SHA-256 del contenido de un DataFrame (datasets sin archivo)"""
+        digest = hashlib.sha256()
+        digest.update(','.join(map(str, df.columns)).encode('utf-8'))
+        digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+        return digest.hexdigest()
+
+    def _entry_dir(self, digest):
+        return os.path.join(self.cache_dir, digest)
+
+    def get(self, digest):
+        """
+        Obtiene un dataset cacheado
+
+        Las columnas numéricas se mapean en memoria (mmap) sin copiarlas.
+
+        Returns:
+            DataFrame o None si no está en caché
+        """
+        entry = self._entry_dir(digest)
+        meta_path = os.path.join(entry, self.META_FILE)
+
+        if not os.path.exists(meta_path):
+            return None
+
+        try:
+            with open(meta_path, encoding='utf-8') as f:
+                meta = json.load(f)
+
+            columns = {}
+            for col in meta['columnas']:
+                values = np.load(os.path.join(entry, col['archivo']), mmap_mode='r')
+
+                if col['texto']:
+                    series = pd.Series(values).astype(col['dtype'])
+                    if col['nulos']:
+                        nulls = np.load(os.path.join(entry, col['nulos']))
+                        series[nulls] = None
+                    values = series.array
+
+                columns[col['nombre']] = values
+
+            index = np.load(os.path.join(entry, self.INDEX_FILE), mmap_mode='r')
+            df = pd.DataFrame(columns, index=pd.Index(index), copy=False)
+        except (OSError, ValueError, KeyError):
+            # Entrada corrupta o incompleta: se descarta
+            shutil.rmtree(entry, ignore_errors=True)
+            return None
+
+        # Registrar el acceso para la política LRU
+        os.utime(meta_path)
+
+        return df
+
+    def put(self, digest, df):
+        """Guarda un dataset validado y aplica la política de desalojo"""
+        entry = self._entry_dir(digest)
+        if os.path.exists(os.path.join(entry, self.META_FILE)):
+            return
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_dir = f'{entry}.tmp-{os.getpid()}'
+        os.makedirs(tmp_dir, exist_ok=True)
+
+        meta = {'registros': len(df), 'creado': time.time(), 'columnas': []}
+
+        for i, name in enumerate(df.columns):
+            series = df[name]
+            is_text = not (
+                pd.api.types.is_numeric_dtype(series) or
+                pd.api.types.is_datetime64_dtype(series) or
+                pd.api.types.is_bool_dtype(series)
+            )
+            col = {
+                'nombre': name,
+                'archivo': f'col_{i}.npy',
+                'dtype': str(series.dtype),
+                'texto': is_text,
+                'nulos': None
+            }
+
+            if is_text:
+                nulls = series.isna().to_numpy()
+                if nulls.any():
+                    col['nulos'] = f'col_{i}_nulos.npy'
+                    np.save(os.path.join(tmp_dir, col['nulos']), nulls)
+                values = np.where(nulls, '', series.astype(object).to_numpy()).astype(str)
+            else:
+                values = series.to_numpy()
+
+            np.save(os.path.join(tmp_dir, col['archivo']), values)
+            meta['columnas'].append(col)
+
+        np.save(os.path.join(tmp_dir, self.INDEX_FILE), df.index.to_numpy())
+
+        with open(os.path.join(tmp_dir, self.META_FILE), 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+
+        try:
+            os.replace(tmp_dir, entry)
+        except OSError:
+            # Otro proceso ya guardó la misma entrada
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+        self._evict()
+
+    def _entries(self):
+        """Lista las entradas como (último acceso, tamaño, ruta)"""
+        entries = []
+
+        if not os.path.isdir(self.cache_dir):
+            return entries
+
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            meta_path = os.path.join(path, self.META_FILE)
+            if not os.path.exists(meta_path):
+                continue
+            size = sum(
+                os.path.getsize(os.path.join(path, f)) for f in os.listdir(path)
+            )
+            entries.append((os.path.getmtime(meta_path), size, path))
+
+        return entries
+
+    def _evict(self):
+        """Elimina las entradas menos usadas hasta respetar el tamaño máximo"""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+
+    def get_size(self):
+        """Tamaño total ocupado por la caché en bytes"""
+        return sum(size for _, size, _ in self._entries())
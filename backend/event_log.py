@@ -0,0 +1,192 @@
+"""
+Módulo de Agregación de Logs de Eventos para SAEM
+Construye el dataset por estudiante a partir del log crudo de Moodle
+(exportación de la tabla logstore_standard_log)
+"""
+
+import pandas as pd
+import numpy as np
+
+class EventLogAggregator:
+    """Clase para agregar el log de eventos de Moodle por estudiante"""
+
+    # Columnas del log que se leen (el resto nunca se carga)
+    EVENT_COLUMNS = [
+        'eventname',
+        'component',
+        'crud',
+        'contextinstanceid',
+        'userid',
+        'timecreated'
+    ]
+
+    COMPLETION_EVENT = '\\core\\event\\course_module_completion_updated'
+    SUBMISSION_EVENT = '\\mod_assign\\event\\assessable_submitted'
+    FORUM_COMPONENT = 'mod_forum'
+
+    # Un intervalo mayor a este umbral (segundos) inicia una nueva sesión
+    SESSION_TIMEOUT = 30 * 60
+
+    DEFAULT_CHUNKSIZE = 500000
+
+    # Cada cuántos bloques se compactan los pares de actividades completadas
+    COMPACT_EVERY = 16
+
+    COUNT_COLUMNS = [
+        'entregas_tarde',
+        'foros_participacion'
+    ]
+
+    def __init__(self, session_timeout=None, fechas_limite=None):
+        """
+        Args:
+            session_timeout: Segundos de inactividad que cierran una sesión
+            fechas_limite: Diccionario {contextinstanceid: timestamp unix}
+                con la fecha límite de cada tarea
+        """
+        self.session_timeout = session_timeout or self.SESSION_TIMEOUT
+        self.fechas_limite = pd.Series(fechas_limite or {}, dtype='float64')
+        self._reset()
+
+    def _reset(self):
+        """Reinicia el estado acumulado entre bloques"""
+        self._counts = pd.DataFrame(columns=self.COUNT_COLUMNS, dtype='int64')
+        self._seconds = pd.Series(dtype='float64')
+        self._last_seen = pd.Series(dtype='float64')
+        self._completions = []
+
+    def aggregate(self, file, calificaciones=None, chunksize=None):
+        """
+        Agrega el log de eventos en una sola pasada por bloques
+
+        El log debe venir en orden cronológico (orden natural de id en
+        logstore_standard_log); dentro de cada bloque se reordena.
+
+        Args:
+            file: Archivo CSV con el log crudo
+            calificaciones: Diccionario o Serie {userid: calificación final}
+            chunksize: Filas por bloque
+
+        Returns:
+            DataFrame con una fila por estudiante y las columnas requeridas
+            (calificacion_final es NaN para quien no tiene calificación)
+        """
+        self._reset()
+
+        reader = pd.read_csv(
+            file,
+            encoding='utf-8',
+            usecols=self.EVENT_COLUMNS,
+            dtype={
+                'eventname': 'str',
+                'component': 'str',
+                'crud': 'str',
+                'contextinstanceid': 'int64',
+                'userid': 'int64',
+                'timecreated': 'int64'
+            },
+            chunksize=chunksize or self.DEFAULT_CHUNKSIZE
+        )
+
+        for chunk in reader:
+            self._consume_chunk(chunk)
+
+        return self._build_frame(calificaciones)
+
+    def _consume_chunk(self, chunk):
+        """Actualiza los acumulados con un bloque de eventos"""
+        # Descartar eventos de sistema / invitados
+        chunk = chunk[chunk['userid'] > 0]
+        if len(chunk) == 0:
+            return
+
+        events = chunk['eventname'].to_numpy()
+        users = chunk['userid'].to_numpy()
+
+        # Actividades completadas: pares (usuario, módulo) distintos
+        completed = events == self.COMPLETION_EVENT
+        if completed.any():
+            pairs = chunk.loc[completed, ['userid', 'contextinstanceid']]
+            self._completions.append(pairs.drop_duplicates())
+
+            # Compactar periódicamente para acotar la memoria
+            if len(self._completions) >= self.COMPACT_EVERY:
+                self._completions = [pd.concat(self._completions).drop_duplicates()]
+
+        # Entregas posteriores a la fecha límite de la tarea
+        late = np.zeros(len(chunk), dtype=bool)
+        submitted = events == self.SUBMISSION_EVENT
+        if submitted.any() and len(self.fechas_limite) > 0:
+            due = chunk['contextinstanceid'].map(self.fechas_limite).to_numpy()
+            late = submitted & (chunk['timecreated'].to_numpy() > due)
+
+        # Participación en foros: publicaciones y debates creados
+        forum = (
+            (chunk['component'].to_numpy() == self.FORUM_COMPONENT) &
+            (chunk['crud'].to_numpy() == 'c')
+        )
+
+        counts = pd.DataFrame({
+            'userid': users,
+            'entregas_tarde': late.astype('int64'),
+            'foros_participacion': forum.astype('int64')
+        }).groupby('userid').sum()
+        self._counts = counts.add(self._counts, fill_value=0).astype('int64')
+
+        self._accumulate_sessions(users, chunk['timecreated'].to_numpy())
+
+    def _accumulate_sessions(self, users, timestamps):
+        """Suma el tiempo de sesión a partir de los intervalos entre eventos"""
+        order = np.lexsort((timestamps, users))
+        users = users[order]
+        ts = timestamps[order].astype('float64')
+
+        # Primer evento de cada usuario dentro del bloque
+        first = np.ones(len(users), dtype=bool)
+        first[1:] = users[1:] != users[:-1]
+
+        previous = np.empty_like(ts)
+        previous[1:] = ts[:-1]
+
+        # El intervalo inicial se mide contra el último evento del bloque anterior
+        carried = self._last_seen.reindex(users[first]).to_numpy()
+        previous[first] = np.where(np.isnan(carried), ts[first], carried)
+
+        gaps = ts - previous
+        gaps[(gaps < 0) | (gaps > self.session_timeout)] = 0
+
+        seconds = pd.Series(gaps).groupby(users).sum()
+        self._seconds = seconds.add(self._seconds, fill_value=0)
+
+        last = np.ones(len(users), dtype=bool)
+        last[:-1] = users[:-1] != users[1:]
+        latest = pd.Series(ts[last], index=users[last])
+        self._last_seen = pd.concat([self._last_seen, latest]).groupby(level=0).max()
+
+    def _build_frame(self, calificaciones):
+        """Arma el DataFrame final con el formato de process_csv"""
+        userids = self._seconds.index.union(self._counts.index).sort_values()
+
+        if self._completions:
+            completions = pd.concat(self._completions).drop_duplicates()
+            actividades = completions.groupby('userid').size()
+        else:
+            actividades = pd.Series(dtype='int64')
+
+        counts = self._counts.reindex(userids, fill_value=0)
+        grades = pd.Series(calificaciones if calificaciones is not None else {},
+                           dtype='float64')
+
+        df = pd.DataFrame({
+            'estudiante_id': 'EST' + pd.Series(userids).astype(str).str.zfill(3),
+            'actividades_completadas': actividades.reindex(userids, fill_value=0)
+                                                  .to_numpy(dtype='int64'),
+            'tiempo_plataforma_horas': np.round(
+                self._seconds.reindex(userids, fill_value=0).to_numpy() / 3600, 2
+            ),
+            'entregas_tarde': counts['entregas_tarde'].to_numpy(dtype='int64'),
+            'foros_participacion': counts['foros_participacion'].to_numpy(dtype='int64'),
+            'calificacion_final': grades.reindex(userids).to_numpy()
+        })
+
+        return df
@@ -0,0 +1,291 @@
+"""
+Motor K-means en NumPy para SAEM
+Implementación vectorizada en float32 con cotas de Hamerly (desigualdad
+triangular) y reinicios evaluados en conjunto sobre un único array
+"""
+
+import numpy as np
+
+class NumpyKMeans:
+    """
+    K-means con la misma interfaz que sklearn.cluster.KMeans
+
+    Los n_init reinicios avanzan juntos: centroides (n_init, k, d) y cotas
+    (n_init, n). Por cada punto se mantiene una cota superior de la
+    distancia a su centroide y una inferior a cualquier otro; solo se
+    recalculan las distancias de los puntos cuyas cotas no garantizan la
+    asignación actual.
+    """
+
+    DENSE_FRACTION = 0.5
+
+    def __init__(self, n_clusters=8, init='k-means++', n_init=10, max_iter=300,
+                 tol=1e-4, random_state=None):
+        """
+        Args:
+            n_clusters: Cantidad de clusters
+            init: 'k-means++' o array (n_clusters, n_features) de centroides
+                iniciales (en ese caso se usa un único reinicio)
+            n_init: Cantidad de reinicios evaluados en conjunto
+            max_iter: Máximo de iteraciones de Lloyd por reinicio
+            tol: Tolerancia relativa (a la varianza de los datos) del
+                desplazamiento de centroides para declarar convergencia
+            random_state: Semilla de la inicialización
+        """
+        self.n_clusters = n_clusters
+        self.init = init
+        self.n_init = n_init
+        self.max_iter = max_iter
+        self.tol = tol
+        self.random_state = random_state
+
+    @staticmethod
+    def _distances(X_t, centers):
+        """
+        Distancias de cada punto a cada centroide para varios reinicios
+
+        Se trabaja con la matriz transpuesta (d, n) y se acumula feature por
+        feature: con pocas dimensiones es mucho más rápido que reducir sobre
+        un eje de tamaño d.
+
+        Args:
+            X_t: (d, n)
+            centers: (r, k, d)
+
+        Returns:
+            (k, r, n)
+        """
+        n_init, k, d = centers.shape
+        distances = np.zeros((k, n_init, X_t.shape[1]), dtype=X_t.dtype)
+        for j in range(k):
+            for f in range(d):
+                diff = X_t[f][None, :] - centers[:, j, f][:, None]
+                distances[j] += diff * diff
+        return np.sqrt(distances, out=distances)
+
+    @staticmethod
+    def _assign(distances):
+        """
+        Centroide más cercano, su distancia y la del segundo más cercano
+
+        Args:
+            distances: (k, ...) distancias a cada centroide
+
+        Returns:
+            (labels, cota superior, cota inferior) con la forma de distances[0]
+        """
+        labels = np.zeros(distances.shape[1:], dtype='int64')
+        upper = distances[0].copy()
+        lower = np.full_like(upper, np.inf)
+        for j in range(1, len(distances)):
+            current = distances[j]
+            closer = current < upper
+            np.copyto(lower, np.where(closer, upper, np.minimum(lower, current)))
+            np.copyto(upper, current, where=closer)
+            labels[closer] = j
+        return labels, upper, lower
+
+    @staticmethod
+    def _cluster_sums(weighted, labels, n_init, k, rows=None):
+        """
+        Peso total y suma ponderada de features por (reinicio, cluster)
+
+        Args:
+            weighted: (1 + d, m) pesos y features ponderadas de los puntos
+            labels: Cluster de cada punto, (n_init, m) o (m,) si se indica rows
+            rows: Reinicio de cada punto cuando labels es plano
+
+        Returns:
+            (n_init, k, 1 + d)
+        """
+        if rows is None:
+            flat = (labels + (np.arange(n_init) * k)[:, None]).ravel()
+            weighted = np.tile(weighted, n_init)
+        else:
+            flat = rows * k + labels
+
+        return np.stack([
+            np.bincount(flat, weights=values, minlength=n_init * k)
+            for values in weighted
+        ], axis=1).reshape(n_init, k, -1)
+
+    def _init_centers(self, X, X_t, weights, rng):
+        """k-means++ para todos los reinicios a la vez"""
+        if not isinstance(self.init, str):
+            centers = np.asarray(self.init, dtype=X.dtype)
+            return centers[None, :, :].copy()
+
+        n_init = self.n_init
+        n, d = X.shape
+        centers = np.empty((n_init, self.n_clusters, d), dtype=X.dtype)
+
+        cumulative = np.cumsum(weights)
+        first = np.searchsorted(cumulative, rng.random(n_init) * cumulative[-1], side='right')
+        centers[:, 0] = X[np.minimum(first, n - 1)]
+        closest = self._distances(X_t, centers[:, :1])[0] ** 2
+
+        for j in range(1, self.n_clusters):
+            # Probabilidad proporcional a peso × distancia² al centroide más cercano
+            cumulative = np.cumsum(closest * weights, axis=1)
+            targets = rng.random(n_init) * cumulative[:, -1]
+            chosen = (cumulative < targets[:, None]).sum(axis=1)
+            centers[:, j] = X[np.minimum(chosen, n - 1)]
+            new = self._distances(X_t, centers[:, j:j + 1])[0] ** 2
+            np.minimum(closest, new, out=closest)
+
+        return centers
+
+    @staticmethod
+    def _relocate_empty(X, weighted, centers, labels, sums, upper, lower, empty):
+        """
+        Reasigna a cada cluster vacío uno de los puntos más lejanos a su centroide
+
+        Igual que sklearn: por reinicio se toman tantos puntos (con peso
+        positivo) como clusters vacíos, en orden de distancia decreciente al
+        centroide asignado. Las
+        sumas se corrigen en el lugar; las cotas de los puntos movidos se
+        dejan en cero para que se recalculen en la iteración.
+
+        Args:
+            empty: (n_init, k) máscara de clusters vacíos
+        """
+        for r in np.flatnonzero(empty.any(axis=1)):
+            clusters = np.flatnonzero(empty[r])
+            distances = ((X - centers[r][labels[r]]) ** 2).sum(axis=1)
+            distances[weighted[0] <= 0] = -np.inf
+            far = np.argsort(distances, kind='stable')[::-1][:len(clusters)]
+
+            values = weighted[:, far].T
+            np.subtract.at(sums[r], labels[r, far], values)
+            sums[r, clusters] = values
+            labels[r, far] = clusters
+            upper[r, far] = 0
+            lower[r, far] = 0
+
+    def fit(self, X, sample_weight=None):
+        """Entrena el modelo"""
+        X = np.ascontiguousarray(X, dtype='float32')
+        X_t = np.ascontiguousarray(X.T)
+        n, d = X.shape
+        k = self.n_clusters
+        weights = (
+            np.ones(n, dtype='float32') if sample_weight is None
+            else np.asarray(sample_weight, dtype='float32')
+        )
+
+        if n < k:
+            raise ValueError(
+                f'n_samples={n} debe ser >= n_clusters={k}'
+            )
+
+        rng = np.random.default_rng(self.random_state)
+        centers = self._init_centers(X, X_t, weights, rng)
+        n_init = centers.shape[0]
+        offsets = (np.arange(n_init) * k)[:, None]
+        tol = self.tol * float(np.mean(np.var(X, axis=0)))
+
+        # Sumas ponderadas por (reinicio, cluster); después de la primera
+        # asignación solo se corrigen con los puntos que cambian de cluster
+        weighted = np.vstack([weights, weights * X_t]).astype('float64')
+        labels, upper, lower = self._assign(self._distances(X_t, centers))
+        sums = self._cluster_sums(weighted, labels, n_init, k)
+
+        # Las sumas se corrigen por diferencias: un cluster vacío puede
+        # quedar con un residuo de redondeo en lugar de un cero exacto
+        empty_weight = 1e-9 * float(weights.sum())
+        converged = np.zeros(n_init, dtype=bool)
+        n_iter = np.zeros(n_init, dtype='int64')
+
+        for _ in range(self.max_iter):
+            # Clusters vacíos: se resiembran con los puntos más lejanos
+            empty = (sums[:, :, 0] <= empty_weight) & ~converged[:, None]
+            if empty.any():
+                self._relocate_empty(X, weighted, centers, labels, sums, upper, lower, empty)
+
+            counts = sums[:, :, :1]
+            new_centers = np.where(
+                counts > empty_weight, sums[:, :, 1:] / np.maximum(counts, 1e-12), centers
+            ).astype(X.dtype)
+
+            moved = np.sqrt(((new_centers - centers) ** 2).sum(axis=2))
+            moved[converged] = 0
+
+            centers = np.where(converged[:, None, None], centers, new_centers)
+            n_iter += ~converged
+            converged |= (moved ** 2).sum(axis=1) <= tol
+            if converged.all():
+                break
+
+            # Ajuste de cotas según cuánto se movió cada centroide
+            upper += np.take(moved, labels + offsets)
+            lower -= moved.max(axis=1)[:, None]
+
+            # Mitad de la distancia al centroide vecino más cercano
+            diff = centers[:, :, None, :] - centers[:, None, :, :]
+            between = np.sqrt((diff * diff).sum(axis=3))
+            between[:, np.arange(k), np.arange(k)] = np.inf
+            half_gap = between.min(axis=2) / 2
+
+            # Solo se recalculan los puntos cuyas cotas no garantizan la asignación
+            stale = upper > np.maximum(np.take(half_gap, labels + offsets), lower)
+            stale[converged] = False
+            rows, points = np.nonzero(stale)
+            if len(rows) == 0:
+                continue
+
+            previous = labels[rows, points]
+            if len(rows) > self.DENSE_FRACTION * stale.size:
+                # Con muchos puntos pendientes conviene recalcular todo
+                new_labels, upper, lower = self._assign(self._distances(X_t, centers))
+                labels = np.where(converged[:, None], labels, new_labels)
+            else:
+                distances = np.zeros((k, len(rows)), dtype=X.dtype)
+                for j in range(k):
+                    for f in range(d):
+                        diff = X_t[f][points] - centers[rows, j, f]
+                        distances[j] += diff * diff
+                labels[rows, points], upper[rows, points], lower[rows, points] = (
+                    self._assign(np.sqrt(distances))
+                )
+
+            changed = labels[rows, points] != previous
+            if changed.any():
+                rows, points = rows[changed], points[changed]
+                sums -= self._cluster_sums(weighted[:, points], previous[changed], n_init, k, rows)
+                sums += self._cluster_sums(
+                    weighted[:, points], labels[rows, points], n_init, k, rows
+                )
+
+        # Elección del mejor reinicio y paso final de asignación exacta
+        inertias = np.empty(n_init)
+        for r in range(n_init):
+            distances = self._distances(X_t, centers[r:r + 1])[:, 0]
+            inertias[r] = float((weights * distances.min(axis=0) ** 2).sum())
+        best = int(np.argmin(inertias))
+
+        self.cluster_centers_ = centers[best].astype('float64')
+        self.labels_ = self.predict(X).astype('int32')
+        self.inertia_ = -self.score(X, sample_weight=weights)
+        self.n_iter_ = int(n_iter[best])
+        self.n_features_in_ = d
+
+        return self
+
+    def fit_predict(self, X, sample_weight=None):
+        """Entrena y devuelve la etiqueta de cada fila"""
+        return self.fit(X, sample_weight=sample_weight).labels_
+
+    def transform(self, X):
+        """Distancia de cada fila a cada centroide"""
+        X_t = np.ascontiguousarray(np.asarray(X, dtype='float64').T)
+        return self._distances(X_t, self.cluster_centers_[None])[:, 0].T
+
+    def predict(self, X):
+        """Centroide más cercano a cada fila"""
+        return self.transform(X).argmin(axis=1)
+
+    def score(self, X, sample_weight=None):
+        """Opuesto de la inercia (como sklearn)"""
+        distances = self.transform(X).min(axis=1)
+        weights = 1.0 if sample_weight is None else np.asarray(sample_weight, dtype='float64')
+        return -float((weights * distances ** 2).sum())
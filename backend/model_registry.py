@@ -0,0 +1,217 @@
+"""
+Módulo de Registro de Modelos para SAEM
+Guarda en disco los modelos entrenados (con su scaler, features y
+métricas), versionados por hash del dataset y parámetros de entrenamiento
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+
+import joblib
+
+class ModelRegistry:
+    """
+    Registro versionado de modelos con carga diferida
+
+    Cada versión es un directorio con el objeto serializado (joblib) y un
+    meta.json legible sin deserializar el modelo. La versión activa de cada
+    tipo se guarda en un archivo aparte, de modo que todos los procesos
+    (workers de gunicorn, reinicios) ven la misma.
+    """
+
+    DEFAULT_DIR = os.path.join('data', 'models')
+    MODEL_FILE = 'modelo.joblib'
+    META_FILE = 'meta.json'
+    ACTIVE_FILE = 'activos.json'
+    TYPES = ('clustering', 'regresion')
+
+    def __init__(self, registry_dir=None):
+        """
+        Args:
+            registry_dir: Directorio del registro
+        """
+        self.registry_dir = registry_dir or self.DEFAULT_DIR
+        self._loaded = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def version_id(cls, tipo, dataset_hash, parametros):
+        """Identificador determinístico de una versión"""
+        if tipo not in cls.TYPES:
+            raise ValueError(f'Tipo de modelo inválido: {tipo}. Opciones: {", ".join(cls.TYPES)}')
+
+        key = json.dumps(
+            {'tipo': tipo, 'dataset': dataset_hash, 'parametros': parametros},
+            sort_keys=True, default=str
+        )
+        return f'{tipo}-{hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]}'
+
+    @staticmethod
+    def _to_json(value):
+        """Convierte arrays y escalares de NumPy para meta.json"""
+        if hasattr(value, 'tolist'):
+            return value.tolist()
+        return str(value)
+
+    def _entry_dir(self, version):
+        return os.path.join(self.registry_dir, version)
+
+    def exists(self, version):
+        return os.path.exists(os.path.join(self._entry_dir(version), self.META_FILE))
+
+    def save(self, tipo, payload, dataset_hash, parametros, features=None, metricas=None,
+             overwrite=False):
+        """
+        Guarda una versión
+
+        Args:
+            tipo: 'clustering' o 'regresion'
+            payload: Objeto a serializar (modelo, scaler y resultados)
+            dataset_hash: Hash del dataset de entrenamiento
+            parametros: dict con los parámetros de entrenamiento
+            features: Lista de features del modelo
+            metricas: dict de métricas para el listado
+            overwrite: Reemplazar la versión si ya existe (reentrenamiento)
+
+        Returns:
+            Identificador de la versión
+        """
+        version = self.version_id(tipo, dataset_hash, parametros)
+        entry = self._entry_dir(version)
+
+        if self.exists(version) and not overwrite:
+            return version
+
+        meta = {
+            'version': version,
+            'tipo': tipo,
+            'dataset_hash': dataset_hash,
+            'parametros': parametros,
+            'features': list(features or []),
+            'metricas': metricas or {},
+            'creado': time.time()
+        }
+
+        os.makedirs(self.registry_dir, exist_ok=True)
+        tmp_dir = f'{entry}.tmp-{os.getpid()}'
+        os.makedirs(tmp_dir, exist_ok=True)
+
+        joblib.dump(payload, os.path.join(tmp_dir, self.MODEL_FILE))
+        with open(os.path.join(tmp_dir, self.META_FILE), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, default=self._to_json)
+
+        if overwrite:
+            shutil.rmtree(entry, ignore_errors=True)
+            with self._lock:
+                self._loaded.pop(version, None)
+
+        try:
+            os.replace(tmp_dir, entry)
+        except OSError:
+            # Otro proceso ya guardó la misma versión
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+        return version
+
+    def get_meta(self, version):
+        """Metadatos de una versión o None si no existe"""
+        try:
+            with open(os.path.join(self._entry_dir(version), self.META_FILE), encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def load(self, version):
+        """
+        Objeto de una versión; se deserializa una sola vez por proceso
+
+        El objeto devuelto es compartido: quien vaya a modificarlo (por
+        ejemplo, reentrenar sobre él) debe trabajar sobre una copia.
+
+        Para compartirlo entre workers sin una copia por proceso, cargarlo
+        antes del fork (gunicorn --preload): las páginas se comparten
+        mientras no se modifiquen (copy-on-write).
+        """
+        with self._lock:
+            if version in self._loaded:
+                return self._loaded[version]
+
+        if not self.exists(version):
+            raise ValueError(f'Versión de modelo inexistente: {version}')
+
+        payload = joblib.load(os.path.join(self._entry_dir(version), self.MODEL_FILE))
+
+        with self._lock:
+            return self._loaded.setdefault(version, payload)
+
+    def _read_active(self):
+        try:
+            with open(os.path.join(self.registry_dir, self.ACTIVE_FILE), encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def activate(self, version):
+        """
+        Marca una versión como activa para su tipo
+
+        Returns:
+            dict con los metadatos de la versión
+        """
+        meta = self.get_meta(version)
+        if meta is None:
+            raise ValueError(f'Versión de modelo inexistente: {version}')
+
+        with self._lock:
+            active = self._read_active()
+            active[meta['tipo']] = version
+
+            path = os.path.join(self.registry_dir, self.ACTIVE_FILE)
+            tmp_path = f'{path}.tmp-{os.getpid()}'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(active, f)
+            os.replace(tmp_path, path)
+
+        return meta
+
+    def active_version(self, tipo):
+        """Versión activa de un tipo o None"""
+        version = self._read_active().get(tipo)
+        return version if version and self.exists(version) else None
+
+    def get_active(self, tipo):
+        """
+        Carga la versión activa de un tipo
+
+        Returns:
+            (payload, meta) o None si no hay versión activa
+        """
+        version = self.active_version(tipo)
+        if version is None:
+            return None
+        return self.load(version), self.get_meta(version)
+
+    def list_versions(self, tipo=None):
+        """
+        Lista las versiones guardadas, de la más reciente a la más antigua
+
+        Returns:
+            Lista de metadatos con el campo 'activa'
+        """
+        if not os.path.isdir(self.registry_dir):
+            return []
+
+        active = set(self._read_active().values())
+        versions = []
+        for name in os.listdir(self.registry_dir):
+            meta = self.get_meta(name)
+            if meta is None or (tipo and meta['tipo'] != tipo):
+                continue
+            meta['activa'] = name in active
+            versions.append(meta)
+
+        return sorted(versions, key=lambda meta: meta['creado'], reverse=True)
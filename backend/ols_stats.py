@@ -0,0 +1,159 @@
+"""
+Módulo de Mínimos Cuadrados por Estadísticos Suficientes para SAEM
+Acumula medias y co-momentos (XᵀX, Xᵀy centrados) por bloques y resuelve
+las ecuaciones normales sin volver a recorrer los datos
+"""
+
+import numpy as np
+from scipy import linalg
+
+class OLSAccumulator:
+    """
+    Estadísticos suficientes de una regresión lineal con intercepto
+
+    Se guardan la cantidad de filas, las medias y los co-momentos centrados
+    (como RunningMoments, pero matriciales): combinar o quitar bloques usa
+    la fórmula de Chan y evita la cancelación de XᵀX sin centrar.
+    """
+
+    def __init__(self, n_features):
+        self.n_features = n_features
+        self.count = 0
+        self.mean_x = np.zeros(n_features)
+        self.mean_y = 0.0
+        self.cxx = np.zeros((n_features, n_features))
+        self.cxy = np.zeros(n_features)
+        self.syy = 0.0
+
+    @staticmethod
+    def _batch(X, y):
+        """Estadísticos de un bloque (centrados en la media del bloque)"""
+        X = np.asarray(X, dtype='float64')
+        y = np.asarray(y, dtype='float64')
+        if len(y) == 0:
+            return 0, None, 0.0, None, None, 0.0
+        mean_x = X.mean(axis=0)
+        mean_y = y.mean()
+        Xc = X - mean_x
+        yc = y - mean_y
+        return len(y), mean_x, mean_y, Xc.T @ Xc, Xc.T @ yc, float(yc @ yc)
+
+    def _combine(self, count, mean_x, mean_y, cxx, cxy, syy):
+        if count == 0:
+            return
+        total = self.count + count
+        dx = mean_x - self.mean_x
+        dy = mean_y - self.mean_y
+        factor = self.count * count / total
+        self.cxx += cxx + factor * np.outer(dx, dx)
+        self.cxy += cxy + factor * dx * dy
+        self.syy += syy + factor * dy * dy
+        self.mean_x += dx * count / total
+        self.mean_y += dy * count / total
+        self.count = total
+
+    def _subtract(self, count, mean_x, mean_y, cxx, cxy, syy):
+        if count == 0:
+            return
+        remaining = self.count - count
+        if remaining <= 0:
+            self.__init__(self.n_features)
+            return
+        rest_x = (self.count * self.mean_x - count * mean_x) / remaining
+        rest_y = (self.count * self.mean_y - count * mean_y) / remaining
+        dx = mean_x - rest_x
+        dy = mean_y - rest_y
+        factor = remaining * count / self.count
+        self.cxx -= cxx + factor * np.outer(dx, dx)
+        self.cxy -= cxy + factor * dx * dy
+        self.syy = max(self.syy - syy - factor * dy * dy, 0.0)
+        self.mean_x = rest_x
+        self.mean_y = rest_y
+        self.count = remaining
+
+    def _state(self):
+        return self.count, self.mean_x, self.mean_y, self.cxx, self.cxy, self.syy
+
+    def update(self, X, y):
+        """Agrega un bloque de filas"""
+        self._combine(*self._batch(X, y))
+
+    def remove(self, X, y):
+        """Quita un bloque de filas agregado previamente"""
+        self._subtract(*self._batch(X, y))
+
+    def merge(self, other):
+        """Combina con otro acumulador (otro bloque, pliegue o proceso)"""
+        self._combine(*other._state())
+
+    def copy(self):
+        result = OLSAccumulator(self.n_features)
+        result._combine(*self._state())
+        return result
+
+    def difference(self, other):
+        """Acumulador de las filas de self que no están en other"""
+        result = self.copy()
+        result._subtract(*other._state())
+        return result
+
+    def scale(self):
+        """Desvío poblacional por feature (1 si es constante, como StandardScaler)"""
+        if self.count == 0:
+            return np.ones(self.n_features)
+        std = np.sqrt(np.maximum(np.diag(self.cxx), 0) / self.count)
+        return np.where(std > 0, std, 1.0)
+
+    def solve(self):
+        """
+        Resuelve las ecuaciones normales
+
+        Se factoriza por Cholesky la matriz de co-momentos reescalada a
+        varianza unitaria (mejor condicionada); si es singular (features
+        colineales o constantes) se usa la solución de mínima norma.
+
+        Returns:
+            (coeficientes, intercepto) sobre las features originales
+        """
+        if self.count == 0:
+            raise ValueError('No hay filas para entrenar el modelo')
+
+        std = self.scale()
+        A = self.cxx / np.outer(std, std)
+        b = self.cxy / std
+        try:
+            coef = linalg.cho_solve(linalg.cho_factor(A), b)
+        except linalg.LinAlgError:
+            coef = linalg.lstsq(A, b)[0]
+
+        coef = coef / std
+        return coef, float(self.mean_y - self.mean_x @ coef)
+
+    def leverage(self, X):
+        """
+        Leverage de cada fila respecto de estas filas de entrenamiento
+
+        h = 1/n + (x - x̄)ᵀ Cxx⁻¹ (x - x̄); para las propias filas de
+        entrenamiento es la diagonal de la matriz hat.
+        """
+        std = self.scale()
+        Z = (np.asarray(X, dtype='float64') - self.mean_x) / std
+        A = self.cxx / np.outer(std, std)
+        try:
+            solved = linalg.cho_solve(linalg.cho_factor(A), Z.T)
+        except linalg.LinAlgError:
+            solved = linalg.pinvh(A) @ Z.T
+        return 1 / self.count + np.einsum('ij,ji->i', Z, solved)
+
+    def sse(self, coef, intercept):
+        """Suma de residuos al cuadrado de un modelo sobre estas filas"""
+        coef = np.asarray(coef, dtype='float64')
+        bias = self.mean_y - intercept - self.mean_x @ coef
+        centered = self.syy - 2 * coef @ self.cxy + coef @ self.cxx @ coef
+        return float(max(centered, 0.0) + self.count * bias ** 2)
+
+    def r2(self, coef, intercept):
+        """R² de un modelo sobre estas filas"""
+        if self.syy <= 0:
+            return 0.0
+        return 1 - self.sse(coef, intercept) / self.syy
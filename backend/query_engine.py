@@ -0,0 +1,136 @@
+"""
+Módulo de Consultas Indexadas para SAEM
+Índices ordenados por columna para consultas por rango con búsqueda
+binaria, combinables entre columnas y sin copiar el dataset
+"""
+
+import numpy as np
+import pandas as pd
+
+class QueryEngine:
+    """Motor de consultas por rango sobre un DataFrame ya cargado"""
+
+    def __init__(self, df):
+        """
+        Args:
+            df: DataFrame sobre el que se consulta (no se copia)
+        """
+        self.df = df
+        self._indexes = {}
+
+    def _get_index(self, column):
+        """
+        Índice ordenado de una columna, construido en el primer uso
+
+        Returns:
+            (posiciones en orden, valores ordenados, cantidad de no nulos)
+        """
+        if column not in self._indexes:
+            if column not in self.df.columns:
+                raise ValueError(f"Columna inexistente: {column}")
+            if not pd.api.types.is_numeric_dtype(self.df[column]):
+                raise ValueError(f"La columna {column} no es numérica")
+
+            values = self.df[column].to_numpy(dtype='float64', na_value=np.nan)
+            # Orden estable: los NaN quedan al final
+            order = np.argsort(values, kind='stable')
+            sorted_values = values[order]
+            valid = int(len(values) - np.isnan(values).sum())
+
+            self._indexes[column] = (order, sorted_values, valid)
+
+        return self._indexes[column]
+
+    def _bounds(self, column, min_value=None, max_value=None):
+        """Rango [lo, hi) del índice ordenado que cumple los umbrales"""
+        order, sorted_values, valid = self._get_index(column)
+
+        if min_value is None and max_value is None:
+            return order, 0, len(order)
+
+        lo = 0 if min_value is None else int(
+            np.searchsorted(sorted_values[:valid], min_value, side='left')
+        )
+        hi = valid if max_value is None else int(
+            np.searchsorted(sorted_values[:valid], max_value, side='right')
+        )
+
+        return order, lo, max(lo, hi)
+
+    @staticmethod
+    def _parse(conditions):
+        """Normaliza condiciones a tuplas (columna, mínimo, máximo)"""
+        parsed = []
+        for condition in conditions:
+            if isinstance(condition, dict):
+                parsed.append((
+                    condition['columna'],
+                    condition.get('min'),
+                    condition.get('max')
+                ))
+            else:
+                parsed.append(tuple(condition))
+        return parsed
+
+    def where(self, conditions):
+        """
+        Posiciones de las filas que cumplen todas las condiciones
+
+        Args:
+            conditions: Lista de condiciones {'columna', 'min', 'max'} o
+                tuplas (columna, min, max); los extremos son inclusivos
+
+        Returns:
+            Array de posiciones en orden ascendente
+        """
+        parsed = self._parse(conditions)
+        if not parsed:
+            return np.arange(len(self.df))
+
+        # Se parte del rango más selectivo y el resto se verifica
+        # solo sobre esas posiciones
+        ranges = [(self._bounds(*condition), condition) for condition in parsed]
+        ranges.sort(key=lambda item: item[0][2] - item[0][1])
+
+        (order, lo, hi), _ = ranges[0]
+        positions = order[lo:hi]
+
+        for _, (column, min_value, max_value) in ranges[1:]:
+            if len(positions) == 0:
+                break
+            if min_value is None and max_value is None:
+                continue
+            # Se toman primero las posiciones candidatas: solo ese subconjunto
+            # se convierte a float64
+            values = self.df[column].array.take(positions).to_numpy(
+                dtype='float64', na_value=np.nan
+            )
+            mask = ~np.isnan(values)
+            if min_value is not None:
+                mask &= values >= min_value
+            if max_value is not None:
+                mask &= values <= max_value
+            positions = positions[mask]
+
+        return np.sort(positions)
+
+    def count(self, conditions):
+        """
+        Cantidad de filas que cumplen las condiciones
+
+        Con una sola condición se resuelve con dos búsquedas binarias,
+        sin generar posiciones.
+        """
+        parsed = self._parse(conditions)
+        if not parsed:
+            return len(self.df)
+
+        if len(parsed) == 1:
+            _, lo, hi = self._bounds(*parsed[0])
+            return hi - lo
+
+        return len(self.where(parsed))
+
+    def rows(self, positions):
+        """Materializa las filas indicadas por posición"""
+        return self.df.iloc[positions]
@@ -3,13 +3,19 @@ Módulo de Regresión Lineal para SAEM
 Predice calificaciones finales basadas en actividad estudiantil
 """
 
+import hashlib
+
 import numpy as np
 import pandas as pd
 from sklearn.linear_model import LinearRegression
-from sklearn.model_selection import cross_val_score, train_test_split
+from sklearn.model_selection import KFold, RepeatedKFold, train_test_split
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+from scipy import stats
 from sklearn.preprocessing import StandardScaler
 import warnings
+
+from backend.ols_stats import OLSAccumulator
+from backend.segmented_regression import SegmentedOLS
 warnings.filterwarnings('ignore')
 
 class RegressionPredictor:
@@ -25,14 +31,53 @@ class RegressionPredictor:
     
     TARGET = 'calificacion_final'
     
+    # 'completo': LinearRegression de sklearn sobre las filas de entrenamiento
+    # 'estadisticas': ecuaciones normales a partir de estadísticos suficientes
+    # 'segmentado': un modelo por cluster (SegmentedOLS) en lugar de usar
+    #     el cluster como feature numérica
+    TRAINING_MODES = ('completo', 'estadisticas', 'segmentado')
+    
+    # Feature que define los segmentos del modo 'segmentado'
+    SEGMENT_KEY = 'cluster'
+    
+    # 'kfold': KFold sin mezclar (mismos pliegues que cross_val_score)
+    # 'loo': leave-one-out con la diagonal de la matriz hat
+    # 'repetido': RepeatedKFold con la semilla del entrenamiento
+    CV_MODES = ('kfold', 'loo', 'repetido')
+    
+    # Formatos de salida de predict_with_confidence
+    OUTPUT_FORMATS = ('registros', 'columnas')
+    
+    CONFIDENCE_LEVELS = np.array(['Alta', 'Media', 'Baja'])
+    
+    # 'ols': intervalo analítico de mínimos cuadrados
+    # 'bootstrap': percentiles de B reajustes sobre remuestras
+    INTERVAL_METHODS = ('ols', 'bootstrap')
+    
+    # 'prediccion': incluye el ruido residual; 'media': solo el del modelo
+    BOOTSTRAP_TYPES = ('prediccion', 'media')
+    
+    # Remuestras resueltas por bloque (acota la memoria de los pesos)
+    BOOTSTRAP_BLOCK = 200
+    
+    # Límite de remuestras: la matriz de predicciones es (estudiantes, B)
+    MAX_BOOTSTRAP = 10000
+    
     def __init__(self):
         self.model = LinearRegression()
         self.scaler = StandardScaler()
         self.is_trained = False
         self.metrics = {}
         self.feature_importance = {}
+        self.ols = None
+        self.training_stats = None
+        self.residual_variance = None
+        self.train_positions_ = None
+        self.train_signature_ = None
+        self.segmented = None
     
-    def train(self, data, test_size=0.2, random_state=42):
+    def train(self, data, test_size=0.2, random_state=42, modo='completo',
+              cv=5, cv_modo='kfold', cv_repeticiones=10):
         """
         Entrena el modelo de regresión lineal
         
@@ -40,10 +85,25 @@ class RegressionPredictor:
             data: DataFrame con datos incluyendo target
             test_size: Proporción de datos para testing
             random_state: Semilla aleatoria
+            modo: 'completo' o 'estadisticas' (mismo split y mismos
+                coeficientes; el segundo deja el acumulador listo para
+                actualizaciones con update_training) o 'segmentado'
+            cv: Cantidad de pliegues de la validación cruzada
+            cv_modo: 'kfold', 'loo' o 'repetido' (ver _cross_validate)
+            cv_repeticiones: Repeticiones del modo 'repetido'
             
         Returns:
             dict con métricas del modelo
         """
+        if modo not in self.TRAINING_MODES:
+            raise ValueError(
+                f'Modo de entrenamiento inválido: {modo}. Opciones: {", ".join(self.TRAINING_MODES)}'
+            )
+        if cv_modo not in self.CV_MODES:
+            raise ValueError(
+                f'Modo de validación cruzada inválido: {cv_modo}. Opciones: {", ".join(self.CV_MODES)}'
+            )
+        
         try:
             # Preparar datos
             X = data[self.FEATURES_FOR_REGRESSION].values
@@ -54,21 +114,48 @@ class RegressionPredictor:
                 print("Advertencia: Calificaciones fuera del rango 0-10 detectadas")
             
             # Split train/test
-            X_train, X_test, y_train, y_test = train_test_split(
-                X, y, test_size=test_size, random_state=random_state
+            X_train, X_test, y_train, y_test, train_positions, _ = train_test_split(
+                X, y, np.arange(len(y)), test_size=test_size, random_state=random_state
             )
+            self.train_positions_ = train_positions
+            self.train_signature_ = self._data_signature(data)
+            
+            # Estadísticos de entrenamiento: también se usan para los
+            # intervalos de predicción
+            self.training_stats = OLSAccumulator(X.shape[1])
+            self.training_stats.update(X_train, y_train)
+            
+            self.segmented = None
             
-            # Normalizar features
-            X_train_scaled = self.scaler.fit_transform(X_train)
-            X_test_scaled = self.scaler.transform(X_test)
+            if modo in ('estadisticas', 'segmentado'):
+                self.ols = self.training_stats
+                self._apply_solution()
+            else:
+                self.ols = None
+                
+                # Normalizar features y entrenar modelo
+                self.model.fit(self.scaler.fit_transform(X_train), y_train)
+            
+            if modo == 'segmentado':
+                # El modelo global queda para la importancia de features;
+                # las predicciones usan los coeficientes de cada cluster
+                self.ols = None
+                self.segmented = SegmentedOLS().fit(
+                    self._segment_design(X_train), y_train, X_train[:, self._segment_key_index]
+                )
             
-            # Entrenar modelo
-            self.model.fit(X_train_scaled, y_train)
             self.is_trained = True
             
             # Predicciones
-            y_pred_train = self.model.predict(X_train_scaled)
-            y_pred_test = self.model.predict(X_test_scaled)
+            y_pred_train = self._predict_array(X_train)
+            y_pred_test = self._predict_array(X_test)
+            
+            if self.segmented is not None:
+                self.residual_variance = (
+                    ((y_train - y_pred_train) ** 2).sum() / self._segment_dof()
+                )
+            else:
+                self._update_residual_variance()
             
             # Calcular métricas en conjunto de entrenamiento
             train_metrics = {
@@ -85,9 +172,9 @@ class RegressionPredictor:
             }
             
             # Validación cruzada
-            cv_scores = cross_val_score(
-                self.model, X_train_scaled, y_train, 
-                cv=5, scoring='r2'
+            cv_scores = self._cross_validate(
+                X_train, y_train, cv, cv_modo, cv_repeticiones, random_state,
+                segmentado=self.segmented is not None
             )
             
             # Guardar métricas
@@ -100,10 +187,15 @@ class RegressionPredictor:
                 'rmse_train': train_metrics['rmse'],
                 'cv_r2_mean': cv_scores.mean(),
                 'cv_r2_std': cv_scores.std(),
+                'cv_modo': cv_modo,
                 'coeficientes': self.model.coef_,
-                'intercepto': self.model.intercept_
+                'intercepto': self.model.intercept_,
+                'modo_entrenamiento': modo
             }
             
+            if self.segmented is not None:
+                self.metrics['segmentos'] = self._segment_metrics(X_test, y_test, y_pred_test)
+            
             # Calcular importancia de features
             self._calculate_feature_importance()
             
@@ -112,6 +204,342 @@ class RegressionPredictor:
         except Exception as e:
             raise Exception(f'Error en entrenamiento: {str(e)}')
     
+    def _cross_validate(self, X, y, cv=5, modo='kfold', n_repeats=10, random_state=42,
+                        segmentado=False):
+        """
+        Validación cruzada sin reentrenar por pliegue
+        
+        Con k pliegues se acumulan los estadísticos de cada pliegue una vez y
+        el modelo de cada uno se resuelve con el total menos el pliegue (la
+        normalización no cambia las predicciones de mínimos cuadrados, así
+        que se trabaja sobre las features originales). El R² de cada pliegue
+        es el mismo que calcula cross_val_score.
+        
+        En leave-one-out el residuo de cada fila sale de la diagonal de la
+        matriz hat, e / (1 - h); como el R² de una sola fila no está
+        definido se devuelve el R² predictivo 1 - PRESS / SST.
+        
+        Con segmentado=True se valida el modelo por cluster
+        (ver _cross_validate_segmented).
+        
+        Returns:
+            numpy array con el R² de cada pliegue (un único valor en 'loo')
+        """
+        if segmentado:
+            return self._cross_validate_segmented(X, y, cv, modo, n_repeats, random_state)
+        
+        total = OLSAccumulator(X.shape[1])
+        total.update(X, y)
+        
+        if modo == 'loo':
+            coef, intercept = total.solve()
+            residuals = y - (X @ coef + intercept)
+            leverage = np.minimum(total.leverage(X), 1 - 1e-12)
+            press = ((residuals / (1 - leverage)) ** 2).sum()
+            return np.array([1 - press / total.syy if total.syy > 0 else 0.0])
+        
+        scores = []
+        for _, test_idx in self._cv_splitter(cv, modo, n_repeats, random_state).split(X):
+            fold = OLSAccumulator(X.shape[1])
+            fold.update(X[test_idx], y[test_idx])
+            coef, intercept = total.difference(fold).solve()
+            scores.append(fold.r2(coef, intercept))
+        
+        return np.array(scores)
+    
+    def _data_signature(self, data):
+        """Hash de features y target para reconocer el DataFrame de entrenamiento"""
+        columns = self.FEATURES_FOR_REGRESSION + [self.TARGET]
+        hashes = pd.util.hash_pandas_object(data[columns], index=False).to_numpy()
+        return len(data), hashlib.sha256(hashes.tobytes()).hexdigest()
+    
+    @staticmethod
+    def _cv_splitter(cv, modo, n_repeats, random_state):
+        if modo == 'repetido':
+            return RepeatedKFold(n_splits=cv, n_repeats=n_repeats, random_state=random_state)
+        return KFold(n_splits=cv)
+    
+    def _cross_validate_segmented(self, X, y, cv=5, modo='kfold', n_repeats=10, random_state=42):
+        """
+        Validación cruzada del modelo por cluster
+        
+        Cada pliegue es un caso ponderado (peso 0 en sus filas de prueba),
+        así que los modelos de todos los pliegues y clusters salen de una
+        sola llamada a SegmentedOLS.coefficients. En leave-one-out se usa el
+        leverage respecto de la matriz del cluster de cada fila.
+        """
+        D = self._segment_design(X)
+        keys = X[:, self._segment_key_index]
+        engine = SegmentedOLS().fit(D, y, keys)
+        
+        if modo == 'loo':
+            residuals = y - engine.predict(D, keys)
+            leverage = np.minimum(engine.leverage(D, keys), 1 - 1e-12)
+            press = ((residuals / (1 - leverage)) ** 2).sum()
+            total = ((y - y.mean()) ** 2).sum()
+            return np.array([1 - press / total if total > 0 else 0.0])
+        
+        folds = [
+            test_idx for _, test_idx in
+            self._cv_splitter(cv, modo, n_repeats, random_state).split(X)
+        ]
+        weights = np.ones((len(folds), len(y)))
+        for i, test_idx in enumerate(folds):
+            weights[i, test_idx] = 0
+        
+        coefs = engine.coefficients(D, y, keys, weights)
+        rows = engine.rows(keys)
+        
+        return np.array([
+            r2_score(y[test_idx], np.einsum('ij,ij->i', D[test_idx], coefs[i, rows[test_idx]]))
+            for i, test_idx in enumerate(folds)
+        ])
+    
+    @property
+    def _segment_key_index(self):
+        return self.FEATURES_FOR_REGRESSION.index(self.SEGMENT_KEY)
+    
+    def _segment_design(self, X):
+        """Matriz de diseño del modelo por cluster (sin la columna de cluster)"""
+        X_scaled = np.delete(self.scaler.transform(X), self._segment_key_index, axis=1)
+        return np.column_stack([np.ones(len(X_scaled)), X_scaled])
+    
+    def _segment_dof(self):
+        """Grados de libertad residuales del modelo por cluster"""
+        n_params = (self.segmented.own_segments.sum() + 1) * self.segmented.coef_.shape[1]
+        return max(self.segmented.counts_.sum() - n_params, 1)
+    
+    def _segment_metrics(self, X_test, y_test, y_pred_test):
+        """Métricas de prueba y coeficientes de cada cluster"""
+        features = [f for f in self.FEATURES_FOR_REGRESSION if f != self.SEGMENT_KEY]
+        test_keys = X_test[:, self._segment_key_index]
+        
+        segments = {}
+        for k, segment in enumerate(self.segmented.segments_):
+            mask = test_keys == segment
+            y_true, y_pred = y_test[mask], y_pred_test[mask]
+            coef = self.segmented.coef_[k]
+            
+            segments[f'cluster_{int(segment)}'] = {
+                'modelo': 'propio' if self.segmented.own_segments[k] else 'global',
+                'n_entrenamiento': int(self.segmented.counts_[k]),
+                'n_prueba': int(mask.sum()),
+                'r2': float(r2_score(y_true, y_pred)) if mask.sum() > 1 else None,
+                'mae': float(mean_absolute_error(y_true, y_pred)) if mask.any() else None,
+                'rmse': float(np.sqrt(mean_squared_error(y_true, y_pred))) if mask.any() else None,
+                'intercepto': float(coef[0]),
+                'coeficientes': {
+                    feature: float(value) for feature, value in zip(features, coef[1:])
+                }
+            }
+        
+        return segments
+    
+    def _apply_solution(self):
+        """
+        Resuelve el acumulador y carga la solución en scaler y model
+        
+        Los coeficientes quedan expresados sobre las features normalizadas,
+        igual que tras un fit de sklearn, para que predict y la importancia
+        de features no dependan del modo de entrenamiento.
+        
+        Returns:
+            (coeficientes, intercepto) sobre las features originales
+        """
+        coef, intercept = self.ols.solve()
+        std = self.ols.scale()
+        n_features = self.ols.n_features
+        
+        self.scaler.mean_ = self.ols.mean_x.copy()
+        self.scaler.scale_ = std
+        self.scaler.var_ = std ** 2
+        self.scaler.n_samples_seen_ = self.ols.count
+        self.scaler.n_features_in_ = n_features
+        
+        # Con features centradas el intercepto es la media del target
+        self.model.coef_ = coef * std
+        self.model.intercept_ = float(self.ols.mean_y)
+        self.model.n_features_in_ = n_features
+        
+        return coef, intercept
+    
+    def _raw_coefficients(self):
+        """Coeficientes e intercepto sobre las features sin normalizar"""
+        coef = self.model.coef_ / self.scaler.scale_
+        return coef, float(self.model.intercept_ - self.scaler.mean_ @ coef)
+    
+    def _update_residual_variance(self):
+        """Varianza residual con n - p - 1 grados de libertad"""
+        coef, intercept = self._raw_coefficients()
+        dof = max(self.training_stats.count - self.training_stats.n_features - 1, 1)
+        self.residual_variance = self.training_stats.sse(coef, intercept) / dof
+    
+    def _chunk_arrays(self, chunk):
+        return (
+            chunk[self.FEATURES_FOR_REGRESSION].to_numpy(dtype='float64'),
+            chunk[self.TARGET].to_numpy(dtype='float64')
+        )
+    
+    def train_chunks(self, chunks, test_size=0.2, random_state=42, n_folds=5):
+        """
+        Entrena por bloques sin tener el dataset completo en memoria
+        
+        Cada fila va al conjunto de prueba con probabilidad test_size y las
+        de entrenamiento a uno de n_folds pliegues; la validación cruzada
+        resuelve cada pliegue con el acumulador total menos el del pliegue.
+        
+        Args:
+            chunks: Función sin argumentos que devuelve un iterable de
+                DataFrames (por ejemplo lambda: pd.read_csv(ruta, chunksize=N));
+                se recorre dos veces, la segunda solo para el MAE
+            test_size: Proporción esperada de filas de prueba
+            random_state: Semilla de la asignación de filas
+            n_folds: Pliegues de la validación cruzada
+            
+        Returns:
+            dict con métricas del modelo
+        """
+        try:
+            n_features = len(self.FEATURES_FOR_REGRESSION)
+            folds = [OLSAccumulator(n_features) for _ in range(n_folds)]
+            test = OLSAccumulator(n_features)
+            
+            rng = np.random.default_rng(random_state)
+            for chunk in chunks():
+                X, y = self._chunk_arrays(chunk)
+                is_test = rng.random(len(y)) < test_size
+                fold = rng.integers(n_folds, size=len(y))
+                test.update(X[is_test], y[is_test])
+                for f in range(n_folds):
+                    selected = ~is_test & (fold == f)
+                    folds[f].update(X[selected], y[selected])
+            
+            self.ols = OLSAccumulator(n_features)
+            for accumulator in folds:
+                self.ols.merge(accumulator)
+            
+            coef, intercept = self._apply_solution()
+            self.is_trained = True
+            self.training_stats = self.ols
+            self.train_positions_ = None
+            self.train_signature_ = None
+            self.segmented = None
+            self._update_residual_variance()
+            
+            cv_scores = []
+            for accumulator in folds:
+                fold_coef, fold_intercept = self.ols.difference(accumulator).solve()
+                cv_scores.append(accumulator.r2(fold_coef, fold_intercept))
+            cv_scores = np.array(cv_scores)
+            
+            # Segunda pasada: errores absolutos con el modelo final
+            abs_errors = {'train': 0.0, 'test': 0.0}
+            rng = np.random.default_rng(random_state)
+            for chunk in chunks():
+                X, y = self._chunk_arrays(chunk)
+                is_test = rng.random(len(y)) < test_size
+                rng.integers(n_folds, size=len(y))
+                errors = np.abs(y - (X @ coef + intercept))
+                abs_errors['test'] += errors[is_test].sum()
+                abs_errors['train'] += errors[~is_test].sum()
+            
+            self.metrics = {
+                'r2_score': test.r2(coef, intercept),
+                'mae': abs_errors['test'] / max(test.count, 1),
+                'rmse': np.sqrt(test.sse(coef, intercept) / max(test.count, 1)),
+                'r2_train': self.ols.r2(coef, intercept),
+                'mae_train': abs_errors['train'] / self.ols.count,
+                'rmse_train': np.sqrt(self.ols.sse(coef, intercept) / self.ols.count),
+                'cv_r2_mean': cv_scores.mean(),
+                'cv_r2_std': cv_scores.std(),
+                'coeficientes': self.model.coef_,
+                'intercepto': self.model.intercept_,
+                'modo_entrenamiento': 'estadisticas',
+                'n_entrenamiento': self.ols.count,
+                'n_prueba': test.count
+            }
+            
+            self._calculate_feature_importance()
+            
+            return self.metrics
+            
+        except Exception as e:
+            raise Exception(f'Error en entrenamiento: {str(e)}')
+    
+    def update_training(self, added=None, removed=None):
+        """
+        Actualiza el modelo con altas y bajas de estudiantes sin reentrenar
+        
+        Args:
+            added: DataFrame con filas a incorporar al entrenamiento
+            removed: DataFrame con filas (tal como se agregaron) a quitar
+            
+        Returns:
+            dict con métricas; las de entrenamiento se recalculan de forma
+            exacta, las de prueba y validación cruzada quedan de la última
+            evaluación completa
+        """
+        if self.ols is None:
+            raise ValueError("El modelo debe entrenarse en modo 'estadisticas' primero")
+        
+        if removed is not None and len(removed):
+            self.ols.remove(*self._chunk_arrays(removed))
+        if added is not None and len(added):
+            self.ols.update(*self._chunk_arrays(added))
+        
+        coef, intercept = self._apply_solution()
+        self._update_residual_variance()
+        self.train_positions_ = None
+        self.train_signature_ = None
+        
+        self.metrics.update({
+            'r2_train': self.ols.r2(coef, intercept),
+            'rmse_train': np.sqrt(self.ols.sse(coef, intercept) / self.ols.count),
+            'coeficientes': self.model.coef_,
+            'intercepto': self.model.intercept_,
+            'n_entrenamiento': self.ols.count
+        })
+        self._calculate_feature_importance()
+        
+        return self.metrics
+    
+    def apply_delta(self, data, updated_positions, previous_rows, inserted_positions):
+        """
+        Aplica una carga incremental (ver DataProcessor.merge_delta) sin reentrenar
+        
+        Los estudiantes actualizados que estaban en el conjunto de
+        entrenamiento reemplazan su fila anterior; los del conjunto de prueba
+        no modifican el modelo. Los estudiantes nuevos se agregan al
+        entrenamiento. Las posiciones de entrenamiento siguen valiendo para
+        data, que pasa a ser el DataFrame de entrenamiento.
+        
+        Args:
+            data: DataFrame completo después del delta (con cluster)
+            updated_positions: Posiciones de las filas actualizadas
+            previous_rows: Versiones anteriores de esas filas, en el mismo
+                orden y con el cluster con que se entrenó el modelo
+            inserted_positions: Posiciones de las filas insertadas
+            
+        Returns:
+            dict con métricas (ver update_training)
+        """
+        if self.train_positions_ is None:
+            raise ValueError('Se desconoce el conjunto de entrenamiento del modelo')
+        
+        updated_positions = np.asarray(updated_positions, dtype='int64')
+        inserted_positions = np.asarray(inserted_positions, dtype='int64')
+        in_train = np.isin(updated_positions, self.train_positions_)
+        train_positions = np.concatenate([self.train_positions_, inserted_positions])
+        
+        self.update_training(
+            added=data.iloc[np.concatenate([updated_positions[in_train], inserted_positions])],
+            removed=previous_rows.iloc[np.flatnonzero(in_train)]
+        )
+        
+        self.train_positions_ = train_positions
+        self.train_signature_ = self._data_signature(data)
+        return self.metrics
+    
     def predict(self, data):
         """
         Realiza predicciones de calificaciones
@@ -129,66 +557,245 @@ class RegressionPredictor:
             # Extraer features
             X = data[self.FEATURES_FOR_REGRESSION].values
             
-            # Normalizar
-            X_scaled = self.scaler.transform(X)
-            
-            # Predecir
-            predictions = self.model.predict(X_scaled)
-            
-            return predictions
+            return self._predict_array(X)
             
         except Exception as e:
             raise Exception(f'Error en predicción: {str(e)}')
     
-    def predict_with_confidence(self, data):
+    def _predict_array(self, X):
+        """Predicción sobre la matriz de features sin normalizar"""
+        if self.segmented is not None:
+            # Cada fila usa los coeficientes de su cluster (un gather)
+            return self.segmented.predict(
+                self._segment_design(X), X[:, self._segment_key_index]
+            )
+        
+        return self.model.predict(self.scaler.transform(X))
+    
+    def predict_with_confidence(self, data, formato='registros', nivel=0.95,
+                                metodo='ols', train_data=None, n_bootstrap=1000):
         """
-        Realiza predicciones con intervalo de confianza
+        Realiza predicciones con intervalo de predicción
+        
+        Con metodo='ols' el intervalo es el de mínimos cuadrados para una
+        observación nueva, ŷ ± t(n-p-1) · σ · √(1 + h), donde h es el
+        leverage de la fila respecto de las filas de entrenamiento; se
+        calcula para todas las filas en una sola operación matricial. Con
+        metodo='bootstrap' se usan los percentiles de bootstrap_intervals.
         
         Args:
             data: DataFrame con features
+            formato: 'registros' (un dict por estudiante) o 'columnas'
+                (dict de arrays paralelos)
+            nivel: Nivel de confianza del intervalo
+            metodo: 'ols' o 'bootstrap'
+            train_data: DataFrame de entrenamiento (bootstrap; por defecto data)
+            n_bootstrap: Cantidad de remuestras (bootstrap)
             
         Returns:
-            dict con predicciones e intervalos
+            lista de dicts o dict de numpy arrays con predicciones e intervalos
         """
         if not self.is_trained:
             raise ValueError('El modelo debe ser entrenado primero')
+        if formato not in self.OUTPUT_FORMATS:
+            raise ValueError(
+                f'Formato inválido: {formato}. Opciones: {", ".join(self.OUTPUT_FORMATS)}'
+            )
+        if metodo not in self.INTERVAL_METHODS:
+            raise ValueError(
+                f'Método de intervalo inválido: {metodo}. Opciones: {", ".join(self.INTERVAL_METHODS)}'
+            )
         
         predictions = self.predict(data)
         
         # Clamping a rango válido 0-10
         predictions_clamped = np.clip(predictions, 0, 10)
         
-        # Calcular intervalo basado en RMSE
-        rmse = self.metrics['rmse']
-        lower_bound = np.clip(predictions_clamped - rmse, 0, 10)
-        upper_bound = np.clip(predictions_clamped + rmse, 0, 10)
+        # Intervalo de predicción por fila
+        if metodo == 'bootstrap':
+            bootstrap = self.bootstrap_intervals(
+                data if train_data is None else train_data, data,
+                n_bootstrap=n_bootstrap, nivel=nivel
+            )
+            lower_bound = np.clip(bootstrap['intervalo_inferior'], 0, 10)
+            upper_bound = np.clip(bootstrap['intervalo_superior'], 0, 10)
+        else:
+            X = data[self.FEATURES_FOR_REGRESSION].to_numpy(dtype='float64')
+            if self.segmented is not None:
+                leverage = self.segmented.leverage(
+                    self._segment_design(X), X[:, self._segment_key_index]
+                )
+                dof = self._segment_dof()
+            else:
+                leverage = self.training_stats.leverage(X)
+                dof = max(self.training_stats.count - self.training_stats.n_features - 1, 1)
+            margin = stats.t.ppf((1 + nivel) / 2, dof) * np.sqrt(
+                self.residual_variance * (1 + leverage)
+            )
+            lower_bound = np.clip(predictions_clamped - margin, 0, 10)
+            upper_bound = np.clip(predictions_clamped + margin, 0, 10)
         
         # Detectar predicciones ajustadas
         adjusted = predictions != predictions_clamped
         
-        results = []
-        for i in range(len(predictions)):
-            result = {
-                'prediccion': float(predictions_clamped[i]),
-                'prediccion_original': float(predictions[i]),
-                'intervalo_inferior': float(lower_bound[i]),
-                'intervalo_superior': float(upper_bound[i]),
-                'ajustada': bool(adjusted[i]),
-                'confianza': self._calculate_confidence(predictions[i])
-            }
-            results.append(result)
+        columns = {
+            'prediccion': predictions_clamped,
+            'prediccion_original': predictions,
+            'intervalo_inferior': lower_bound,
+            'intervalo_superior': upper_bound,
+            'ajustada': adjusted,
+            'confianza': self._calculate_confidence(predictions)
+        }
+        
+        if formato == 'columnas':
+            return columns
         
-        return results
+        keys = list(columns)
+        return [
+            dict(zip(keys, row))
+            for row in zip(*(values.tolist() for values in columns.values()))
+        ]
+    
+    def _design_matrix(self, data):
+        """Features normalizadas con una columna de unos para el intercepto"""
+        X = self.scaler.transform(data[self.FEATURES_FOR_REGRESSION].to_numpy(dtype='float64'))
+        return np.column_stack([np.ones(len(X)), X])
     
-    def _calculate_confidence(self, prediction):
-        """Calcula nivel de confianza de una predicción"""
-        # Confianza basada en proximidad al rango válido
-        if 0 <= prediction <= 10:
-            return 'Alta'
-        elif -1 <= prediction <= 11:
-            return 'Media'
+    @staticmethod
+    def _bootstrap_coefficients(D, y, counts):
+        """
+        Coeficientes de mínimos cuadrados para varias remuestras a la vez
+        
+        Cada remuestra se representa por cuántas veces aparece cada fila, así
+        que sus ecuaciones normales son DᵀWD β = DᵀWy con W = diag(counts).
+        Todas las matrices DᵀWD salen de un único producto counts @ (D⊗D).
+        
+        Args:
+            D: Matriz de diseño (n, p)
+            y: Target (n,)
+            counts: Repeticiones de cada fila por remuestra (B, n)
+            
+        Returns:
+            (B, p) coeficientes, el primero es el intercepto
+        """
+        n, p = D.shape
+        outer = (D[:, :, None] * D[:, None, :]).reshape(n, p * p)
+        gram = (counts @ outer).reshape(-1, p, p)
+        moments = counts @ (D * y[:, None])
+        
+        try:
+            return np.linalg.solve(gram, moments[:, :, None])[:, :, 0]
+        except np.linalg.LinAlgError:
+            # Alguna remuestra sin variación en una feature
+            return (np.linalg.pinv(gram) @ moments[:, :, None])[:, :, 0]
+    
+    def bootstrap_intervals(self, train_data, data=None, n_bootstrap=1000, nivel=0.95,
+                            tipo='prediccion', random_state=42):
+        """
+        Intervalos por percentiles de bootstrap para cada estudiante
+        
+        El modelo se reajusta sobre n_bootstrap remuestras de las filas de
+        entrenamiento, resolviendo todas las ecuaciones normales en lote
+        (ver _bootstrap_coefficients) por bloques de BOOTSTRAP_BLOCK. En el
+        tipo 'prediccion' a cada predicción se le suma un residuo remuestreado
+        (centrado e inflado por √(n/(n-p))), como en el bootstrap de residuos.
+        
+        Args:
+            train_data: Filas a remuestrear; si es el mismo DataFrame con
+                el que se entrenó el modelo se usan solo las filas de train
+            data: DataFrame a predecir (por defecto train_data)
+            n_bootstrap: Cantidad de remuestras (entre 2 y MAX_BOOTSTRAP)
+            nivel: Nivel de confianza del intervalo
+            tipo: 'prediccion' (observación nueva) o 'media' (solo la
+                incertidumbre de los coeficientes)
+            random_state: Semilla de las remuestras
+            
+        Returns:
+            dict de numpy arrays: prediccion, intervalo_inferior,
+            intervalo_superior y error_estandar (sin ajustar al rango 0-10)
+        """
+        if not self.is_trained:
+            raise ValueError('El modelo debe ser entrenado primero')
+        if tipo not in self.BOOTSTRAP_TYPES:
+            raise ValueError(
+                f'Tipo de intervalo inválido: {tipo}. Opciones: {", ".join(self.BOOTSTRAP_TYPES)}'
+            )
+        if not 2 <= n_bootstrap <= self.MAX_BOOTSTRAP:
+            raise ValueError(
+                f'n_bootstrap debe estar entre 2 y {self.MAX_BOOTSTRAP}'
+            )
+        
+        rows = train_data
+        if (self.train_positions_ is not None and
+                self._data_signature(train_data) == self.train_signature_):
+            rows = train_data.iloc[self.train_positions_]
+        data = train_data if data is None else data
+        
+        X = rows[self.FEATURES_FOR_REGRESSION].to_numpy(dtype='float64')
+        X_new = data[self.FEATURES_FOR_REGRESSION].to_numpy(dtype='float64')
+        y = rows[self.TARGET].to_numpy(dtype='float64')
+        
+        if self.segmented is not None:
+            # Modelo por cluster: se reajustan todos los clusters de cada remuestra
+            keys = X[:, self._segment_key_index]
+            D = self._segment_design(X)
+            D_new = self._segment_design(X_new)
+            new_rows = self.segmented.rows(X_new[:, self._segment_key_index])
+            dof = self._segment_dof()
         else:
-            return 'Baja'
+            D = self._design_matrix(rows)
+            D_new = self._design_matrix(data)
+            dof = D.shape[0] - D.shape[1]
+        n = len(y)
+        
+        rng = np.random.default_rng(random_state)
+        
+        if tipo == 'prediccion':
+            residuals = y - self._predict_array(X)
+            residuals = (residuals - residuals.mean()) * np.sqrt(n / max(dof, 1))
+        
+        samples = np.empty((len(D_new), n_bootstrap))
+        for start in range(0, n_bootstrap, self.BOOTSTRAP_BLOCK):
+            block = min(self.BOOTSTRAP_BLOCK, n_bootstrap - start)
+            
+            # Remuestras con reposición como conteos por fila
+            draws = rng.integers(n, size=(block, n)) + (np.arange(block) * n)[:, None]
+            counts = np.bincount(draws.ravel(), minlength=block * n).reshape(block, n)
+            
+            if self.segmented is not None:
+                coefs = self.segmented.coefficients(D, y, keys, counts.astype('float64'))
+                predictions = np.einsum('ij,bij->ib', D_new, coefs[:, new_rows])
+            else:
+                coefs = self._bootstrap_coefficients(D, y, counts.astype('float64'))
+                predictions = D_new @ coefs.T
+            if tipo == 'prediccion':
+                predictions += residuals[rng.integers(n, size=predictions.shape)]
+            samples[:, start:start + block] = predictions
+        
+        alpha = (1 - nivel) / 2
+        lower, upper = np.percentile(samples, [100 * alpha, 100 * (1 - alpha)], axis=1)
+        
+        return {
+            'prediccion': self._predict_array(X_new),
+            'intervalo_inferior': lower,
+            'intervalo_superior': upper,
+            'error_estandar': samples.std(axis=1, ddof=1)
+        }
+    
+    def _calculate_confidence(self, predictions):
+        """
+        Calcula nivel de confianza de una o varias predicciones
+        
+        Confianza basada en proximidad al rango válido: Alta dentro de 0-10,
+        Media hasta un punto afuera, Baja en el resto.
+        """
+        predictions = np.asarray(predictions, dtype='float64')
+        codes = np.full(predictions.shape, 2)
+        codes[(predictions >= -1) & (predictions <= 11)] = 1
+        codes[(predictions >= 0) & (predictions <= 10)] = 0
+        
+        levels = self.CONFIDENCE_LEVELS[codes]
+        return levels if levels.ndim else str(levels)
     
     def _calculate_feature_importance(self):
         """Calcula la importancia de cada feature"""
@@ -279,7 +886,10 @@ class RegressionPredictor:
             'validacion_cruzada': {
                 'r2_promedio': self.metrics['cv_r2_mean'],
                 'r2_desviacion': self.metrics['cv_r2_std'],
-                'estabilidad': 'Estable' if self.metrics['cv_r2_std'] < 0.1 else 'Variable'
+                'estabilidad': (
+                    'No aplica' if self.metrics.get('cv_modo') == 'loo'
+                    else 'Estable' if self.metrics['cv_r2_std'] < 0.1 else 'Variable'
+                )
             },
             'feature_importance': self.feature_importance
         }
@@ -0,0 +1,152 @@
+"""
+Módulo de Regresión Segmentada para SAEM
+Un modelo lineal por segmento (cluster) resuelto en lote: las ecuaciones
+normales de todos los segmentos salen de una pasada sobre los datos
+ordenados por segmento y se resuelven con un único solve apilado
+"""
+
+import numpy as np
+
+class SegmentedOLS:
+    """
+    Mínimos cuadrados con coeficientes propios por segmento
+
+    Además de un modelo por segmento se resuelve el modelo conjunto (la
+    suma de las ecuaciones normales de todos los segmentos), que se usa para
+    segmentos con menos de min_segment_rows filas y para segmentos que no
+    aparecieron en el entrenamiento. Los coeficientes se guardan en una
+    matriz (K + 1, p) cuya última fila es el modelo conjunto, de modo que
+    predecir es un gather por fila.
+    """
+
+    MIN_SEGMENT_ROWS = 10
+
+    def __init__(self, min_segment_rows=None):
+        """
+        Args:
+            min_segment_rows: Filas mínimas para que un segmento tenga
+                coeficientes propios
+        """
+        self.min_segment_rows = min_segment_rows or self.MIN_SEGMENT_ROWS
+        self.segments_ = None
+        self.coef_ = None
+        self.inverse_ = None
+        self.counts_ = None
+
+    @staticmethod
+    def normal_equations(D, y, bounds, weights):
+        """
+        Ecuaciones normales ponderadas de cada segmento
+
+        Args:
+            D: Matriz de diseño (n, p) ordenada por segmento
+            y: Target (n,) en el mismo orden
+            bounds: Inicio de cada segmento y n al final (K + 1,)
+            weights: Peso de cada fila por caso (B, n); cada caso es un
+                ajuste independiente (remuestra, pliegue)
+
+        Returns:
+            (gram (B, K + 1, p, p), momentos (B, K + 1, p)); el índice K es
+            el modelo conjunto
+        """
+        n, p = D.shape
+        n_segments = len(bounds) - 1
+        outer = (D[:, :, None] * D[:, None, :]).reshape(n, p * p)
+        stacked = np.hstack([outer, D * y[:, None]])
+
+        # Cada fila ocupa el bloque de su segmento (ceros en el resto): las
+        # sumas de todos los segmentos y casos salen de un único producto
+        rows = np.arange(bounds[0], n)
+        segment = np.repeat(np.arange(n_segments), np.diff(bounds))
+        expanded = np.zeros((n, n_segments, stacked.shape[1]))
+        expanded[rows, segment] = stacked[rows]
+        sums = (weights @ expanded.reshape(n, -1)).reshape(len(weights), n_segments, -1)
+
+        sums = np.concatenate([sums, sums.sum(axis=1, keepdims=True)], axis=1)
+        gram, moments = sums[:, :, :p * p], sums[:, :, p * p:]
+
+        return gram.reshape(len(weights), n_segments + 1, p, p), moments
+
+    @staticmethod
+    def batched_solve(gram, moments):
+        """Resuelve un lote de sistemas (..., p, p) x = (..., p)"""
+        try:
+            return np.linalg.solve(gram, moments[..., None])[..., 0]
+        except np.linalg.LinAlgError:
+            # Algún segmento sin variación en una feature: mínima norma
+            return (np.linalg.pinv(gram) @ moments[..., None])[..., 0]
+
+    def _use_pooled(self, values, gram):
+        """Reemplaza los segmentos chicos por el modelo conjunto"""
+        small = gram[:, :-1, 0, 0] < self.min_segment_rows
+        shape = small.shape + (1,) * (values.ndim - small.ndim)
+        values[:, :-1] = np.where(small.reshape(shape), values[:, -1:], values[:, :-1])
+        return values
+
+    def _sorted(self, keys):
+        """Orden por segmento y límites de los segmentos conocidos"""
+        keys = np.asarray(keys)
+        order = np.argsort(keys, kind='stable')
+        bounds = np.append(np.searchsorted(keys[order], self.segments_), len(keys))
+        return order, bounds
+
+    def coefficients(self, D, y, keys, weights):
+        """
+        Coeficientes por segmento para varios casos ponderados a la vez
+
+        Args:
+            D: Matriz de diseño (n, p); la primera columna es de unos
+            y: Target (n,)
+            keys: Segmento de cada fila
+            weights: (B, n)
+
+        Returns:
+            (B, K + 1, p)
+        """
+        order, bounds = self._sorted(keys)
+        gram, moments = self.normal_equations(
+            D[order], np.asarray(y, dtype='float64')[order], bounds, weights[:, order]
+        )
+        return self._use_pooled(self.batched_solve(gram, moments), gram)
+
+    def fit(self, D, y, keys):
+        """
+        Ajusta un modelo por segmento
+
+        Args:
+            D: Matriz de diseño (n, p); la primera columna es de unos
+            y: Target (n,)
+            keys: Segmento de cada fila
+        """
+        self.segments_ = np.unique(keys)
+        order, bounds = self._sorted(keys)
+        gram, moments = self.normal_equations(
+            D[order], np.asarray(y, dtype='float64')[order], bounds, np.ones((1, len(order)))
+        )
+
+        self.counts_ = np.diff(bounds)
+        self.coef_ = self._use_pooled(self.batched_solve(gram, moments), gram)[0]
+        # Inversas para el leverage de cada fila (intervalos, leave-one-out)
+        self.inverse_ = self._use_pooled(np.linalg.pinv(gram), gram)[0]
+
+        return self
+
+    @property
+    def own_segments(self):
+        """Máscara de los segmentos con coeficientes propios"""
+        return self.counts_ >= self.min_segment_rows
+
+    def rows(self, keys):
+        """Índice de coeficientes de cada fila (K si el segmento es desconocido)"""
+        keys = np.asarray(keys)
+        index = np.searchsorted(self.segments_, keys)
+        index = np.minimum(index, len(self.segments_) - 1)
+        return np.where(self.segments_[index] == keys, index, len(self.segments_))
+
+    def predict(self, D, keys):
+        """Predicción con los coeficientes del segmento de cada fila"""
+        return np.einsum('ij,ij->i', D, self.coef_[self.rows(keys)])
+
+    def leverage(self, D, keys):
+        """d_iᵀ G⁻¹ d_i con la matriz del segmento de cada fila"""
+        return np.einsum('ij,ijk,ik->i', D, self.inverse_[self.rows(keys)], D)
@@ -0,0 +1,211 @@
+"""
+Módulo de Silhouette para SAEM
+Calcula el coeficiente silhouette de forma exacta, sobre una muestra
+estratificada por cluster o con la versión simplificada por centroides
+"""
+
+import numpy as np
+from sklearn.metrics import silhouette_score, silhouette_samples
+
+class SilhouetteEngine:
+    """Cálculo de silhouette con costo acotado para datasets grandes"""
+
+    MODES = ('auto', 'exacto', 'muestreo', 'simplificado')
+    EXACT_MAX_ROWS = 5000
+    DEFAULT_SAMPLE_SIZE = 4000
+    BLOCK_SIZE = 50000
+    CONFIDENCE_Z = 1.96
+
+    def __init__(self, mode='auto', sample_size=None, random_state=42):
+        """
+        Args:
+            mode: 'exacto' (O(n²)), 'muestreo' (muestra estratificada por
+                cluster), 'simplificado' (distancias a centroides, O(n·k))
+                o 'auto' (exacto hasta EXACT_MAX_ROWS, muestreo por encima)
+            sample_size: Tamaño total de la muestra en modo muestreo
+            random_state: Semilla de la muestra
+        """
+        if mode not in self.MODES:
+            raise ValueError(f'Modo de silhouette inválido: {mode}. Opciones: {", ".join(self.MODES)}')
+
+        self.mode = mode
+        self.sample_size = sample_size or self.DEFAULT_SAMPLE_SIZE
+        self.random_state = random_state
+
+    def resolve_mode(self, n_rows, mode=None):
+        """Modo efectivo para una cantidad de registros"""
+        mode = mode or self.mode
+        if mode not in self.MODES:
+            raise ValueError(f'Modo de silhouette inválido: {mode}. Opciones: {", ".join(self.MODES)}')
+        if mode == 'auto':
+            return 'exacto' if n_rows <= self.EXACT_MAX_ROWS else 'muestreo'
+        return mode
+
+    @staticmethod
+    def _result(value, mode, sample=None, interval=None):
+        return {
+            'valor': float(value),
+            'modo': mode,
+            'muestra': sample,
+            'intervalo': interval
+        }
+
+    def score(self, X, labels, centroids=None, mode=None):
+        """
+        Calcula el silhouette de un clustering
+
+        Args:
+            X: Matriz de features normalizada
+            labels: Etiqueta de cluster por fila
+            centroids: Centroides en el mismo espacio que X (modo simplificado;
+                si no se indican se calculan como medias por cluster)
+            mode: Modo a usar en lugar del configurado
+
+        Returns:
+            dict con valor, modo, muestra e intervalo de confianza (95%)
+            cuando el valor es una estimación por muestreo
+        """
+        labels = np.asarray(labels)
+        mode = self.resolve_mode(len(labels), mode)
+
+        # sklearn exige entre 2 y n - 1 clusters distintos
+        n_labels = len(np.unique(labels))
+        if n_labels < 2 or n_labels >= len(labels):
+            return self._result(0.0, mode)
+
+        if mode == 'exacto':
+            return self._result(silhouette_score(X, labels), mode)
+
+        if mode == 'simplificado':
+            if centroids is None:
+                centroids = self._cluster_means(X, labels)
+            blocks = (
+                (X[start:start + self.BLOCK_SIZE], labels[start:start + self.BLOCK_SIZE])
+                for start in range(0, len(labels), self.BLOCK_SIZE)
+            )
+            return self.score_simplified(blocks, centroids)
+
+        indices = self.sample_indices(labels)
+        return self.score_sample(X[indices], labels[indices], np.bincount(labels))
+
+    @staticmethod
+    def _cluster_means(X, labels):
+        """Media de cada cluster (filas = clusters)"""
+        counts = np.bincount(labels)
+        sums = np.stack([
+            np.bincount(labels, weights=X[:, j], minlength=len(counts))
+            for j in range(X.shape[1])
+        ], axis=1)
+        return sums / np.maximum(counts, 1)[:, None]
+
+    def sample_indices(self, labels):
+        """
+        Muestra estratificada por cluster con semilla fija
+
+        Cada cluster aporta en proporción a su tamaño y al menos dos filas
+        (si las tiene), para que ningún grupo chico quede sin representar.
+
+        Returns:
+            Posiciones de la muestra en orden ascendente
+        """
+        labels = np.asarray(labels)
+        n = len(labels)
+        if n <= self.sample_size:
+            return np.arange(n)
+
+        rng = np.random.default_rng(self.random_state)
+        order = np.argsort(labels, kind='stable')
+        counts = np.bincount(labels)
+        bounds = np.concatenate([[0], np.cumsum(counts)])
+
+        selected = []
+        for cluster, size in enumerate(counts):
+            if size == 0:
+                continue
+            quota = min(size, max(2, int(round(self.sample_size * size / n))))
+            members = order[bounds[cluster]:bounds[cluster + 1]]
+            selected.append(rng.choice(members, quota, replace=False))
+
+        return np.sort(np.concatenate(selected))
+
+    def score_sample(self, X_sample, labels_sample, cluster_sizes):
+        """
+        Estima el silhouette a partir de una muestra estratificada
+
+        Los valores por fila se ponderan por el peso de cada cluster en la
+        población y el intervalo usa la varianza del estimador estratificado.
+
+        Args:
+            X_sample: Features normalizadas de las filas muestreadas
+            labels_sample: Etiquetas de las filas muestreadas
+            cluster_sizes: Tamaño de cada cluster en el dataset completo
+        """
+        labels_sample = np.asarray(labels_sample)
+        cluster_sizes = np.asarray(cluster_sizes)
+        n_sample = len(labels_sample)
+
+        n_labels = len(np.unique(labels_sample))
+        if n_labels < 2 or n_labels >= n_sample:
+            return self._result(0.0, 'muestreo', n_sample)
+
+        values = silhouette_samples(X_sample, labels_sample)
+
+        if n_sample == cluster_sizes.sum():
+            return self._result(values.mean(), 'muestreo', n_sample, [float(values.mean())] * 2)
+
+        weights = cluster_sizes / cluster_sizes.sum()
+        estimate = 0.0
+        variance = 0.0
+        for cluster in np.unique(labels_sample):
+            stratum = values[labels_sample == cluster]
+            size = cluster_sizes[cluster]
+            estimate += weights[cluster] * stratum.mean()
+            if len(stratum) > 1:
+                correction = 1 - len(stratum) / size
+                variance += weights[cluster] ** 2 * correction * stratum.var(ddof=1) / len(stratum)
+
+        margin = self.CONFIDENCE_Z * np.sqrt(variance)
+        return self._result(
+            estimate, 'muestreo', n_sample,
+            [float(estimate - margin), float(estimate + margin)]
+        )
+
+    def score_simplified(self, blocks, centroids):
+        """
+        Silhouette simplificado acumulado por bloques
+
+        Args:
+            blocks: Iterable de (X, labels) por bloque de filas
+            centroids: Centroides en el mismo espacio que X
+        """
+        total = 0.0
+        rows = 0
+        clusters = set()
+        for X, labels in blocks:
+            total += self.simplified_values(X, labels, centroids).sum()
+            rows += len(labels)
+            clusters.update(np.unique(labels).tolist())
+
+        if len(clusters) < 2:
+            return self._result(0.0, 'simplificado')
+
+        return self._result(total / rows, 'simplificado')
+
+    @staticmethod
+    def simplified_values(X, labels, centroids):
+        """
+        Silhouette simplificado por fila
+
+        a = distancia al centroide propio, b = distancia al centroide
+        ajeno más cercano; s = (b - a) / max(a, b).
+        """
+        distances = np.sqrt(
+            ((X[:, None, :] - centroids[None, :, :]) ** 2).sum(axis=2)
+        )
+        rows = np.arange(len(labels))
+        a = distances[rows, labels]
+        distances[rows, labels] = np.inf
+        b = distances.min(axis=1)
+
+        denominator = np.maximum(a, b)
+        return np.divide(b - a, denominator, out=np.zeros_like(a), where=denominator > 0)
@@ -0,0 +1,159 @@
+"""
+Módulo de Índice de Similitud para SAEM
+KD-tree sobre las features normalizadas para buscar estudiantes similares
+y el centroide más cercano sin recorrer todo el dataset
+"""
+
+import numpy as np
+from sklearn.neighbors import KDTree
+
+class SimilarityIndex:
+    """
+    Índice espacial de estudiantes con actualización incremental
+
+    Las filas modificadas o agregadas por cargas incrementales van a un
+    buffer que se consulta por fuerza bruta junto al árbol; las versiones
+    viejas quedan marcadas como obsoletas. Cuando el buffer supera
+    REBUILD_FRACTION del índice, el árbol se reconstruye.
+    """
+
+    LEAF_SIZE = 40
+    REBUILD_FRACTION = 0.1
+
+    def __init__(self, leaf_size=None, rebuild_fraction=None):
+        """
+        Args:
+            leaf_size: Tamaño de hoja del KD-tree
+            rebuild_fraction: Proporción de filas pendientes que dispara
+                la reconstrucción del árbol
+        """
+        self.leaf_size = leaf_size or self.LEAF_SIZE
+        self.rebuild_fraction = (
+            rebuild_fraction if rebuild_fraction is not None else self.REBUILD_FRACTION
+        )
+        self.tree = None
+        self.centroid_tree = None
+        self.rebuilds = 0
+
+    def build(self, X_scaled, centroids):
+        """
+        Construye el índice
+
+        Args:
+            X_scaled: Features normalizadas; la fila i es la posición i del
+                dataset (un array float64 se usa sin copiar y no debe
+                modificarse después)
+            centroids: Centroides en el mismo espacio
+
+        Returns:
+            self
+        """
+        self.X = np.ascontiguousarray(X_scaled, dtype='float64')
+        self.tree = KDTree(self.X, leaf_size=self.leaf_size)
+        self.centroid_tree = KDTree(np.asarray(centroids, dtype='float64'))
+        self.stale = np.zeros(len(self.X), dtype=bool)
+        self.pending = {}
+        self.rebuilds += 1
+        return self
+
+    @property
+    def size(self):
+        """Cantidad de estudiantes indexados"""
+        return int(len(self.X) - self.stale.sum() + len(self.pending))
+
+    def update(self, positions, X_rows):
+        """
+        Incorpora filas insertadas o modificadas
+
+        Args:
+            positions: Posiciones de fila en el dataset
+            X_rows: Features normalizadas de esas filas
+        """
+        if self.tree is None:
+            raise ValueError('El índice no fue construido')
+
+        X_rows = np.asarray(X_rows, dtype='float64')
+        for position, row in zip(np.asarray(positions).tolist(), X_rows):
+            if position < len(self.X):
+                self.stale[position] = True
+            self.pending[position] = row
+
+        if len(self.pending) > self.rebuild_fraction * len(self.X):
+            self._rebuild()
+
+    def _rebuild(self):
+        """Reconstruye el árbol con las filas pendientes incorporadas"""
+        n = max(len(self.X), max(self.pending) + 1)
+        X = np.empty((n, self.X.shape[1]))
+        X[:len(self.X)] = self.X
+        positions = np.fromiter(self.pending.keys(), dtype='int64')
+        X[positions] = np.array(list(self.pending.values()))
+
+        centroids = np.asarray(self.centroid_tree.data)
+        self.build(X, centroids)
+
+    def vector(self, position):
+        """Features normalizadas vigentes de una posición"""
+        if position in self.pending:
+            return self.pending[position]
+        return self.X[position]
+
+    def query(self, x, n_neighbors=5, exclude=None):
+        """
+        Estudiantes más cercanos a un punto
+
+        Args:
+            x: Features normalizadas del punto de consulta
+            n_neighbors: Cantidad de vecinos
+            exclude: Posición a excluir (el propio estudiante)
+
+        Returns:
+            (posiciones, distancias) ordenadas por distancia
+        """
+        if self.tree is None:
+            raise ValueError('El índice no fue construido')
+
+        x = np.asarray(x, dtype='float64').reshape(1, -1)
+
+        # Si hay entradas obsoletas o excluidas entre los vecinos se amplía
+        # la búsqueda hasta completar n_neighbors válidos
+        k = min(len(self.X), n_neighbors + (exclude is not None))
+        while True:
+            distances, positions = self.tree.query(x, k=k)
+            distances, positions = distances[0], positions[0]
+
+            valid = ~self.stale[positions]
+            if exclude is not None:
+                valid &= positions != exclude
+
+            if valid.sum() >= n_neighbors or k == len(self.X):
+                break
+            k = min(len(self.X), 2 * k)
+
+        positions, distances = positions[valid], distances[valid]
+
+        if self.pending:
+            pending_positions = np.fromiter(self.pending.keys(), dtype='int64')
+            pending_rows = np.array(list(self.pending.values()))
+            pending_distances = np.sqrt(((pending_rows - x) ** 2).sum(axis=1))
+            keep = pending_positions != exclude if exclude is not None else slice(None)
+            positions = np.concatenate([positions, pending_positions[keep]])
+            distances = np.concatenate([distances, pending_distances[keep]])
+
+        order = np.argsort(distances, kind='stable')[:n_neighbors]
+        return positions[order], distances[order]
+
+    def nearest_centroid(self, x):
+        """
+        Centroide más cercano a un punto
+
+        Returns:
+            (cluster, distancia)
+        """
+        if self.centroid_tree is None:
+            raise ValueError('El índice no fue construido')
+
+        distances, clusters = self.centroid_tree.query(
+            np.asarray(x, dtype='float64').reshape(1, -1), k=1
+        )
+        return int(clusters[0, 0]), float(distances[0, 0])
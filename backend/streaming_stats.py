@@ -0,0 +1,191 @@
+"""
+Módulo de Estadísticas Incrementales para SAEM
+Momentos (Welford/Chan) y cuantiles aproximados (sketch KLL) que se
+actualizan por bloques y se combinan entre bloques o procesos
+"""
+
+import numpy as np
+
+class RunningMoments:
+    """Media y varianza acumuladas, combinables y con soporte de bajas"""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    @staticmethod
+    def _batch(values):
+        """Momentos de un bloque (dos pasadas sobre el bloque, estable)"""
+        values = np.asarray(values, dtype='float64')
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return 0, 0.0, 0.0
+        mean = values.mean()
+        return len(values), mean, float(((values - mean) ** 2).sum())
+
+    def _combine(self, count, mean, m2):
+        """Fórmula de Chan para unir dos conjuntos de momentos"""
+        if count == 0:
+            return
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta ** 2 * self.count * count / total
+        self.count = total
+
+    def update(self, values):
+        """Agrega un bloque de valores"""
+        self._combine(*self._batch(values))
+
+    def merge(self, other):
+        """Combina con otro acumulador (por ejemplo, de otro proceso)"""
+        self._combine(other.count, other.mean, other.m2)
+
+    def remove(self, values):
+        """Quita un bloque de valores agregado previamente"""
+        count, mean, m2 = self._batch(values)
+        if count == 0:
+            return
+        remaining = self.count - count
+        if remaining <= 0:
+            self.__init__()
+            return
+        rest_mean = (self.count * self.mean - count * mean) / remaining
+        delta = mean - rest_mean
+        self.m2 = max(self.m2 - m2 - delta ** 2 * remaining * count / self.count, 0.0)
+        self.mean = rest_mean
+        self.count = remaining
+
+    def variance(self, ddof=1):
+        if self.count - ddof <= 0:
+            return float('nan')
+        return self.m2 / (self.count - ddof)
+
+    def std(self, ddof=1):
+        return float(np.sqrt(self.variance(ddof)))
+
+
+class QuantileSketch:
+    """
+    Sketch KLL de cuantiles aproximados
+
+    Mientras no se compacta (hasta ~k valores) los cuantiles son exactos;
+    después el error de rango es O(1/k).
+    """
+
+    DEFAULT_K = 200
+
+    def __init__(self, k=DEFAULT_K, seed=0):
+        self.k = k
+        self.count = 0
+        self.compactors = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level):
+        depth = len(self.compactors) - level - 1
+        return max(2, int(np.ceil(self.k * (2 / 3) ** depth)))
+
+    def update(self, values):
+        """Agrega un bloque de valores"""
+        values = np.asarray(values, dtype='float64')
+        values = values[~np.isnan(values)]
+        self.count += len(values)
+        self.compactors[0] = np.concatenate([self.compactors[0], values])
+        self._compress()
+
+    def merge(self, other):
+        """Combina con otro sketch"""
+        while len(self.compactors) < len(other.compactors):
+            self.compactors.append(np.empty(0))
+        for level, items in enumerate(other.compactors):
+            self.compactors[level] = np.concatenate([self.compactors[level], items])
+        self.count += other.count
+        self._compress()
+
+    def _compress(self):
+        level = 0
+        while level < len(self.compactors):
+            items = self.compactors[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self.compactors):
+                    self.compactors.append(np.empty(0))
+                items = np.sort(items)
+                # Con cantidad impar se conserva un elemento en el nivel
+                keep = items[len(items) - len(items) % 2:]
+                items = items[:len(items) - len(items) % 2]
+                promoted = items[self._rng.integers(2)::2]
+                self.compactors[level + 1] = np.concatenate(
+                    [self.compactors[level + 1], promoted]
+                )
+                self.compactors[level] = keep
+            level += 1
+
+    def quantile(self, q):
+        """Cuantil q (0-1); interpolación lineal mientras el sketch es exacto"""
+        if self.count == 0:
+            return float('nan')
+
+        if len(self.compactors) == 1:
+            return float(np.quantile(self.compactors[0], q))
+
+        values = np.concatenate(self.compactors)
+        weights = np.concatenate([
+            np.full(len(items), 2 ** level, dtype='float64')
+            for level, items in enumerate(self.compactors)
+        ])
+        order = np.argsort(values)
+        cumulative = np.cumsum(weights[order])
+        position = np.searchsorted(cumulative, q * cumulative[-1])
+        return float(values[order][min(position, len(values) - 1)])
+
+
+class StatisticsAccumulator:
+    """Momentos y sketch de cuantiles por columna"""
+
+    def __init__(self, columns, k=QuantileSketch.DEFAULT_K):
+        self.columns = list(columns)
+        self.k = k
+        self.rows = 0
+        self.moments = {col: RunningMoments() for col in self.columns}
+        self.sketches = {col: QuantileSketch(k) for col in self.columns}
+
+    def update(self, df):
+        """Agrega un bloque de filas"""
+        self.rows += len(df)
+        for col in self.columns:
+            values = df[col].to_numpy(dtype='float64')
+            self.moments[col].update(values)
+            self.sketches[col].update(values)
+
+    def merge(self, other):
+        """Combina con otro acumulador sobre las mismas columnas"""
+        self.rows += other.rows
+        for col in self.columns:
+            self.moments[col].merge(other.moments[col])
+            self.sketches[col].merge(other.sketches[col])
+
+    def replace(self, old_rows, new_rows, full_data):
+        """
+        Reemplaza filas modificadas
+
+        Los momentos se corrigen de forma exacta; los sketches no admiten
+        bajas y se reconstruyen a partir de full_data.
+        """
+        for col in self.columns:
+            self.moments[col].remove(old_rows[col].to_numpy(dtype='float64'))
+            self.moments[col].update(new_rows[col].to_numpy(dtype='float64'))
+            self.sketches[col] = QuantileSketch(self.k)
+            self.sketches[col].update(full_data[col].to_numpy(dtype='float64'))
+
+    def mean(self, col):
+        return float(self.moments[col].mean) if self.moments[col].count else float('nan')
+
+    def std(self, col):
+        return self.moments[col].std()
+
+    def median(self, col):
+        return self.sketches[col].quantile(0.5)
+
+    def quantile(self, col, q):
+        return self.sketches[col].quantile(q)
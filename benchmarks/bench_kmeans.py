@@ -0,0 +1,72 @@
+"""
+Benchmark de backends K-means para SAEM
+Compara sklearn.cluster.KMeans con NumpyKMeans sobre datos sintéticos con
+las cuatro features de clustering (ya normalizadas)
+
+Uso:
+    python benchmarks/bench_kmeans.py [--tamanos 100 1000 ...] [--k 3] [--repeticiones 3]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+from sklearn.cluster import KMeans
+from sklearn.preprocessing import StandardScaler
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.kmeans_engine import NumpyKMeans
+
+CENTERS = np.array([
+    [50, 140, 2, 12],
+    [30, 70, 8, 5],
+    [10, 20, 15, 1]
+])
+SPREAD = [10, 30, 4, 4]
+
+
+def make_data(n, seed=0):
+    """Estudiantes sintéticos alrededor de tres perfiles"""
+    rng = np.random.default_rng(seed)
+    X = CENTERS[rng.integers(0, len(CENTERS), n)] + rng.normal(0, SPREAD, (n, 4))
+    return StandardScaler().fit_transform(X)
+
+
+def best_time(factory, X, repetitions):
+    """Mejor tiempo de entrenamiento entre varias repeticiones"""
+    best = float('inf')
+    for _ in range(repetitions):
+        start = time.perf_counter()
+        model = factory().fit(X)
+        best = min(best, time.perf_counter() - start)
+    return best, model
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--tamanos', type=int, nargs='+',
+                        default=[50, 500, 5000, 50000, 200000])
+    parser.add_argument('--k', type=int, default=3)
+    parser.add_argument('--repeticiones', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'n':>8} {'sklearn (s)':>12} {'numpy (s)':>10} {'speedup':>8} {'inercia rel.':>13}")
+
+    for n in args.tamanos:
+        X = make_data(n)
+        sk_time, sk_model = best_time(
+            lambda: KMeans(n_clusters=args.k, n_init=10, random_state=42), X, args.repeticiones
+        )
+        np_time, np_model = best_time(
+            lambda: NumpyKMeans(n_clusters=args.k, n_init=10, random_state=42), X, args.repeticiones
+        )
+
+        print(f'{n:>8} {sk_time:>12.4f} {np_time:>10.4f} {sk_time / np_time:>7.2f}x '
+              f'{np_model.inertia_ / sk_model.inertia_:>13.6f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,187 @@
+"""
+Tests de integración de los endpoints de la API
+"""
+
+import io
+import os
+import pytest
+import numpy as np
+import pandas as pd
+from backend.event_log import EventLogAggregator
+
+SUBMISSION = EventLogAggregator.SUBMISSION_EVENT
+VIEWED = '\\mod_resource\\event\\course_module_viewed'
+
+@pytest.fixture(scope='module')
+def client(tmp_path_factory):
+    """Cliente de prueba con registro de modelos en un directorio temporal"""
+    previous = os.environ.get('SAEM_MODELS_DIR')
+    os.environ['SAEM_MODELS_DIR'] = str(tmp_path_factory.mktemp('models'))
+    import app
+    app.app.config['TESTING'] = True
+    yield app.app.test_client()
+    if previous is None:
+        os.environ.pop('SAEM_MODELS_DIR', None)
+    else:
+        os.environ['SAEM_MODELS_DIR'] = previous
+
+@pytest.fixture
+def event_log():
+    """Log de 60 estudiantes con una entrega; la mitad después de la fecha límite"""
+    rows = []
+    for userid in range(1, 61):
+        rows.append((VIEWED, 'mod_resource', 'r', 10, userid, 1000))
+        rows.append((SUBMISSION, 'mod_assign', 'u', 30, userid, 3000 if userid % 2 else 5000))
+    df = pd.DataFrame(rows, columns=EventLogAggregator.EVENT_COLUMNS)
+    return df.to_csv(index=False).encode('utf-8')
+
+@pytest.mark.integration
+class TestEventLogUpload:
+
+    def test_deadlines_count_late_submissions(self, client, event_log):
+        """Test: Las fechas límite subidas se usan para contar entregas tarde"""
+        deadlines = b'contextinstanceid,timestamp\n30,4000\n'
+        response = client.post('/api/upload/eventos', data={
+            'file': (io.BytesIO(event_log), 'log.csv'),
+            'fechas_limite': (io.BytesIO(deadlines), 'fechas.csv')
+        })
+
+        assert response.status_code == 200
+
+        import app
+        assert app.current_data['entregas_tarde'].sum() == 30
+
+    def test_without_deadlines(self, client, event_log):
+        """Test: Sin fechas límite no hay entregas tarde"""
+        response = client.post('/api/upload/eventos', data={
+            'file': (io.BytesIO(event_log), 'log.csv')
+        })
+
+        assert response.status_code == 200
+
+        import app
+        assert app.current_data['entregas_tarde'].sum() == 0
+
+    def test_invalid_deadlines_file(self, client, event_log):
+        """Test: Archivo de fechas límite sin las columnas requeridas"""
+        response = client.post('/api/upload/eventos', data={
+            'file': (io.BytesIO(event_log), 'log.csv'),
+            'fechas_limite': (io.BytesIO(b'tarea,fecha\n30,4000\n'), 'fechas.csv')
+        })
+
+        assert response.status_code == 400
+
+    def test_grades_file(self, client, event_log):
+        """Test: Los estudiantes sin calificación se descartan al subir calificaciones"""
+        grades = 'userid,calificacion_final\n' + ''.join(f'{u},7.5\n' for u in range(1, 56))
+        response = client.post('/api/upload/eventos', data={
+            'file': (io.BytesIO(event_log), 'log.csv'),
+            'calificaciones': (io.BytesIO(grades.encode('utf-8')), 'notas.csv')
+        })
+
+        assert response.status_code == 200
+        assert response.json['registros'] == 55
+        assert response.json['sin_calificacion'] == 5
+
+    def test_invalid_grades_file(self, client, event_log):
+        """Test: Archivo de calificaciones sin las columnas requeridas"""
+        response = client.post('/api/upload/eventos', data={
+            'file': (io.BytesIO(event_log), 'log.csv'),
+            'calificaciones': (io.BytesIO(b'usuario,nota\n1,7.5\n'), 'notas.csv')
+        })
+
+        assert response.status_code == 400
+        assert response.json['details'] == ['calificacion_final', 'userid']
+
+@pytest.fixture
+def sample_csv():
+    """Dataset de ejemplo del repositorio"""
+    path = os.path.join(os.path.dirname(__file__), '..', 'data', 'sample_dataset_.csv')
+    with open(path, 'rb') as f:
+        return f.read()
+
+@pytest.mark.integration
+class TestModelRegistryEndpoints:
+
+    def test_registry_model_installed_without_copy(self, client, sample_csv):
+        """Test: La versión del registro se usa sin copiar y se copia al modificarla"""
+        import app
+        client.post('/api/upload', data={'file': (io.BytesIO(sample_csv), 'a.csv')})
+        version = client.post('/api/clustering', json={'k': 3, 'reentrenar': True}).json['version']
+        client.post('/api/clustering', json={'k': 4})
+
+        response = client.post('/api/clustering', json={'k': 3})
+        cached = app.model_registry.load(version)['modelo']
+        labels = cached.labels_.copy()
+
+        assert response.json['desde_registro']
+        assert app.clustering_analyzer is cached
+
+        delta = (
+            b'estudiante_id,actividades_completadas,tiempo_plataforma_horas,'
+            b'entregas_tarde,foros_participacion,calificacion_final\n'
+            b'EST900,10,20,1,1,6\n'
+        )
+        client.post('/api/upload/delta', data={'file': (io.BytesIO(delta), 'd.csv')})
+
+        assert app.clustering_analyzer is not cached
+        assert app.model_registry.load(version)['modelo'] is cached
+        assert np.array_equal(cached.labels_, labels)
+
+@pytest.mark.integration
+class TestDeltaUpload:
+
+    def test_delta_updates_regression_without_retraining(self, client, sample_csv):
+        """Test: Un delta actualiza la regresión 'estadisticas' sin reentrenar"""
+        import app
+        from sklearn.linear_model import LinearRegression
+        from backend.regression import RegressionPredictor
+
+        client.post('/api/upload', data={'file': (io.BytesIO(sample_csv), 'a.csv')})
+        client.post('/api/clustering', json={'k': 3, 'reentrenar': True})
+        before = client.post('/api/prediction', json={'modo': 'estadisticas', 'reentrenar': True}).json
+
+        position = int(app.regression_predictor.train_positions_[0])
+        student = app.current_data.iloc[position]['estudiante_id']
+        delta = (
+            'estudiante_id,actividades_completadas,tiempo_plataforma_horas,'
+            'entregas_tarde,foros_participacion,calificacion_final\n'
+            f'{student},1,2,15,0,1.5\n'
+            'EST900,60,150,0,14,9.8\n'
+        ).encode('utf-8')
+        response = client.post('/api/upload/delta', data={'file': (io.BytesIO(delta), 'd.csv')})
+
+        assert response.status_code == 200
+        assert response.json['regresion_actualizada']
+
+        after = client.post('/api/prediction', json={'modo': 'estadisticas'}).json
+
+        assert after['desde_registro']
+        assert not np.allclose(after['coeficientes'], before['coeficientes'])
+
+        # El modelo es el de las filas de entrenamiento con el delta aplicado
+        data = app.current_data.assign(cluster=app.clustering_results['labels'])
+        rows = data.iloc[app.regression_predictor.train_positions_]
+        features = RegressionPredictor.FEATURES_FOR_REGRESSION
+        expected = LinearRegression().fit(rows[features], rows[RegressionPredictor.TARGET])
+        assert np.allclose(app.regression_predictor.predict(data), expected.predict(data[features]))
+        assert app.regression_results['n_entrenamiento'] == len(rows) == 41
+
+@pytest.mark.integration
+class TestClusteringStability:
+
+    def test_n_bootstrap_bounds(self, client, sample_csv, monkeypatch):
+        """Test: n_bootstrap se limita a MAX_BOOTSTRAP y se valida el mínimo"""
+        from backend.clustering import ClusteringAnalyzer
+        monkeypatch.setattr(ClusteringAnalyzer, 'MAX_BOOTSTRAP', 3)
+        client.post('/api/upload', data={'file': (io.BytesIO(sample_csv), 'a.csv')})
+        client.post('/api/clustering', json={'k': 3})
+
+        response = client.post('/api/clustering/stability', json={'n_bootstrap': 10**9})
+
+        assert response.status_code == 200
+        assert response.json['n_bootstrap'] == 3
+
+        response = client.post('/api/clustering/stability', json={'n_bootstrap': 1})
+
+        assert response.status_code == 400
@@ -5,7 +5,9 @@ Tests para el módulo de Clustering K-means
 import pytest
 import pandas as pd
 import numpy as np
+from sklearn.cluster import KMeans
 from backend.clustering import ClusteringAnalyzer
+from backend.kmeans_engine import NumpyKMeans
 
 @pytest.fixture
 def sample_data():
@@ -144,4 +146,378 @@ class TestClusteringAnalyzer:
         for char in characteristics:
             assert 'cluster_id' in char
             assert 'tamaño' in char
-            assert 'estadisticas' in char
\ No newline at end of file
+            assert 'estadisticas' in char
+    
+    def test_update_assignments(self, clustering_analyzer, sample_data):
+        """Test: Reasignación solo de filas afectadas por un delta"""
+        result = clustering_analyzer.fit_predict(sample_data, k=3)
+        extended = pd.concat([sample_data, sample_data.iloc[[0]]], ignore_index=True)
+        
+        updated = clustering_analyzer.update_assignments(extended, np.array([100]))
+        
+        assert len(updated['labels']) == 101
+        assert updated['labels'][100] == result['labels'][0]
+        assert np.array_equal(updated['labels'][:100], result['labels'])
+        assert sum(c['cantidad'] for c in updated['distribucion'].values()) == 101
+    
+    def test_minibatch_mode(self, clustering_analyzer, sample_data):
+        """Test: Modo minibatch devuelve el mismo formato de resultados"""
+        clustering_analyzer.MINIBATCH_CHUNKSIZE = 30
+        result = clustering_analyzer.fit_predict(sample_data, k=3, modo='minibatch')
+        
+        assert result['modo'] == 'minibatch'
+        assert len(result['labels']) == len(sample_data)
+        assert result['centroids'].shape == (3, 4)
+        assert result['inertia'] > 0
+        assert set(result['distribucion']) == set(result['interpretacion'])
+        assert sum(c['cantidad'] for c in result['distribucion'].values()) == 100
+        
+        # Las etiquetas corresponden al centroide más cercano
+        predicted = clustering_analyzer.predict_cluster(sample_data.iloc[5])
+        assert predicted == result['labels'][5]
+    
+    def test_minibatch_small_tail_block(self):
+        """Test: Sin bloque final con menos de k filas (umbral + resto chico)"""
+        rng = np.random.default_rng(1)
+        data = pd.DataFrame(
+            rng.normal(50, 10, (203, 4)), columns=ClusteringAnalyzer.FEATURES_FOR_CLUSTERING
+        )
+        analyzer = ClusteringAnalyzer(minibatch_threshold=200)
+        analyzer.MINIBATCH_CHUNKSIZE = 100
+        
+        blocks = analyzer._minibatch_blocks(203, 5)
+        assert min(block.stop - block.start for block in blocks) >= 5
+        assert sum(block.stop - block.start for block in blocks) == 203
+        
+        for seed in range(5):
+            result = analyzer.fit_predict(data, k=5, random_state=seed)
+            assert result['modo'] == 'minibatch'
+            assert len(result['labels']) == 203
+    
+    def test_minibatch_matches_full_on_separated_data(self):
+        """Test: Minibatch encuentra los mismos grupos que K-means completo"""
+        rng = np.random.default_rng(0)
+        centers = np.array([[55, 140, 1, 12], [30, 70, 8, 5], [8, 15, 16, 1]])
+        groups = rng.integers(0, 3, 3000)
+        data = pd.DataFrame(
+            centers[groups] + rng.normal(0, [3, 8, 1, 1], (3000, 4)),
+            columns=ClusteringAnalyzer.FEATURES_FOR_CLUSTERING
+        )
+        
+        full = ClusteringAnalyzer().fit_predict(data, k=3, modo='completo')
+        minibatch = ClusteringAnalyzer().fit_predict(data, k=3, modo='minibatch')
+        
+        assert np.isclose(minibatch['inertia'], full['inertia'], rtol=0.01)
+        assert pd.crosstab(full['labels'], minibatch['labels']).max().sum() == 3000
+    
+    def test_auto_mode_threshold(self, sample_data):
+        """Test: Modo automático según el umbral de registros"""
+        assert ClusteringAnalyzer().fit_predict(sample_data, k=3)['modo'] == 'completo'
+        
+        analyzer = ClusteringAnalyzer(minibatch_threshold=50)
+        assert analyzer.fit_predict(sample_data, k=3)['modo'] == 'minibatch'
+    
+    def test_invalid_mode(self, clustering_analyzer, sample_data):
+        """Test: Modo de clustering inválido"""
+        with pytest.raises(Exception):
+            clustering_analyzer.fit_predict(sample_data, k=3, modo='otro')
+    
+    def test_silhouette_mode_reported(self, clustering_analyzer, sample_data):
+        """Test: El resultado informa el modo de silhouette usado"""
+        exact = clustering_analyzer.fit_predict(sample_data, k=3)
+        simplified = clustering_analyzer.fit_predict(
+            sample_data, k=3, silhouette_modo='simplificado'
+        )
+        sampled = clustering_analyzer.fit_predict(
+            sample_data, k=3, modo='minibatch', silhouette_modo='muestreo'
+        )
+        
+        assert exact['silhouette_modo'] == 'exacto'
+        assert simplified['silhouette_modo'] == 'simplificado'
+        assert sampled['silhouette_modo'] == 'muestreo'
+        assert sampled['silhouette_intervalo'] is not None
+        
+        optimal = clustering_analyzer.get_optimal_k(sample_data, k_range=range(2, 4))
+        assert all(r['silhouette_modo'] == 'exacto' for r in optimal)
+    
+    def test_optimal_k_keeps_scaler(self, clustering_analyzer, sample_data):
+        """Test: El barrido de K no reemplaza el escalador del modelo activo"""
+        clustering_analyzer.fit_predict(sample_data, k=3)
+        scaler = clustering_analyzer.scaler
+        mean = scaler.mean_.copy()
+        
+        clustering_analyzer.get_optimal_k(sample_data.iloc[:60], k_range=range(2, 4))
+        
+        assert clustering_analyzer.scaler is scaler
+        assert np.array_equal(scaler.mean_, mean)
+    
+    def test_optimal_k_cache(self, clustering_analyzer, sample_data):
+        """Test: fit_predict reutiliza los modelos del barrido"""
+        calls = []
+        results = clustering_analyzer.get_optimal_k(
+            sample_data, k_range=range(2, 6), progress=lambda done, total: calls.append(done)
+        )
+        
+        assert [r['k'] for r in results] == [2, 3, 4, 5]
+        assert calls[0] == 0 and calls[-1] == 4
+        
+        cached = clustering_analyzer.fit_predict(sample_data, k=4)
+        fresh = ClusteringAnalyzer().fit_predict(sample_data, k=4)
+        
+        assert clustering_analyzer.model is clustering_analyzer._sweep_cache['resultados'][4]['model']
+        assert np.array_equal(cached['labels'], fresh['labels'])
+        assert np.isclose(cached['silhouette_score'], fresh['silhouette_score'])
+        assert np.allclose(cached['centroids'], fresh['centroids'])
+        
+        # Un segundo barrido sobre los mismos datos no reentrena
+        calls.clear()
+        clustering_analyzer.get_optimal_k(
+            sample_data, k_range=range(2, 6), progress=lambda done, total: calls.append(done)
+        )
+        assert calls == [4]
+    
+    def test_optimal_k_parallel(self, sample_data):
+        """Test: Barrido en paralelo igual al secuencial"""
+        parallel = ClusteringAnalyzer()
+        parallel.SWEEP_PARALLEL_MIN_ROWS = 0
+        
+        sequential = ClusteringAnalyzer().get_optimal_k(
+            sample_data, k_range=range(2, 5), n_jobs=1
+        )
+        
+        assert parallel.get_optimal_k(sample_data, k_range=range(2, 5), n_jobs=2) == sequential
+    
+    def test_incremental_warm_start(self, clustering_analyzer, sample_data):
+        """Test: Reclustering incremental parte de los centroides anteriores"""
+        first = clustering_analyzer.fit_predict(sample_data, k=3)
+        
+        updated = sample_data.copy()
+        updated.loc[:4, 'actividades_completadas'] += 3
+        second = clustering_analyzer.fit_predict(updated, k=3, incremental=True)
+        
+        assert first['inicializacion'] == 'k-means++'
+        assert second['inicializacion'] == 'centroides_previos'
+        assert second['deriva'] < ClusteringAnalyzer.DRIFT_THRESHOLD
+        assert second['iteraciones'] <= first['iteraciones']
+        assert (second['labels'] == first['labels']).mean() > 0.9
+    
+    def test_incremental_falls_back_on_drift(self, clustering_analyzer, sample_data):
+        """Test: Deriva grande fuerza un entrenamiento completo"""
+        clustering_analyzer.fit_predict(sample_data, k=3)
+        
+        shifted = sample_data.copy()
+        shifted['tiempo_plataforma_horas'] *= 3
+        result = clustering_analyzer.fit_predict(shifted, k=3, incremental=True)
+        
+        assert result['inicializacion'] == 'k-means++'
+        assert result['deriva'] > ClusteringAnalyzer.DRIFT_THRESHOLD
+    
+    def test_incremental_keeps_cluster_ids(self):
+        """Test: La numeración de clusters se conserva entre ejecuciones"""
+        rng = np.random.default_rng(0)
+        centers = np.array([[55, 140, 1, 12], [30, 70, 8, 5], [8, 15, 16, 1]])
+        data = pd.DataFrame(
+            centers[rng.integers(0, 3, 300)] + rng.normal(0, [3, 8, 1, 1], (300, 4)),
+            columns=ClusteringAnalyzer.FEATURES_FOR_CLUSTERING
+        )
+        
+        analyzer = ClusteringAnalyzer()
+        first = analyzer.fit_predict(data, k=3)
+        
+        # Con otra semilla K-means numera los mismos grupos en otro orden
+        fresh = ClusteringAnalyzer().fit_predict(data, k=3, random_state=3)
+        assert not np.array_equal(fresh['labels'], first['labels'])
+        
+        for threshold in (ClusteringAnalyzer.DRIFT_THRESHOLD, -1):
+            analyzer.DRIFT_THRESHOLD = threshold
+            again = analyzer.fit_predict(data, k=3, random_state=3, incremental=True)
+            
+            assert np.array_equal(again['labels'], first['labels'])
+            assert np.allclose(again['centroids'], first['centroids'])
+            assert analyzer.predict_cluster(data.iloc[0]) == first['labels'][0]
+        
+        assert again['inicializacion'] == 'k-means++'
+    
+    def test_assign_clusters_batch(self, clustering_analyzer, sample_data):
+        """Test: Asignación vectorizada igual al modelo y por bloques"""
+        result = clustering_analyzer.fit_predict(sample_data, k=3)
+        
+        assignment = clustering_analyzer.assign_clusters(sample_data, chunksize=7)
+        X_scaled = clustering_analyzer.scaler.transform(
+            sample_data[ClusteringAnalyzer.FEATURES_FOR_CLUSTERING].values
+        )
+        
+        assert np.array_equal(assignment['labels'], result['labels'])
+        assert assignment['distancias'].shape == (100, 3)
+        assert np.allclose(
+            assignment['distancias'],
+            clustering_analyzer.model.transform(X_scaled)
+        )
+        assert clustering_analyzer.predict_cluster(sample_data.iloc[10]) == result['labels'][10]
+    
+    def test_assign_clusters_validation(self, clustering_analyzer, sample_data):
+        """Test: Asignación sin modelo o con columnas faltantes"""
+        with pytest.raises(ValueError):
+            clustering_analyzer.assign_clusters(sample_data)
+        
+        clustering_analyzer.fit_predict(sample_data, k=3)
+        with pytest.raises(ValueError):
+            clustering_analyzer.assign_clusters(sample_data.drop(columns=['entregas_tarde']))
+    
+    def test_cluster_stats_match_pandas(self, clustering_analyzer, sample_data):
+        """Test: Agregación por cluster igual a groupby de pandas"""
+        result = clustering_analyzer.fit_predict(sample_data, k=3)
+        characteristics = clustering_analyzer.get_cluster_characteristics(
+            sample_data, result['labels']
+        )
+        features = ClusteringAnalyzer.FEATURES_FOR_CLUSTERING
+        expected = sample_data[features].groupby(result['labels']).agg(
+            ['mean', 'median', 'min', 'max', 'std']
+        )
+        
+        for char in characteristics:
+            row = expected.loc[char['cluster_id']]
+            assert char['tamaño'] == (result['labels'] == char['cluster_id']).sum()
+            for feature in features:
+                stats = char['estadisticas'][feature]
+                assert np.allclose(
+                    [stats['promedio'], stats['mediana'], stats['min'],
+                     stats['max'], stats['desv_std']],
+                    row[feature].values
+                )
+            
+            promedios = result['distribucion'][f"cluster_{char['cluster_id']}"]['promedios']
+            assert np.isclose(promedios['foros'], row[('foros_participacion', 'mean')])
+    
+    def test_cluster_stats_cached(self, clustering_analyzer, sample_data):
+        """Test: Las estadísticas por cluster se reutilizan con las mismas etiquetas"""
+        result = clustering_analyzer.fit_predict(sample_data, k=3)
+        stats = clustering_analyzer.cluster_stats_
+        
+        assert clustering_analyzer.get_cluster_stats(sample_data, result['labels']) is stats
+        
+        updated = clustering_analyzer.update_assignments(sample_data, np.array([0]))
+        assert clustering_analyzer.get_cluster_stats(sample_data, updated['labels']) is not stats
+    
+    def test_single_member_cluster_std(self, clustering_analyzer):
+        """Test: Desvío indefinido en clusters de un solo estudiante"""
+        data = pd.DataFrame({f: [1.0, 2.0, 3.0] for f in ClusteringAnalyzer.FEATURES_FOR_CLUSTERING})
+        stats = clustering_analyzer.get_cluster_stats(data, np.array([0, 0, 1]))
+        
+        std = stats['features']['entregas_tarde']['desv_std']
+        assert np.isclose(std[0], np.std([1.0, 2.0], ddof=1))
+        assert np.isnan(std[1])
+    
+    def test_bootstrap_stability(self):
+        """Test: Grupos bien separados son estables en todas las réplicas"""
+        rng = np.random.default_rng(0)
+        centers = np.array([[55, 140, 1, 12], [30, 70, 8, 5], [8, 15, 16, 1]])
+        data = pd.DataFrame(
+            centers[rng.integers(0, 3, 300)] + rng.normal(0, [3, 8, 1, 1], (300, 4)),
+            columns=ClusteringAnalyzer.FEATURES_FOR_CLUSTERING
+        )
+        analyzer = ClusteringAnalyzer()
+        analyzer.fit_predict(data, k=3)
+        
+        stability = analyzer.bootstrap_stability(data, n_bootstrap=10)
+        
+        assert stability['n_bootstrap'] == 10
+        assert len(stability['confianza']) == 300
+        assert stability['confianza_media'] == 1.0
+        assert all(c['nivel'] == 'muy estable' for c in stability['clusters'].values())
+    
+    def test_bootstrap_stability_detects_noise(self, clustering_analyzer, sample_data):
+        """Test: Datos sin estructura dan clusters menos estables"""
+        clustering_analyzer.fit_predict(sample_data, k=5)
+        
+        stability = clustering_analyzer.bootstrap_stability(sample_data, n_bootstrap=10)
+        jaccard = [c['jaccard_medio'] for c in stability['clusters'].values()]
+        
+        assert min(jaccard) < 0.85
+        assert 0 < stability['confianza_media'] < 1
+        assert np.all((stability['confianza'] >= 0) & (stability['confianza'] <= 1))
+    
+    def test_bootstrap_stability_parallel(self, clustering_analyzer, sample_data):
+        """Test: Réplicas en paralelo iguales a las secuenciales"""
+        clustering_analyzer.fit_predict(sample_data, k=3)
+        sequential = clustering_analyzer.bootstrap_stability(sample_data, n_bootstrap=4, n_jobs=1)
+        
+        clustering_analyzer.SWEEP_PARALLEL_MIN_ROWS = 0
+        parallel = clustering_analyzer.bootstrap_stability(sample_data, n_bootstrap=4, n_jobs=2)
+        
+        assert np.array_equal(parallel['confianza'], sequential['confianza'])
+        assert parallel['clusters'].keys() == sequential['clusters'].keys()
+    
+    def test_bootstrap_stability_requires_model(self, clustering_analyzer, sample_data):
+        """Test: Estabilidad sin modelo entrenado"""
+        with pytest.raises(ValueError):
+            clustering_analyzer.bootstrap_stability(sample_data)
+    
+    def test_bootstrap_stability_n_bootstrap_range(self, clustering_analyzer, sample_data):
+        """Test: n_bootstrap fuera de [2, MAX_BOOTSTRAP]"""
+        clustering_analyzer.fit_predict(sample_data, k=3)
+        
+        for n_bootstrap in (1, clustering_analyzer.MAX_BOOTSTRAP + 1):
+            with pytest.raises(ValueError):
+                clustering_analyzer.bootstrap_stability(sample_data, n_bootstrap=n_bootstrap)
+    
+    def test_numpy_backend(self, sample_data):
+        """Test: El backend NumPy produce el mismo formato de resultados"""
+        sklearn_result = ClusteringAnalyzer().fit_predict(sample_data, k=3)
+        analyzer = ClusteringAnalyzer(backend='numpy')
+        numpy_result = analyzer.fit_predict(sample_data, k=3)
+        
+        assert numpy_result.keys() == sklearn_result.keys()
+        assert numpy_result['labels'].shape == sklearn_result['labels'].shape
+        assert np.isclose(numpy_result['inertia'], sklearn_result['inertia'], rtol=0.01)
+        assert analyzer.predict_cluster(sample_data.iloc[3]) == numpy_result['labels'][3]
+        
+        optimal = analyzer.get_optimal_k(sample_data, k_range=range(2, 4))
+        assert [r['k'] for r in optimal] == [2, 3]
+    
+    def test_numpy_backend_falls_back_to_sklearn(self, sample_data):
+        """Test: Desde NUMPY_MAX_ROWS registros el backend NumPy usa sklearn"""
+        analyzer = ClusteringAnalyzer(backend='numpy')
+        analyzer.NUMPY_MAX_ROWS = len(sample_data)
+        analyzer.fit_predict(sample_data, k=3)
+        
+        assert isinstance(analyzer.model, KMeans)
+        
+        analyzer.NUMPY_MAX_ROWS = len(sample_data) + 1
+        analyzer.fit_predict(sample_data, k=3)
+        
+        assert isinstance(analyzer.model, NumpyKMeans)
+    
+    def test_invalid_backend(self):
+        """Test: Backend de K-means inválido"""
+        with pytest.raises(ValueError):
+            ClusteringAnalyzer(backend='otro')
+    
+    def test_find_similar(self, clustering_analyzer, sample_data):
+        """Test: Estudiantes similares desde el índice del clustering"""
+        result = clustering_analyzer.fit_predict(sample_data, k=3)
+        similar = clustering_analyzer.find_similar(position=0, n_vecinos=3)
+        
+        X = clustering_analyzer.scaler.transform(
+            sample_data[ClusteringAnalyzer.FEATURES_FOR_CLUSTERING].values
+        )
+        distances = np.linalg.norm(X - X[0], axis=1)
+        distances[0] = np.inf
+        
+        assert np.array_equal(similar['posiciones'], np.argsort(distances)[:3])
+        assert similar['cluster'] == result['labels'][0]
+        
+        profile = sample_data.iloc[0][ClusteringAnalyzer.FEATURES_FOR_CLUSTERING].to_dict()
+        by_features = clustering_analyzer.find_similar(student=profile, n_vecinos=1)
+        assert by_features['posiciones'][0] == 0
+    
+    def test_find_similar_after_delta(self, clustering_analyzer, sample_data):
+        """Test: El índice incorpora filas de cargas incrementales"""
+        clustering_analyzer.fit_predict(sample_data, k=3)
+        extended = pd.concat([sample_data, sample_data.iloc[[5]]], ignore_index=True)
+        
+        clustering_analyzer.update_assignments(extended, np.array([100]))
+        similar = clustering_analyzer.find_similar(position=5, n_vecinos=1)
+        
+        assert similar['posiciones'][0] == 100
+        assert similar['distancias'][0] == 0
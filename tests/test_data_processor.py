@@ -0,0 +1,421 @@
+"""
+Tests para el módulo de Procesamiento de Datos
+"""
+
+import io
+import pytest
+import pandas as pd
+import numpy as np
+from backend.data_processor import DataProcessor
+
+@pytest.fixture
+def sample_data():
+    """Crea datos de muestra para testing"""
+    np.random.seed(42)
+    n = 120
+    data = {
+        'estudiante_id': [f'EST{i:03d}' for i in range(1, n+1)],
+        'actividades_completadas': np.random.randint(5, 60, n),
+        'tiempo_plataforma_horas': np.round(np.random.uniform(10, 160, n), 2),
+        'entregas_tarde': np.random.randint(0, 20, n),
+        'foros_participacion': np.random.randint(0, 15, n),
+        'calificacion_final': np.round(np.random.uniform(2.0, 10.0, n), 2)
+    }
+    return pd.DataFrame(data)
+
+@pytest.fixture
+def data_processor():
+    """Crea instancia del procesador"""
+    return DataProcessor()
+
+def to_csv_file(df):
+    """Convierte un DataFrame en un archivo CSV en memoria"""
+    return io.StringIO(df.to_csv(index=False))
+
+class TestDataProcessor:
+
+    def test_process_csv_success(self, data_processor, sample_data):
+        """Test: Procesamiento exitoso de un CSV válido"""
+        df, result = data_processor.process_csv(to_csv_file(sample_data))
+
+        assert result['valid']
+        assert result['registros'] == len(sample_data)
+        assert data_processor.data is df
+
+    def test_insufficient_records(self, data_processor, sample_data):
+        """Test: Menos de 50 registros debe fallar"""
+        df, result = data_processor.process_csv(to_csv_file(sample_data.head(10)))
+
+        assert df is None
+        assert result['error'] == 'Datos insuficientes'
+
+    def test_insufficient_records_message(self, data_processor, sample_data):
+        """Test: El mensaje de datos insuficientes usa el mínimo configurado"""
+        result = data_processor._validate_data(sample_data.head(10), min_records=20)
+
+        assert not result['valid']
+        assert 'El análisis estadístico requiere al menos 20 estudiantes' in result['details']
+
+    def test_missing_columns(self, data_processor, sample_data):
+        """Test: Columnas requeridas faltantes"""
+        incomplete = sample_data.drop('foros_participacion', axis=1)
+        df, result = data_processor.process_csv(to_csv_file(incomplete))
+
+        assert df is None
+        assert result['error'] == 'Columnas faltantes en el archivo CSV'
+
+    def test_chunked_matches_full_read(self, data_processor, sample_data):
+        """Test: El modo streaming produce el mismo DataFrame"""
+        full, _ = DataProcessor().process_csv(to_csv_file(sample_data))
+        chunked, result = data_processor.process_csv(
+            to_csv_file(sample_data), chunksize=17
+        )
+
+        assert result['valid']
+        pd.testing.assert_frame_equal(full, chunked)
+
+    def test_chunked_dropped_rows_and_mixed_types(self, data_processor, sample_data):
+        """Test: Streaming con filas descartadas y tipos que cambian entre bloques"""
+        data = sample_data.astype({'actividades_completadas': object})
+        data.loc[70, 'actividades_completadas'] = 'abc'
+        data.loc[10, 'estudiante_id'] = None
+
+        full, _ = DataProcessor().process_csv(to_csv_file(data))
+        chunked, result = data_processor.process_csv(to_csv_file(data), chunksize=17)
+
+        assert result['registros'] == 119
+        assert 10 not in chunked.index
+        pd.testing.assert_frame_equal(full, chunked)
+
+    def test_chunked_running_counts(self, data_processor, sample_data):
+        """Test: El modo streaming acumula errores entre bloques"""
+        data = sample_data.copy()
+        data.loc[3, 'calificacion_final'] = 12.0
+        data.loc[90, 'entregas_tarde'] = -1
+        # Duplicado repartido entre bloques distintos
+        data.loc[100, 'estudiante_id'] = data.loc[5, 'estudiante_id']
+
+        _, expected = DataProcessor().process_csv(to_csv_file(data))
+        df, result = data_processor.process_csv(to_csv_file(data), chunksize=25)
+
+        assert df is None
+        assert result['details'] == expected['details']
+        assert result['conteos'] == expected['conteos']
+        assert '2 registros duplicados detectados (mismo estudiante_id)' in result['details']
+
+    def test_chunked_duplicate_samples(self, data_processor, sample_data):
+        """Test: La muestra de duplicados en streaming coincide con la lectura completa"""
+        data = sample_data.copy()
+        data.loc[100, 'estudiante_id'] = data.loc[5, 'estudiante_id']
+        data.loc[[60, 110], 'estudiante_id'] = data.loc[30, 'estudiante_id']
+
+        _, expected = DataProcessor().process_csv(to_csv_file(data))
+        _, result = data_processor.process_csv(to_csv_file(data), chunksize=25)
+
+        assert expected['filas_muestra']['duplicados'] == [5, 30, 60, 100, 110]
+        assert result['filas_muestra'] == expected['filas_muestra']
+
+    def test_chunked_empty_file(self, data_processor, sample_data):
+        """Test: Archivo vacío en modo streaming"""
+        df, result = data_processor.process_csv(
+            to_csv_file(sample_data.head(0)), chunksize=10
+        )
+
+        assert df is None
+        assert not result['valid']
+
+    def test_format_version(self, data_processor, tmp_path, monkeypatch):
+        """Test: La versión de procesamiento depende del esquema, reglas y modo compacto"""
+        version = data_processor.format_version()
+        assert version == DataProcessor().format_version()
+        assert version != DataProcessor(compact=True).format_version()
+
+        schema = tmp_path / 'schema.json'
+        schema.write_bytes(open(DataProcessor.SCHEMA_PATH, 'rb').read() + b'\n')
+        monkeypatch.setattr(DataProcessor, 'SCHEMA_PATH', str(schema))
+        assert data_processor.format_version() != version
+
+        monkeypatch.setattr(DataProcessor, 'PROCESSING_VERSION', DataProcessor.PROCESSING_VERSION + 1)
+        assert data_processor.format_version() != version
+
+    def test_unknown_columns_not_loaded(self, data_processor, sample_data):
+        """Test: Columnas fuera del esquema no se cargan"""
+        data = sample_data.copy()
+        data['columna_moodle_extra'] = 'x'
+        data['curso_nombre'] = 'Estadística'
+        df, result = data_processor.process_csv(to_csv_file(data))
+
+        assert result['valid']
+        assert 'columna_moodle_extra' not in df.columns
+        assert 'curso_nombre' in df.columns
+
+    def test_schema_dtypes(self, data_processor, sample_data):
+        """Test: Tipos finales definidos por el esquema"""
+        data = sample_data.astype({'entregas_tarde': 'float64'})
+        data.loc[4, 'entregas_tarde'] = np.nan
+        df, result = data_processor.process_csv(to_csv_file(data))
+
+        assert result['valid']
+        assert df['actividades_completadas'].dtype == np.int64
+        assert df['entregas_tarde'].dtype == np.int64
+        assert df.loc[4, 'entregas_tarde'] == 0
+        assert df['tiempo_plataforma_horas'].dtype == np.float64
+
+    def test_non_numeric_values_fallback(self, data_processor, sample_data):
+        """Test: Valores no numéricos se convierten a 0 como antes"""
+        data = sample_data.astype({'foros_participacion': object})
+        data.loc[2, 'foros_participacion'] = 'sin dato'
+        df, result = data_processor.process_csv(to_csv_file(data))
+
+        assert result['valid']
+        assert df.loc[2, 'foros_participacion'] == 0
+
+    def test_validation_counts_and_samples(self, data_processor, sample_data):
+        """Test: Conteos y muestra de filas inválidas por regla"""
+        data = sample_data.copy()
+        data.loc[[3, 8], 'calificacion_final'] = [11.0, -2.0]
+        data.loc[8, 'foros_participacion'] = -1
+        df, result = data_processor.process_csv(to_csv_file(data))
+
+        assert df is None
+        assert result['details'] == [
+            '2 registros con calificaciones fuera del rango 0-10',
+            '1 registros con valores negativos en foros_participacion'
+        ]
+        assert result['conteos']['calificaciones_invalidas'] == 2
+        assert result['conteos']['duplicados'] == 0
+        assert result['filas_muestra'] == {
+            'calificaciones_invalidas': [3, 8],
+            'negativos_foros_participacion': [8]
+        }
+
+    def test_sample_rows_are_capped(self, data_processor, sample_data):
+        """Test: La muestra de filas se limita a MAX_SAMPLE_ROWS"""
+        data = sample_data.copy()
+        data['entregas_tarde'] = -1
+        _, result = data_processor.process_csv(to_csv_file(data))
+
+        assert result['conteos']['negativos_entregas_tarde'] == len(data)
+        assert len(result['filas_muestra']['negativos_entregas_tarde']) == \
+            DataProcessor.MAX_SAMPLE_ROWS
+
+    def test_compact_representation(self, sample_data):
+        """Test: Tipos reducidos en modo compacto"""
+        processor = DataProcessor(compact=True)
+        df, result = processor.process_csv(to_csv_file(sample_data))
+
+        assert result['valid']
+        assert isinstance(df['estudiante_id'].dtype, pd.CategoricalDtype)
+        assert df['actividades_completadas'].dtype == np.int16
+        assert df['calificacion_final'].dtype == np.float32
+
+    def test_compact_int32_for_large_counts(self, data_processor, sample_data):
+        """Test: Conteos fuera de rango int16 usan int32"""
+        data = sample_data.copy()
+        data.loc[0, 'foros_participacion'] = 40000
+        compact = data_processor.to_compact(data)
+
+        assert compact['foros_participacion'].dtype == np.int32
+        assert compact['entregas_tarde'].dtype == np.int16
+
+    def test_memory_footprint_in_statistics(self, sample_data):
+        """Test: Reporte de memoria en get_statistics"""
+        full = DataProcessor()
+        full.process_csv(to_csv_file(sample_data))
+        compact = DataProcessor(compact=True)
+        compact.process_csv(to_csv_file(sample_data))
+
+        full_memory = full.get_statistics()['memoria']
+        compact_memory = compact.get_statistics()['memoria']
+
+        assert compact_memory['compacto']
+        assert compact_memory['bytes_total'] < full_memory['bytes_total']
+        assert compact_memory['tipos']['tiempo_plataforma_horas'] == 'float32'
+
+    def test_compact_frame_runs_downstream(self, sample_data):
+        """Test: Clustering, regresión y alertas funcionan con el dataset compacto"""
+        from backend.clustering import ClusteringAnalyzer
+        from backend.regression import RegressionPredictor
+        from backend.alerts import AlertSystem
+
+        processor = DataProcessor(compact=True)
+        df, _ = processor.process_csv(to_csv_file(sample_data))
+
+        clustering = ClusteringAnalyzer().fit_predict(df, k=3)
+        data = df.copy()
+        data['cluster'] = clustering['labels']
+        metrics = RegressionPredictor().train(data)
+        alerts = AlertSystem().detect_risk_students(data)
+
+        assert len(clustering['labels']) == len(df)
+        assert 'r2_score' in metrics
+        assert all(isinstance(a['estudiante_id'], str) for a in alerts)
+
+    def test_delta_upsert(self, data_processor, sample_data):
+        """Test: Carga incremental inserta, actualiza y detecta sin cambios"""
+        data_processor.process_csv(to_csv_file(sample_data))
+
+        delta = sample_data.iloc[[0, 1, 2]].copy()
+        delta.loc[1, 'actividades_completadas'] = 99
+        delta = pd.concat([delta, pd.DataFrame([{
+            'estudiante_id': 'EST999',
+            'actividades_completadas': 10,
+            'tiempo_plataforma_horas': 12.5,
+            'entregas_tarde': 1,
+            'foros_participacion': 2,
+            'calificacion_final': 6.0
+        }])])
+
+        df, result = data_processor.process_delta_csv(to_csv_file(delta))
+        cambios = result['cambios']
+
+        assert result['valid']
+        assert len(df) == len(sample_data) + 1
+        assert cambios['insertados'] == ['EST999']
+        assert cambios['actualizados'] == ['EST002']
+        assert cambios['sin_cambios'] == ['EST001', 'EST003']
+        assert list(cambios['posiciones_afectadas']) == [1, len(sample_data)]
+        assert df.loc[1, 'actividades_completadas'] == 99
+        assert cambios['filas_anteriores']['actividades_completadas'].tolist() == \
+            [sample_data.loc[1, 'actividades_completadas']]
+        assert data_processor.data is df
+
+    def test_delta_repeated_upsert_uses_index(self, data_processor, sample_data):
+        """Test: Un segundo delta encuentra a los estudiantes insertados"""
+        data_processor.process_csv(to_csv_file(sample_data))
+        new_student = sample_data.iloc[[0]].assign(estudiante_id='EST500')
+        data_processor.process_delta_csv(to_csv_file(new_student))
+
+        updated = new_student.assign(entregas_tarde=7)
+        df, result = data_processor.process_delta_csv(to_csv_file(updated))
+
+        assert result['cambios']['actualizados'] == ['EST500']
+        assert df.iloc[-1]['entregas_tarde'] == 7
+
+    def test_delta_with_compact_data(self, sample_data):
+        """Test: Valores iguales no se marcan como cambios en modo compacto"""
+        processor = DataProcessor(compact=True)
+        processor.process_csv(to_csv_file(sample_data))
+        df, result = processor.process_delta_csv(to_csv_file(sample_data.head(5)))
+
+        assert result['cambios']['actualizados'] == []
+        assert len(result['cambios']['sin_cambios']) == 5
+        assert df['tiempo_plataforma_horas'].dtype == np.float32
+
+    def test_delta_without_data(self, data_processor, sample_data):
+        """Test: Carga incremental sin datos previos"""
+        df, result = data_processor.process_delta_csv(to_csv_file(sample_data))
+
+        assert df is None
+        assert not result['valid']
+
+    def test_delta_rejects_invalid_rows(self, data_processor, sample_data):
+        """Test: El delta se valida antes de fusionar"""
+        data_processor.process_csv(to_csv_file(sample_data))
+        delta = sample_data.head(2).assign(calificacion_final=15.0)
+        df, result = data_processor.process_delta_csv(to_csv_file(delta))
+
+        assert df is None
+        assert result['details'] == ['2 registros con calificaciones fuera del rango 0-10']
+        assert len(data_processor.data) == len(sample_data)
+
+    def test_statistics_match_pandas(self, data_processor, sample_data):
+        """Test: Estadísticas incrementales coinciden con pandas"""
+        df, _ = data_processor.process_csv(to_csv_file(sample_data), chunksize=30)
+        stats = data_processor.get_statistics()
+
+        assert stats['total_registros'] == len(df)
+        assert np.isclose(stats['promedios']['tiempo_horas'],
+                          df['tiempo_plataforma_horas'].mean())
+        assert np.isclose(stats['desviaciones']['calificacion'],
+                          df['calificacion_final'].std())
+        assert stats['medianas']['actividades'] == df['actividades_completadas'].median()
+
+    def test_statistics_follow_delta(self, data_processor, sample_data):
+        """Test: Las estadísticas se actualizan con cargas incrementales"""
+        data_processor.process_csv(to_csv_file(sample_data))
+        delta = sample_data.head(3).assign(calificacion_final=[1.0, 2.0, 3.0])
+        delta.loc[2, 'estudiante_id'] = 'EST777'
+        df, _ = data_processor.process_delta_csv(to_csv_file(delta))
+        stats = data_processor.get_statistics()
+
+        assert stats['total_registros'] == len(df)
+        assert np.isclose(stats['promedios']['calificacion'], df['calificacion_final'].mean())
+        assert np.isclose(stats['desviaciones']['calificacion'], df['calificacion_final'].std())
+        assert stats['medianas']['calificacion'] == df['calificacion_final'].median()
+
+    def test_get_outliers_matches_std_rule(self, data_processor, sample_data):
+        """Test: get_outliers conserva la regla media ± n desvíos"""
+        data = sample_data.copy()
+        data.loc[7, 'tiempo_plataforma_horas'] = 2000.0
+        data_processor.process_csv(to_csv_file(data))
+
+        outliers = data_processor.get_outliers('tiempo_plataforma_horas', n_std=3)
+        column = data_processor.data['tiempo_plataforma_horas']
+        expected = data_processor.data[
+            (column > column.mean() + 3 * column.std()) |
+            (column < column.mean() - 3 * column.std())
+        ]
+
+        pd.testing.assert_frame_equal(outliers, expected)
+        assert list(outliers.index) == [7]
+
+    def test_detect_outliers_all_columns(self, data_processor, sample_data):
+        """Test: Todos los métodos evalúan todas las columnas a la vez"""
+        data = sample_data.copy()
+        data.loc[[3, 4], 'foros_participacion'] = [90, 95]
+        data_processor.process_csv(to_csv_file(data))
+
+        for method in ('zscore', 'mad', 'iqr'):
+            results = data_processor.detect_outliers(method=method)
+            assert set(results) == set(DataProcessor.STATISTICS_COLUMNS)
+            assert {3, 4} <= set(results['foros_participacion']['indices'])
+
+    def test_robust_methods_resist_masking(self, data_processor, sample_data):
+        """Test: MAD detecta outliers que enmascaran a la media/desvío"""
+        data = sample_data.copy()
+        data['tiempo_plataforma_horas'] = 50.0 + np.arange(len(data)) % 5
+        data.loc[:9, 'tiempo_plataforma_horas'] = [300, 320, 340, 360, 380,
+                                                   400, 420, 440, 460, 480]
+        data_processor.process_csv(to_csv_file(data))
+
+        zscore = data_processor.detect_outliers(['tiempo_plataforma_horas'], 'zscore')
+        mad = data_processor.detect_outliers(['tiempo_plataforma_horas'], 'mad')
+
+        assert zscore['tiempo_plataforma_horas']['cantidad'] < 10
+        assert mad['tiempo_plataforma_horas']['cantidad'] == 10
+
+    def test_outlier_params_cached(self, data_processor, sample_data):
+        """Test: Centro y escala se reutilizan hasta que cambian los datos"""
+        data_processor.process_csv(to_csv_file(sample_data))
+        data_processor.detect_outliers(method='mad')
+        params = data_processor._outlier_params
+        data_processor.detect_outliers(method='iqr')
+
+        assert data_processor._outlier_params is params
+        assert len(params) == 1
+
+        data_processor.process_delta_csv(to_csv_file(sample_data.head(1)))
+        assert data_processor._outlier_params == {}
+
+    def test_invalid_outlier_method(self, data_processor, sample_data):
+        """Test: Método inválido"""
+        data_processor.process_csv(to_csv_file(sample_data))
+
+        with pytest.raises(ValueError):
+            data_processor.detect_outliers(method='otro')
+
+    def test_filter_by_threshold(self, data_processor, sample_data):
+        """Test: Filtro por umbrales resuelto con el índice ordenado"""
+        data_processor.process_csv(to_csv_file(sample_data))
+        data = data_processor.data
+
+        filtered = data_processor.filter_by_threshold('calificacion_final', 4.0, 7.0)
+        expected = data[(data['calificacion_final'] >= 4.0) &
+                        (data['calificacion_final'] <= 7.0)]
+
+        pd.testing.assert_frame_equal(filtered, expected)
+
+        engine = data_processor.get_query_engine()
+        data_processor.process_delta_csv(to_csv_file(sample_data.head(1)))
+        assert data_processor.get_query_engine() is not engine
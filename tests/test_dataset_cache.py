@@ -0,0 +1,103 @@
+"""
+Tests para el módulo de Caché de Datasets
+"""
+
+import io
+import os
+import pytest
+import pandas as pd
+import numpy as np
+from backend.dataset_cache import DatasetCache
+
+@pytest.fixture
+def sample_data():
+    """Crea datos de muestra para testing"""
+    np.random.seed(42)
+    n = 60
+    data = {
+        'estudiante_id': [f'EST{i:03d}' for i in range(1, n+1)],
+        'actividades_completadas': np.random.randint(5, 60, n),
+        'tiempo_plataforma_horas': np.random.uniform(10, 160, n),
+        'entregas_tarde': np.random.randint(0, 20, n),
+        'foros_participacion': np.random.randint(0, 15, n),
+        'calificacion_final': np.random.uniform(2.0, 10.0, n),
+        'curso_nombre': ['Matemática'] * (n - 1) + [None]
+    }
+    return pd.DataFrame(data)
+
+@pytest.fixture
+def cache(tmp_path):
+    """Crea una caché en un directorio temporal"""
+    return DatasetCache(cache_dir=str(tmp_path / 'cache'))
+
+class TestDatasetCache:
+
+    def test_hash_file_rewinds(self):
+        """Test: El hash depende del contenido y rebobina el archivo"""
+        file = io.BytesIO(b'estudiante_id\nEST001\n')
+        digest = DatasetCache.hash_file(file)
+
+        assert file.tell() == 0
+        assert digest == DatasetCache.hash_file(io.BytesIO(b'estudiante_id\nEST001\n'))
+        assert digest != DatasetCache.hash_file(io.BytesIO(b'estudiante_id\nEST002\n'))
+
+    def test_file_key_versioned(self, tmp_path):
+        """Test: La clave cambia con la versión de procesamiento y de formato"""
+        content = b'estudiante_id\nEST001\n'
+        cache = DatasetCache(cache_dir=str(tmp_path), format_version='v1')
+        key = cache.file_key(io.BytesIO(content))
+
+        assert key == DatasetCache(str(tmp_path), format_version='v1').file_key(io.BytesIO(content))
+        assert key != DatasetCache(str(tmp_path), format_version='v2').file_key(io.BytesIO(content))
+
+        cache.CACHE_VERSION = DatasetCache.CACHE_VERSION + 1
+        assert key != cache.file_key(io.BytesIO(content))
+
+    def test_hash_dataframe(self, sample_data):
+        """Test: El hash de un DataFrame depende de su contenido"""
+        digest = DatasetCache.hash_dataframe(sample_data)
+        changed = sample_data.copy()
+        changed.loc[0, 'entregas_tarde'] += 1
+
+        assert digest == DatasetCache.hash_dataframe(sample_data.copy())
+        assert digest != DatasetCache.hash_dataframe(changed)
+
+    def test_miss_returns_none(self, cache):
+        """Test: Entrada inexistente"""
+        assert cache.get('no-existe') is None
+
+    def test_roundtrip(self, cache, sample_data):
+        """Test: El dataset cacheado es igual al original"""
+        data = sample_data.drop(index=[3, 7])
+        cache.put('abc', data)
+        cached = cache.get('abc')
+
+        # copy() materializa las columnas mapeadas para comparar valores
+        pd.testing.assert_frame_equal(cached.copy(), data)
+
+    def test_numeric_columns_are_memory_mapped(self, cache, sample_data):
+        """Test: Las columnas numéricas se leen con mmap"""
+        cache.put('abc', sample_data)
+        cached = cache.get('abc')
+
+        assert isinstance(cached['tiempo_plataforma_horas'].values, np.memmap)
+
+    def test_lru_eviction(self, tmp_path, sample_data):
+        """Test: Se desaloja la entrada usada hace más tiempo"""
+        probe = DatasetCache(cache_dir=str(tmp_path / 'probe'))
+        probe.put('x', sample_data)
+        entry_size = probe.get_size()
+
+        cache = DatasetCache(cache_dir=str(tmp_path / 'cache'),
+                             max_bytes=int(entry_size * 2.5))
+        cache.put('a', sample_data)
+        cache.put('b', sample_data)
+        os.utime(os.path.join(cache.cache_dir, 'a', DatasetCache.META_FILE),
+                 (1, 1))
+        cache.get('a')  # 'a' pasa a ser la más reciente
+        cache.put('c', sample_data)
+
+        assert cache.get('a') is not None
+        assert cache.get('b') is None
+        assert cache.get('c') is not None
+        assert cache.get_size() <= cache.max_bytes
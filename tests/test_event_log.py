@@ -0,0 +1,99 @@
+"""
+Tests para el módulo de Agregación de Logs de Eventos
+"""
+
+import io
+import pytest
+import pandas as pd
+import numpy as np
+from backend.event_log import EventLogAggregator
+from backend.data_processor import DataProcessor
+
+COMPLETION = EventLogAggregator.COMPLETION_EVENT
+SUBMISSION = EventLogAggregator.SUBMISSION_EVENT
+VIEWED = '\\mod_resource\\event\\course_module_viewed'
+POSTED = '\\mod_forum\\event\\post_created'
+
+def make_log(rows):
+    """Arma un CSV de log con columnas extra como en la exportación real"""
+    df = pd.DataFrame(rows, columns=['eventname', 'component', 'crud',
+                                     'contextinstanceid', 'userid', 'timecreated'])
+    df.insert(0, 'id', range(1, len(df) + 1))
+    df['ip'] = '10.0.0.1'
+    df['other'] = 'N;'
+    return io.StringIO(df.to_csv(index=False))
+
+@pytest.fixture
+def small_log_rows():
+    """Log mínimo de dos estudiantes"""
+    return [
+        (VIEWED, 'mod_resource', 'r', 10, 1, 1000),
+        (COMPLETION, 'core', 'u', 10, 1, 1600),
+        (COMPLETION, 'core', 'u', 10, 1, 1700),   # misma actividad
+        (POSTED, 'mod_forum', 'c', 20, 1, 2200),
+        (VIEWED, 'mod_resource', 'r', 10, 2, 2300),
+        (SUBMISSION, 'mod_assign', 'u', 30, 2, 5000),
+        (VIEWED, 'mod_resource', 'r', 10, 1, 9000),  # nueva sesión
+        (COMPLETION, 'core', 'u', 11, 1, 9600),
+        (VIEWED, 'core', 'r', 1, 0, 9700),           # usuario de sistema
+    ]
+
+class TestEventLogAggregator:
+
+    def test_aggregate_counts(self, small_log_rows):
+        """Test: Conteos por estudiante"""
+        aggregator = EventLogAggregator(fechas_limite={30: 4000})
+        df = aggregator.aggregate(make_log(small_log_rows), calificaciones={1: 8.5})
+
+        assert list(df.columns) == DataProcessor.REQUIRED_COLUMNS
+        assert list(df['estudiante_id']) == ['EST001', 'EST002']
+        assert list(df['actividades_completadas']) == [2, 0]
+        assert list(df['foros_participacion']) == [1, 0]
+        assert list(df['entregas_tarde']) == [0, 1]
+        assert df.loc[0, 'calificacion_final'] == 8.5
+        assert np.isnan(df.loc[1, 'calificacion_final'])
+
+    def test_session_time(self, small_log_rows):
+        """Test: Tiempo en plataforma a partir de intervalos entre eventos"""
+        df = EventLogAggregator().aggregate(make_log(small_log_rows))
+
+        # Estudiante 1: 1000->1600->1700->2200 (1200s) y 9000->9600 (600s)
+        assert df.loc[0, 'tiempo_plataforma_horas'] == round(1800 / 3600, 2)
+        # Estudiante 2: 2300->5000 supera el timeout de sesión
+        assert df.loc[1, 'tiempo_plataforma_horas'] == 0.0
+
+    def test_chunking_does_not_change_result(self):
+        """Test: El resultado no depende del tamaño de bloque"""
+        rng = np.random.default_rng(0)
+        n = 3000
+        events = rng.choice([VIEWED, COMPLETION, POSTED, SUBMISSION], n)
+        components = np.where(events == POSTED, 'mod_forum', 'core')
+        rows = list(zip(events, components, rng.choice(['c', 'r', 'u'], n),
+                        rng.integers(1, 40, n), rng.integers(1, 60, n),
+                        np.sort(rng.integers(0, 200000, n))))
+        deadlines = {cmid: 100000 for cmid in range(1, 40)}
+
+        full = EventLogAggregator(fechas_limite=deadlines).aggregate(
+            make_log(rows), chunksize=n)
+        chunked = EventLogAggregator(fechas_limite=deadlines).aggregate(
+            make_log(rows), chunksize=97)
+
+        pd.testing.assert_frame_equal(full, chunked)
+
+    def test_process_event_log_validates(self, small_log_rows):
+        """Test: DataProcessor valida el dataset agregado"""
+        df, result = DataProcessor().process_event_log(make_log(small_log_rows))
+
+        assert df is None
+        assert result['error'] == 'Datos insuficientes'
+
+    def test_process_event_log_drops_ungraded(self):
+        """Test: Con calificaciones, los estudiantes sin calificación no se cargan"""
+        rows = [(VIEWED, 'mod_resource', 'r', 10, userid, 1000) for userid in range(1, 61)]
+        grades = {userid: 7.0 for userid in range(1, 56)}
+        df, result = DataProcessor().process_event_log(make_log(rows), calificaciones=grades)
+
+        assert result['valid']
+        assert result['sin_calificacion'] == 5
+        assert len(df) == 55
+        assert not df['calificacion_final'].isna().any()
@@ -0,0 +1,84 @@
+"""
+Tests para el motor K-means en NumPy
+"""
+
+import pytest
+import numpy as np
+from sklearn.cluster import KMeans
+from backend.kmeans_engine import NumpyKMeans
+
+@pytest.fixture
+def blobs():
+    """Tres grupos con solapamiento moderado en cuatro dimensiones"""
+    rng = np.random.default_rng(0)
+    centers = np.array([[2.0, 1.0, 0.0, 0.5], [-1.5, 0.0, 1.0, -1.0], [0.0, -2.0, -1.0, 1.5]])
+    return centers[rng.integers(0, 3, 2000)] + rng.normal(0, 0.8, (2000, 4))
+
+class TestNumpyKMeans:
+
+    def test_matches_sklearn(self, blobs):
+        """Test: Misma partición e inercia que sklearn"""
+        reference = KMeans(n_clusters=3, n_init=10, random_state=42).fit(blobs)
+        model = NumpyKMeans(n_clusters=3, n_init=10, random_state=42).fit(blobs)
+
+        assert np.isclose(model.inertia_, reference.inertia_, rtol=1e-4)
+        matches = np.array([
+            (reference.labels_[model.labels_ == j] ==
+             np.bincount(reference.labels_[model.labels_ == j]).argmax()).mean()
+            for j in range(3)
+        ])
+        assert matches.min() > 0.999
+
+    def test_sklearn_interface(self, blobs):
+        """Test: Atributos y métodos con la misma forma que sklearn"""
+        model = NumpyKMeans(n_clusters=3, random_state=0)
+        labels = model.fit_predict(blobs)
+
+        assert model.cluster_centers_.shape == (3, 4)
+        assert model.cluster_centers_.dtype == np.float64
+        assert labels.shape == (2000,)
+        assert np.array_equal(labels, model.labels_)
+        assert np.array_equal(model.predict(blobs), labels)
+        assert model.transform(blobs).shape == (2000, 3)
+        assert np.isclose(-model.score(blobs), model.inertia_)
+        assert model.n_iter_ >= 1
+
+    def test_bounds_keep_exact_assignment(self, blobs):
+        """Test: Las cotas de Hamerly no alteran la asignación final"""
+        model = NumpyKMeans(n_clusters=5, n_init=4, random_state=3).fit(blobs)
+        distances = np.linalg.norm(blobs[:, None, :] - model.cluster_centers_[None], axis=2)
+
+        assert np.array_equal(model.labels_, distances.argmin(axis=1))
+
+    def test_sample_weight_equals_repetition(self, blobs):
+        """Test: Pesos enteros equivalen a repetir filas"""
+        weights = np.random.default_rng(1).integers(0, 3, len(blobs))
+        init = blobs[:3]
+
+        weighted = NumpyKMeans(n_clusters=3, init=init, n_init=1).fit(blobs, sample_weight=weights)
+        repeated = NumpyKMeans(n_clusters=3, init=init, n_init=1).fit(np.repeat(blobs, weights, axis=0))
+
+        assert np.allclose(weighted.cluster_centers_, repeated.cluster_centers_, atol=1e-4)
+        assert np.isclose(weighted.inertia_, repeated.inertia_, rtol=1e-4)
+
+    def test_empty_cluster_reseeded(self, blobs):
+        """Test: Un centroide inicial sin puntos se resiembra con el punto más lejano"""
+        init = np.vstack([blobs[:2], np.full((1, 4), 100.0)])
+        model = NumpyKMeans(n_clusters=3, init=init, n_init=1).fit(blobs)
+        reference = KMeans(n_clusters=3, init=init, n_init=1).fit(blobs)
+
+        assert np.bincount(model.labels_, minlength=3).min() > 0
+        assert np.abs(model.cluster_centers_).max() < 10
+        assert np.isclose(model.inertia_, reference.inertia_, rtol=1e-2)
+
+    def test_reproducible(self, blobs):
+        """Test: Misma semilla, mismo resultado"""
+        first = NumpyKMeans(n_clusters=4, random_state=7).fit(blobs)
+        second = NumpyKMeans(n_clusters=4, random_state=7).fit(blobs)
+
+        assert np.array_equal(first.cluster_centers_, second.cluster_centers_)
+
+    def test_too_few_samples(self):
+        """Test: Menos filas que clusters"""
+        with pytest.raises(ValueError):
+            NumpyKMeans(n_clusters=3).fit(np.zeros((2, 4)))
@@ -0,0 +1,134 @@
+"""
+Tests para el módulo de Registro de Modelos
+"""
+
+import pickle
+import pytest
+import pandas as pd
+import numpy as np
+from backend.model_registry import ModelRegistry
+from backend.regression import RegressionPredictor
+from backend.clustering import ClusteringAnalyzer
+
+@pytest.fixture
+def sample_data():
+    """Crea datos de muestra para testing"""
+    np.random.seed(42)
+    n = 100
+    data = {
+        'estudiante_id': [f'EST{i:03d}' for i in range(1, n+1)],
+        'actividades_completadas': np.random.randint(5, 60, n),
+        'tiempo_plataforma_horas': np.random.randint(10, 160, n),
+        'entregas_tarde': np.random.randint(0, 20, n),
+        'foros_participacion': np.random.randint(0, 15, n),
+        'cluster': np.random.randint(0, 3, n),
+        'calificacion_final': np.random.uniform(2.0, 10.0, n)
+    }
+    return pd.DataFrame(data)
+
+@pytest.fixture
+def registry(tmp_path):
+    """Crea un registro en un directorio temporal"""
+    return ModelRegistry(str(tmp_path / 'models'))
+
+@pytest.fixture
+def trained_predictor(sample_data):
+    predictor = RegressionPredictor()
+    metrics = predictor.train(sample_data, modo='estadisticas')
+    return predictor, metrics
+
+class TestModelRegistry:
+
+    def test_version_id(self):
+        """Test: La versión depende del dataset y de los parámetros"""
+        version = ModelRegistry.version_id('clustering', 'abc', {'k': 3, 'modo': 'auto'})
+
+        assert version.startswith('clustering-')
+        assert version == ModelRegistry.version_id('clustering', 'abc', {'modo': 'auto', 'k': 3})
+        assert version != ModelRegistry.version_id('clustering', 'abc', {'k': 4, 'modo': 'auto'})
+        assert version != ModelRegistry.version_id('clustering', 'abd', {'k': 3, 'modo': 'auto'})
+
+        with pytest.raises(ValueError):
+            ModelRegistry.version_id('otro', 'abc', {})
+
+    def test_save_and_load(self, registry, trained_predictor, sample_data):
+        """Test: Un modelo guardado predice igual al cargarlo en otro proceso"""
+        predictor, metrics = trained_predictor
+        version = registry.save(
+            'regresion', {'modelo': predictor, 'resultados': metrics}, 'abc', {'modo': 'estadisticas'},
+            features=RegressionPredictor.FEATURES_FOR_REGRESSION,
+            metricas={'r2_score': metrics['r2_score']}
+        )
+
+        loaded = ModelRegistry(registry.registry_dir).load(version)
+        meta = registry.get_meta(version)
+
+        assert np.allclose(loaded['modelo'].predict(sample_data), predictor.predict(sample_data))
+        assert np.allclose(loaded['resultados']['coeficientes'], metrics['coeficientes'])
+        assert meta['features'] == RegressionPredictor.FEATURES_FOR_REGRESSION
+        assert np.isclose(meta['metricas']['r2_score'], metrics['r2_score'])
+
+    def test_load_is_lazy_and_cached(self, registry, trained_predictor):
+        """Test: Cada versión se deserializa una vez por proceso"""
+        predictor, _ = trained_predictor
+        version = registry.save('regresion', {'modelo': predictor}, 'abc', {})
+
+        assert registry.load(version) is registry.load(version)
+
+        with pytest.raises(ValueError):
+            registry.load('regresion-inexistente')
+
+    def test_overwrite(self, registry, trained_predictor, sample_data):
+        """Test: Reentrenar reemplaza la versión guardada"""
+        predictor, _ = trained_predictor
+        version = registry.save('regresion', {'modelo': predictor}, 'abc', {})
+        registry.load(version)
+
+        retrained = RegressionPredictor()
+        retrained.train(sample_data, random_state=7)
+        assert registry.save('regresion', {'modelo': retrained}, 'abc', {}) == version
+        assert np.allclose(
+            registry.load(version)['modelo'].predict(sample_data), predictor.predict(sample_data)
+        )
+
+        registry.save('regresion', {'modelo': retrained}, 'abc', {}, overwrite=True)
+        assert np.allclose(
+            registry.load(version)['modelo'].predict(sample_data), retrained.predict(sample_data)
+        )
+
+    def test_activate_and_list(self, registry, trained_predictor):
+        """Test: Activación de versiones y listado"""
+        predictor, _ = trained_predictor
+        first = registry.save('regresion', {'modelo': predictor}, 'abc', {'modo': 'completo'})
+        second = registry.save('regresion', {'modelo': predictor}, 'abc', {'modo': 'estadisticas'})
+
+        assert registry.get_active('regresion') is None
+
+        registry.activate(first)
+        assert registry.active_version('regresion') == first
+
+        registry.activate(second)
+        payload, meta = ModelRegistry(registry.registry_dir).get_active('regresion')
+        assert meta['version'] == second
+
+        versions = registry.list_versions('regresion')
+        assert {meta['version']: meta['activa'] for meta in versions} == {first: False, second: True}
+        assert registry.list_versions('clustering') == []
+
+        with pytest.raises(ValueError):
+            registry.activate('regresion-inexistente')
+
+    def test_clustering_serialization_drops_caches(self, sample_data):
+        """Test: El analizador se serializa sin cachés de ejecución"""
+        analyzer = ClusteringAnalyzer()
+        analyzer.fit_predict(sample_data, k=3)
+        analyzer.get_cluster_stats(sample_data, analyzer.labels_)
+
+        restored = pickle.loads(pickle.dumps(analyzer))
+
+        assert analyzer.cluster_stats_ is not None
+        assert restored.cluster_stats_ is None
+        assert np.array_equal(
+            restored.assign_clusters(sample_data)['labels'],
+            analyzer.assign_clusters(sample_data)['labels']
+        )
@@ -0,0 +1,83 @@
+"""
+Tests para el módulo de Mínimos Cuadrados por Estadísticos Suficientes
+"""
+
+import pytest
+import numpy as np
+from sklearn.linear_model import LinearRegression
+from backend.ols_stats import OLSAccumulator
+
+@pytest.fixture
+def regression_data():
+    """Features y target con relación lineal y ruido"""
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(1000, 4)) * [1, 10, 100, 1000] + [0, 50, 500, 1e5]
+    y = X @ [1.0, -0.2, 0.03, 0.001] + rng.normal(0, 0.5, 1000)
+    return X, y
+
+def accumulate(X, y, blocks):
+    accumulator = OLSAccumulator(X.shape[1])
+    for X_block, y_block in zip(np.array_split(X, blocks), np.array_split(y, blocks)):
+        accumulator.update(X_block, y_block)
+    return accumulator
+
+class TestOLSAccumulator:
+
+    def test_solve_matches_sklearn(self, regression_data):
+        """Test: Coeficientes iguales a LinearRegression"""
+        X, y = regression_data
+        coef, intercept = accumulate(X, y, 7).solve()
+        model = LinearRegression().fit(X, y)
+
+        assert np.allclose(coef, model.coef_)
+        assert np.isclose(intercept, model.intercept_)
+
+    def test_remove_block(self, regression_data):
+        """Test: Quitar un bloque equivale a no haberlo agregado"""
+        X, y = regression_data
+        accumulator = accumulate(X, y, 1)
+        accumulator.remove(X[:200], y[:200])
+        expected = accumulate(X[200:], y[200:], 1)
+
+        assert accumulator.count == 800
+        assert np.allclose(accumulator.cxx, expected.cxx)
+        assert np.allclose(accumulator.solve()[0], expected.solve()[0])
+
+    def test_difference_and_merge(self, regression_data):
+        """Test: Diferencia y unión de acumuladores"""
+        X, y = regression_data
+        first = accumulate(X[:300], y[:300], 2)
+        second = accumulate(X[300:], y[300:], 3)
+        total = first.copy()
+        total.merge(second)
+
+        assert np.allclose(total.solve()[0], accumulate(X, y, 1).solve()[0])
+        assert np.allclose(total.difference(first).solve()[0], second.solve()[0])
+
+    def test_sse_and_r2(self, regression_data):
+        """Test: SSE y R² sin recorrer las filas"""
+        X, y = regression_data
+        accumulator = accumulate(X, y, 4)
+        coef, intercept = accumulator.solve()
+        residuals = y - X @ coef - intercept
+
+        assert np.isclose(accumulator.sse(coef, intercept), (residuals ** 2).sum())
+        assert np.isclose(
+            accumulator.r2(coef, intercept),
+            1 - (residuals ** 2).sum() / ((y - y.mean()) ** 2).sum()
+        )
+
+    def test_collinear_features(self, regression_data):
+        """Test: Features constantes o colineales usan mínima norma"""
+        X, y = regression_data
+        X = np.column_stack([X, np.full(len(X), 3.0), X[:, 0] * 2])
+        coef, intercept = accumulate(X, y, 2).solve()
+        model = LinearRegression().fit(X, y)
+
+        assert np.allclose(X @ coef + intercept, model.predict(X))
+        assert coef[4] == 0
+
+    def test_empty(self):
+        """Test: Resolver sin filas"""
+        with pytest.raises(ValueError):
+            OLSAccumulator(3).solve()
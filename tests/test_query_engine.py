@@ -0,0 +1,101 @@
+"""
+Tests para el módulo de Consultas Indexadas
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+from backend.query_engine import QueryEngine
+
+@pytest.fixture
+def sample_data():
+    """Crea datos de muestra para testing"""
+    np.random.seed(42)
+    n = 500
+    data = {
+        'estudiante_id': [f'EST{i:03d}' for i in range(1, n+1)],
+        'actividades_completadas': np.random.randint(5, 60, n),
+        'tiempo_plataforma_horas': np.round(np.random.uniform(10, 160, n), 2),
+        'entregas_tarde': np.random.randint(0, 20, n),
+        'calificacion_final': np.round(np.random.uniform(2.0, 10.0, n), 2)
+    }
+    return pd.DataFrame(data)
+
+@pytest.fixture
+def engine(sample_data):
+    """Crea instancia del motor de consultas"""
+    return QueryEngine(sample_data)
+
+class TestQueryEngine:
+
+    def test_single_range(self, engine, sample_data):
+        """Test: Rango sobre una columna igual a la máscara booleana"""
+        column = sample_data['calificacion_final']
+        expected = np.flatnonzero((column >= 4.0) & (column <= 7.5))
+
+        positions = engine.where([('calificacion_final', 4.0, 7.5)])
+
+        np.testing.assert_array_equal(positions, expected)
+        assert engine.count([('calificacion_final', 4.0, 7.5)]) == len(expected)
+
+    def test_open_bounds(self, engine, sample_data):
+        """Test: Umbrales de un solo lado"""
+        column = sample_data['entregas_tarde']
+
+        assert engine.count([('entregas_tarde', 10, None)]) == (column >= 10).sum()
+        assert engine.count([('entregas_tarde', None, 3)]) == (column <= 3).sum()
+        assert engine.count([('entregas_tarde', None, None)]) == len(sample_data)
+
+    def test_compound_conditions(self, engine, sample_data):
+        """Test: Condiciones combinadas en varias columnas"""
+        conditions = [
+            {'columna': 'calificacion_final', 'max': 6.0},
+            {'columna': 'entregas_tarde', 'min': 5},
+            {'columna': 'tiempo_plataforma_horas', 'min': 20, 'max': 100}
+        ]
+        mask = (
+            (sample_data['calificacion_final'] <= 6.0) &
+            (sample_data['entregas_tarde'] >= 5) &
+            sample_data['tiempo_plataforma_horas'].between(20, 100)
+        )
+
+        np.testing.assert_array_equal(engine.where(conditions), np.flatnonzero(mask))
+        assert engine.count(conditions) == mask.sum()
+        pd.testing.assert_frame_equal(
+            engine.rows(engine.where(conditions)), sample_data[mask]
+        )
+
+    def test_nulls_excluded(self):
+        """Test: Los valores nulos no cumplen ningún umbral"""
+        df = pd.DataFrame({'a': [1.0, np.nan, 3.0, np.nan, 5.0]})
+        engine = QueryEngine(df)
+
+        np.testing.assert_array_equal(engine.where([('a', 2, None)]), [2, 4])
+        assert engine.count([('a', None, 10)]) == 3
+
+    def test_nulls_in_secondary_condition(self):
+        """Test: Nulos (también de enteros anulables) en las condiciones no selectivas"""
+        df = pd.DataFrame({
+            'a': np.arange(6),
+            'b': pd.array([1, None, 3, 4, None, 6], dtype='Int64'),
+            'c': [0.5, 1.0, np.nan, 2.0, 3.0, 4.0]
+        })
+        engine = QueryEngine(df)
+
+        np.testing.assert_array_equal(engine.where([('a', 0, 3), ('b', 0, None)]), [0, 2, 3])
+        np.testing.assert_array_equal(
+            engine.where([('a', 0, 3), ('b', 0, None), ('c', None, 5)]), [0, 3]
+        )
+
+    def test_empty_result(self, engine):
+        """Test: Rango sin coincidencias"""
+        assert engine.count([('calificacion_final', 11, None)]) == 0
+        assert len(engine.where([('calificacion_final', 8, 5)])) == 0
+
+    def test_invalid_column(self, engine):
+        """Test: Columna inexistente o no numérica"""
+        with pytest.raises(ValueError):
+            engine.where([('no_existe', 1, 2)])
+
+        with pytest.raises(ValueError):
+            engine.count([('estudiante_id', 1, 2)])
@@ -5,6 +5,11 @@ Tests para el módulo de Regresión Lineal
 import pytest
 import pandas as pd
 import numpy as np
+from scipy import stats
+from sklearn.linear_model import LinearRegression
+from sklearn.model_selection import (
+    LeaveOneOut, RepeatedKFold, cross_val_predict, cross_val_score, train_test_split
+)
 from backend.regression import RegressionPredictor
 
 @pytest.fixture
@@ -190,4 +195,305 @@ class TestRegressionPredictor:
         incomplete_data = sample_data_with_clusters.drop('cluster', axis=1)
         
         with pytest.raises(KeyError):
-            regression_predictor.train(incomplete_data)
\ No newline at end of file
+            regression_predictor.train(incomplete_data)
+    def test_train_sufficient_statistics(self, regression_predictor, sample_data_with_clusters):
+        """Test: Modo estadísticas reproduce el entrenamiento completo"""
+        full = regression_predictor.train(sample_data_with_clusters, modo='completo')
+        full_predictions = regression_predictor.predict(sample_data_with_clusters)
+        
+        predictor = RegressionPredictor()
+        metrics = predictor.train(sample_data_with_clusters, modo='estadisticas')
+        
+        assert metrics['modo_entrenamiento'] == 'estadisticas'
+        assert np.allclose(metrics['coeficientes'], full['coeficientes'])
+        assert np.isclose(metrics['r2_score'], full['r2_score'])
+        assert np.isclose(metrics['cv_r2_mean'], full['cv_r2_mean'])
+        assert np.allclose(predictor.predict(sample_data_with_clusters), full_predictions)
+    
+    def test_invalid_training_mode(self, regression_predictor, sample_data_with_clusters):
+        """Test: Modo de entrenamiento inválido"""
+        with pytest.raises(ValueError):
+            regression_predictor.train(sample_data_with_clusters, modo='otro')
+    
+    def test_update_training(self, regression_predictor, sample_data_with_clusters):
+        """Test: Altas y bajas sin reentrenar"""
+        data = sample_data_with_clusters
+        regression_predictor.train(data, modo='estadisticas')
+        train_idx, _ = train_test_split(np.arange(len(data)), test_size=0.2, random_state=42)
+        
+        added = data.iloc[:10].assign(calificacion_final=9.5)
+        removed = data.iloc[train_idx[:15]]
+        metrics = regression_predictor.update_training(added=added, removed=removed)
+        
+        rows = pd.concat([data.iloc[train_idx[15:]], added])
+        features = RegressionPredictor.FEATURES_FOR_REGRESSION
+        expected = LinearRegression().fit(rows[features], rows[RegressionPredictor.TARGET])
+        
+        assert metrics['n_entrenamiento'] == len(rows)
+        assert np.allclose(
+            regression_predictor.predict(data), expected.predict(data[features])
+        )
+    
+    def test_apply_delta(self, regression_predictor, sample_data_with_clusters):
+        """Test: Delta con filas de entrenamiento, de prueba y nuevas"""
+        data = sample_data_with_clusters
+        regression_predictor.train(data, modo='estadisticas')
+        train_idx, test_idx = train_test_split(np.arange(len(data)), test_size=0.2, random_state=42)
+        
+        updated = np.array([train_idx[0], train_idx[1], test_idx[0]])
+        merged = pd.concat([data, data.iloc[:3]], ignore_index=True)
+        merged.loc[updated, 'calificacion_final'] = 9.9
+        merged.loc[updated, 'cluster'] = 2
+        
+        regression_predictor.apply_delta(merged, updated, data.iloc[updated], np.arange(100, 103))
+        
+        rows = merged.iloc[np.concatenate([train_idx, np.arange(100, 103)])]
+        features = RegressionPredictor.FEATURES_FOR_REGRESSION
+        expected = LinearRegression().fit(rows[features], rows[RegressionPredictor.TARGET])
+        
+        assert len(regression_predictor.train_positions_) == len(rows)
+        assert np.allclose(regression_predictor.predict(merged), expected.predict(merged[features]))
+        
+        # Las posiciones siguen valiendo para el bootstrap sobre el DataFrame fusionado
+        result = regression_predictor.bootstrap_intervals(merged, n_bootstrap=50)
+        explicit = regression_predictor.bootstrap_intervals(rows, merged, n_bootstrap=50)
+        assert np.array_equal(result['intervalo_inferior'], explicit['intervalo_inferior'])
+    
+    def test_update_training_requires_statistics(self, regression_predictor, sample_data_with_clusters):
+        """Test: Actualización sin acumulador"""
+        regression_predictor.train(sample_data_with_clusters)
+        
+        with pytest.raises(ValueError):
+            regression_predictor.update_training(added=sample_data_with_clusters)
+    
+    def test_train_chunks(self, regression_predictor, sample_data_with_clusters):
+        """Test: Entrenamiento por bloques"""
+        data = sample_data_with_clusters
+        chunks = lambda: (data.iloc[start:start + 17] for start in range(0, len(data), 17))
+        metrics = regression_predictor.train_chunks(chunks)
+        
+        assert metrics['n_entrenamiento'] + metrics['n_prueba'] == len(data)
+        assert metrics['mae'] >= 0
+        assert 'cv_r2_mean' in metrics
+        
+        # Sin conjunto de prueba el modelo es el de todas las filas
+        regression_predictor.train_chunks(chunks, test_size=0)
+        features = RegressionPredictor.FEATURES_FOR_REGRESSION
+        expected = LinearRegression().fit(data[features], data[RegressionPredictor.TARGET])
+        assert np.allclose(regression_predictor.predict(data), expected.predict(data[features]))
+    
+    def test_closed_form_cv_matches_sklearn(self, regression_predictor, sample_data_with_clusters):
+        """Test: Validación cruzada sin reentrenar igual a cross_val_score"""
+        data = sample_data_with_clusters
+        features = RegressionPredictor.FEATURES_FOR_REGRESSION
+        X, y = data[features].values, data[RegressionPredictor.TARGET].values
+        
+        expected = cross_val_score(LinearRegression(), X, y, cv=5, scoring='r2')
+        scores = regression_predictor._cross_validate(X, y, cv=5)
+        assert np.allclose(scores, expected)
+        
+        expected = cross_val_score(
+            LinearRegression(), X, y, scoring='r2',
+            cv=RepeatedKFold(n_splits=4, n_repeats=3, random_state=7)
+        )
+        scores = regression_predictor._cross_validate(
+            X, y, cv=4, modo='repetido', n_repeats=3, random_state=7
+        )
+        assert np.allclose(scores, expected)
+    
+    def test_leave_one_out(self, regression_predictor, sample_data_with_clusters):
+        """Test: LOOCV con la matriz hat igual a n reentrenamientos"""
+        data = sample_data_with_clusters
+        features = RegressionPredictor.FEATURES_FOR_REGRESSION
+        X, y = data[features].values, data[RegressionPredictor.TARGET].values
+        
+        predictions = cross_val_predict(LinearRegression(), X, y, cv=LeaveOneOut())
+        expected = 1 - ((y - predictions) ** 2).sum() / ((y - y.mean()) ** 2).sum()
+        
+        metrics = regression_predictor.train(data, cv_modo='loo')
+        scores = regression_predictor._cross_validate(X, y, modo='loo')
+        
+        assert np.isclose(scores[0], expected)
+        assert metrics['cv_modo'] == 'loo'
+        assert regression_predictor.get_metrics_interpretation()[
+            'validacion_cruzada']['estabilidad'] == 'No aplica'
+    
+    def test_invalid_cv_mode(self, regression_predictor, sample_data_with_clusters):
+        """Test: Modo de validación cruzada inválido"""
+        with pytest.raises(ValueError):
+            regression_predictor.train(sample_data_with_clusters, cv_modo='otro')
+    
+    def test_prediction_intervals(self, regression_predictor, sample_data_with_clusters):
+        """Test: Intervalos de predicción de mínimos cuadrados por fila"""
+        data = sample_data_with_clusters
+        regression_predictor.train(data)
+        result = regression_predictor.predict_with_confidence(data, formato='columnas', nivel=0.9)
+        
+        features = RegressionPredictor.FEATURES_FOR_REGRESSION
+        train_idx, _ = train_test_split(np.arange(len(data)), test_size=0.2, random_state=42)
+        design = np.column_stack([np.ones(len(data)), data[features].values])
+        train = design[train_idx]
+        y = data[RegressionPredictor.TARGET].values[train_idx]
+        
+        beta = np.linalg.lstsq(train, y, rcond=None)[0]
+        dof = len(train_idx) - train.shape[1]
+        sigma2 = ((y - train @ beta) ** 2).sum() / dof
+        h = np.einsum('ij,jk,ik->i', design, np.linalg.inv(train.T @ train), design)
+        margin = stats.t.ppf(0.95, dof) * np.sqrt(sigma2 * (1 + h))
+        
+        assert np.allclose(result['prediccion_original'], design @ beta)
+        assert np.allclose(
+            result['intervalo_superior'], np.clip(result['prediccion'] + margin, 0, 10)
+        )
+        assert np.allclose(
+            result['intervalo_inferior'], np.clip(result['prediccion'] - margin, 0, 10)
+        )
+        assert len(np.unique(np.round(margin, 6))) > 1
+    
+    def test_columnar_output(self, regression_predictor, sample_data_with_clusters):
+        """Test: Formato por columnas equivalente al de registros"""
+        regression_predictor.train(sample_data_with_clusters, modo='estadisticas')
+        records = regression_predictor.predict_with_confidence(sample_data_with_clusters)
+        columns = regression_predictor.predict_with_confidence(
+            sample_data_with_clusters, formato='columnas'
+        )
+        
+        for key, values in columns.items():
+            assert isinstance(values, np.ndarray)
+            assert list(values) == [record[key] for record in records]
+    
+    def test_vectorized_confidence(self, regression_predictor):
+        """Test: Niveles de confianza vectorizados"""
+        levels = regression_predictor._calculate_confidence([5, 10.5, -0.5, 12, -3, np.nan])
+        
+        assert list(levels) == ['Alta', 'Media', 'Media', 'Baja', 'Baja', 'Baja']
+        assert regression_predictor._calculate_confidence(0) == 'Alta'
+    
+    def test_bootstrap_coefficients(self, regression_predictor):
+        """Test: Solución en lote igual a mínimos cuadrados ponderados por remuestra"""
+        rng = np.random.default_rng(0)
+        D = np.column_stack([np.ones(50), rng.normal(size=(50, 3))])
+        y = D @ [1.0, 2.0, -1.0, 0.5] + rng.normal(0, 0.1, 50)
+        counts = rng.multinomial(50, np.full(50, 1 / 50), size=4).astype('float64')
+        
+        coefs = regression_predictor._bootstrap_coefficients(D, y, counts)
+        
+        for b in range(4):
+            weights = np.sqrt(counts[b])
+            expected = np.linalg.lstsq(D * weights[:, None], y * weights, rcond=None)[0]
+            assert np.allclose(coefs[b], expected)
+    
+    def test_bootstrap_intervals(self, regression_predictor, sample_data_with_clusters):
+        """Test: Intervalos bootstrap por estudiante"""
+        data = sample_data_with_clusters
+        regression_predictor.train(data)
+        
+        result = regression_predictor.bootstrap_intervals(data, n_bootstrap=300)
+        again = regression_predictor.bootstrap_intervals(data, n_bootstrap=300)
+        mean_only = regression_predictor.bootstrap_intervals(data, n_bootstrap=300, tipo='media')
+        ols = regression_predictor.predict_with_confidence(data, formato='columnas')
+        
+        width = result['intervalo_superior'] - result['intervalo_inferior']
+        ols_width = ols['intervalo_superior'] - ols['intervalo_inferior']
+        
+        assert np.array_equal(result['intervalo_inferior'], again['intervalo_inferior'])
+        assert np.allclose(result['prediccion'], regression_predictor.predict(data))
+        assert np.all(result['intervalo_inferior'] < result['intervalo_superior'])
+        assert np.all(
+            mean_only['intervalo_superior'] - mean_only['intervalo_inferior'] < width
+        )
+        assert np.all(
+            (mean_only['intervalo_inferior'] <= mean_only['prediccion']) &
+            (mean_only['prediccion'] <= mean_only['intervalo_superior'])
+        )
+        assert abs(np.median(width) / np.median(ols_width) - 1) < 0.25
+    
+    def test_bootstrap_other_train_data(self, regression_predictor, sample_data_with_clusters):
+        """Test: Con otro DataFrame se remuestrean todas sus filas"""
+        data = sample_data_with_clusters
+        regression_predictor.train(data)
+        
+        train_idx, _ = train_test_split(np.arange(len(data)), test_size=0.2, random_state=42)
+        train_rows = data.iloc[train_idx]
+        other = data.sample(frac=1, random_state=0).reset_index(drop=True)
+        
+        same = regression_predictor.bootstrap_intervals(data, n_bootstrap=100)
+        explicit = regression_predictor.bootstrap_intervals(train_rows, data, n_bootstrap=100)
+        shuffled = regression_predictor.bootstrap_intervals(other, data, n_bootstrap=100)
+        
+        assert np.array_equal(same['intervalo_inferior'], explicit['intervalo_inferior'])
+        assert not np.array_equal(same['intervalo_inferior'], shuffled['intervalo_inferior'])
+    
+    def test_predict_with_bootstrap(self, regression_predictor, sample_data_with_clusters):
+        """Test: predict_with_confidence con intervalos bootstrap"""
+        regression_predictor.train(sample_data_with_clusters)
+        result = regression_predictor.predict_with_confidence(
+            sample_data_with_clusters, formato='columnas', metodo='bootstrap', n_bootstrap=200
+        )
+        
+        assert np.all(result['intervalo_inferior'] >= 0)
+        assert np.all(result['intervalo_superior'] <= 10)
+        
+        with pytest.raises(ValueError):
+            regression_predictor.predict_with_confidence(sample_data_with_clusters, metodo='otro')
+        with pytest.raises(ValueError):
+            regression_predictor.bootstrap_intervals(sample_data_with_clusters, tipo='otro')
+        
+        for n_bootstrap in (0, 1, RegressionPredictor.MAX_BOOTSTRAP + 1):
+            with pytest.raises(ValueError):
+                regression_predictor.predict_with_confidence(
+                    sample_data_with_clusters, metodo='bootstrap', n_bootstrap=n_bootstrap
+                )
+    
+    def test_segmented_training(self, regression_predictor, sample_data_with_clusters):
+        """Test: Modo segmentado igual a un LinearRegression por cluster"""
+        data = sample_data_with_clusters
+        results = regression_predictor.train(data, modo='segmentado')
+        
+        features = ['actividades_completadas', 'tiempo_plataforma_horas',
+                    'entregas_tarde', 'foros_participacion']
+        train_idx, _ = train_test_split(np.arange(len(data)), test_size=0.2, random_state=42)
+        train = data.iloc[train_idx]
+        predictions = regression_predictor.predict(data)
+        
+        for cluster in range(3):
+            model = LinearRegression().fit(
+                train.loc[train['cluster'] == cluster, features],
+                train.loc[train['cluster'] == cluster, 'calificacion_final']
+            )
+            mask = (data['cluster'] == cluster).values
+            assert np.allclose(predictions[mask], model.predict(data.loc[mask, features]))
+            
+            segment = results['segmentos'][f'cluster_{cluster}']
+            assert segment['modelo'] == 'propio'
+            assert segment['n_entrenamiento'] == (train['cluster'] == cluster).sum()
+        
+        assert results['modo_entrenamiento'] == 'segmentado'
+        with pytest.raises(ValueError):
+            regression_predictor.update_training(added=data.head(5))
+    
+    def test_segmented_cv_and_intervals(self, regression_predictor, sample_data_with_clusters):
+        """Test: Validación cruzada e intervalos del modo segmentado"""
+        data = sample_data_with_clusters
+        features = ['actividades_completadas', 'tiempo_plataforma_horas',
+                    'entregas_tarde', 'foros_participacion']
+        regression_predictor.train(data, modo='segmentado', cv_modo='loo')
+        
+        train_idx, _ = train_test_split(np.arange(len(data)), test_size=0.2, random_state=42)
+        train = data.iloc[train_idx]
+        residuals = np.concatenate([
+            cross_val_predict(
+                LinearRegression(), group[features], group['calificacion_final'], cv=LeaveOneOut()
+            ) - group['calificacion_final']
+            for _, group in train.groupby('cluster')
+        ])
+        total = ((train['calificacion_final'] - train['calificacion_final'].mean()) ** 2).sum()
+        assert np.isclose(regression_predictor.metrics['cv_r2_mean'], 1 - (residuals ** 2).sum() / total)
+        
+        ols = regression_predictor.predict_with_confidence(data, formato='columnas')
+        boot = regression_predictor.predict_with_confidence(
+            data, formato='columnas', metodo='bootstrap', n_bootstrap=200
+        )
+        assert np.all(ols['intervalo_inferior'] <= ols['intervalo_superior'])
+        assert np.allclose(boot['prediccion'], ols['prediccion'])
+        assert np.all(boot['intervalo_inferior'] <= boot['intervalo_superior'])
@@ -0,0 +1,99 @@
+"""
+Tests para el módulo de Regresión Segmentada
+"""
+
+import pytest
+import numpy as np
+from sklearn.linear_model import LinearRegression
+from backend.segmented_regression import SegmentedOLS
+
+@pytest.fixture
+def segmented_data():
+    """Diseño con intercepto, tres segmentos con coeficientes distintos y uno chico"""
+    rng = np.random.default_rng(0)
+    n = 300
+    keys = np.concatenate([rng.integers(0, 3, n - 5), np.full(5, 7)])
+    X = rng.normal(size=(n, 3))
+    betas = np.array([[1.0, 2.0, -1.0, 0.5], [5.0, -1.0, 0.0, 2.0], [0.0, 0.5, 3.0, -2.0]])
+    D = np.column_stack([np.ones(n), X])
+    y = np.einsum('ij,ij->i', D, betas[keys % 3]) + rng.normal(0, 0.1, n)
+    return D, y, keys
+
+class TestSegmentedOLS:
+
+    def test_fit_matches_per_segment_models(self, segmented_data):
+        """Test: Coeficientes iguales a un LinearRegression por segmento"""
+        D, y, keys = segmented_data
+        engine = SegmentedOLS().fit(D, y, keys)
+
+        assert list(engine.segments_) == [0, 1, 2, 7]
+        assert list(engine.own_segments) == [True, True, True, False]
+        for k, segment in enumerate([0, 1, 2]):
+            mask = keys == segment
+            model = LinearRegression().fit(D[mask, 1:], y[mask])
+            assert np.allclose(engine.coef_[k], np.r_[model.intercept_, model.coef_])
+
+    def test_pooled_fallback(self, segmented_data):
+        """Test: Segmentos chicos o desconocidos usan el modelo conjunto"""
+        D, y, keys = segmented_data
+        engine = SegmentedOLS().fit(D, y, keys)
+        pooled = LinearRegression().fit(D[:, 1:], y)
+        expected = np.r_[pooled.intercept_, pooled.coef_]
+
+        assert np.allclose(engine.coef_[-1], expected)
+        assert np.allclose(engine.coef_[3], expected)
+        assert list(engine.rows(np.array([0, 7, 5, 9]))) == [0, 3, 4, 4]
+        assert np.allclose(engine.predict(D[:2], [5, 9]), D[:2] @ expected)
+
+    def test_predict_gather(self, segmented_data):
+        """Test: Cada fila se predice con los coeficientes de su segmento"""
+        D, y, keys = segmented_data
+        engine = SegmentedOLS().fit(D, y, keys)
+        predictions = engine.predict(D, keys)
+
+        for k, segment in enumerate(engine.segments_):
+            mask = keys == segment
+            assert np.allclose(predictions[mask], D[mask] @ engine.coef_[k])
+
+    def test_weighted_cases(self, segmented_data):
+        """Test: Casos ponderados iguales a ajustes separados"""
+        D, y, keys = segmented_data
+        engine = SegmentedOLS().fit(D, y, keys)
+        weights = np.ones((3, len(y)))
+        weights[0, :100] = 0
+        weights[1, 100:200] = 0
+        weights[2] = np.random.default_rng(1).integers(0, 3, len(y))
+
+        coefs = engine.coefficients(D, y, keys, weights)
+
+        assert coefs.shape == (3, 5, 4)
+        for b in range(3):
+            mask = (keys == 1) & (weights[b] > 0)
+            model = LinearRegression().fit(D[mask, 1:], y[mask], sample_weight=weights[b, mask])
+            assert np.allclose(coefs[b, 1], np.r_[model.intercept_, model.coef_])
+
+    def test_normal_equations_empty_segment(self, segmented_data):
+        """Test: Un segmento sin filas queda con ecuaciones nulas"""
+        D, y, _ = segmented_data
+        bounds = np.array([0, 100, 100, 300])
+        weights = np.random.default_rng(2).random((2, len(y)))
+
+        gram, moments = SegmentedOLS.normal_equations(D, y, bounds, weights)
+
+        assert gram.shape == (2, 4, 4, 4)
+        assert not gram[:, 1].any() and not moments[:, 1].any()
+        for k, rows in enumerate([slice(0, 100), slice(100, 300)]):
+            W = weights[:, rows]
+            assert np.allclose(gram[:, 2 * k], np.einsum('bi,ij,ik->bjk', W, D[rows], D[rows]))
+            assert np.allclose(moments[:, 2 * k], W @ (D[rows] * y[rows, None]))
+        assert np.allclose(gram[:, 3], gram[:, :3].sum(axis=1))
+
+    def test_leverage_is_hat_diagonal(self, segmented_data):
+        """Test: Leverage igual a la diagonal de la matriz hat de cada segmento"""
+        D, y, keys = segmented_data
+        engine = SegmentedOLS().fit(D, y, keys)
+        leverage = engine.leverage(D, keys)
+
+        mask = keys == 2
+        hat = D[mask] @ np.linalg.pinv(D[mask])
+        assert np.allclose(leverage[mask], np.diag(hat))
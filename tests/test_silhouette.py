@@ -0,0 +1,108 @@
+"""
+Tests para el módulo de Silhouette
+"""
+
+import pytest
+import numpy as np
+from sklearn.metrics import silhouette_score
+from backend.silhouette import SilhouetteEngine
+
+@pytest.fixture
+def clustered():
+    """Tres grupos gaussianos en dos dimensiones"""
+    rng = np.random.default_rng(0)
+    centers = np.array([[2.0, 0.0], [-2.0, 0.0], [0.0, 3.0]])
+    labels = rng.choice(3, 8000, p=[0.6, 0.3, 0.1])
+    X = centers[labels] + rng.normal(0, 1, (8000, 2))
+    return X, labels, centers
+
+@pytest.fixture
+def engine():
+    """Crea instancia del motor de silhouette"""
+    return SilhouetteEngine()
+
+class TestSilhouetteEngine:
+
+    def test_exact_matches_sklearn(self, engine, clustered):
+        """Test: Modo exacto igual a sklearn"""
+        X, labels, _ = clustered
+        result = engine.score(X[:1000], labels[:1000], mode='exacto')
+
+        assert result['modo'] == 'exacto'
+        assert result['intervalo'] is None
+        assert np.isclose(result['valor'], silhouette_score(X[:1000], labels[:1000]))
+
+    def test_auto_mode(self, engine, clustered):
+        """Test: Exacto en datasets chicos y muestreo en grandes"""
+        X, labels, _ = clustered
+
+        assert engine.score(X[:500], labels[:500])['modo'] == 'exacto'
+        assert engine.score(X, labels)['modo'] == 'muestreo'
+
+    def test_stratified_sample(self, engine, clustered):
+        """Test: Muestra proporcional a cada cluster y reproducible"""
+        _, labels, _ = clustered
+        indices = engine.sample_indices(labels)
+
+        assert len(indices) == pytest.approx(engine.sample_size, abs=3)
+        proportions = np.bincount(labels[indices]) / len(indices)
+        assert np.allclose(proportions, np.bincount(labels) / len(labels), atol=0.01)
+        assert np.array_equal(indices, SilhouetteEngine().sample_indices(labels))
+
+    def test_small_cluster_represented(self):
+        """Test: Clusters chicos aparecen en la muestra"""
+        labels = np.zeros(10000, dtype=int)
+        labels[:3] = 1
+        indices = SilhouetteEngine(sample_size=100).sample_indices(labels)
+
+        assert (labels[indices] == 1).sum() == 2
+
+    def test_sample_interval_covers_exact(self, engine, clustered):
+        """Test: El intervalo de confianza contiene al valor exacto"""
+        X, labels, _ = clustered
+        exact = silhouette_score(X, labels)
+        result = engine.score(X, labels, mode='muestreo')
+
+        low, high = result['intervalo']
+        assert low <= result['valor'] <= high
+        assert low - 0.01 <= exact <= high + 0.01
+        assert result['muestra'] < len(labels)
+
+    def test_simplified(self, engine, clustered):
+        """Test: Silhouette simplificado por centroides"""
+        X, labels, centers = clustered
+        result = engine.score(X, labels, centers, mode='simplificado')
+
+        distances = np.linalg.norm(X[:, None, :] - centers[None], axis=2)
+        own = np.eye(3, dtype=bool)[labels]
+        a = distances[own]
+        b = np.where(own, np.inf, distances).min(axis=1)
+        expected = ((b - a) / np.maximum(a, b)).mean()
+
+        assert result['modo'] == 'simplificado'
+        assert np.isclose(result['valor'], expected)
+        assert 0 < result['valor'] <= 1
+
+    def test_single_cluster(self, engine):
+        """Test: Un solo cluster devuelve 0"""
+        X = np.random.default_rng(1).normal(size=(50, 2))
+
+        for mode in ('exacto', 'muestreo', 'simplificado'):
+            assert engine.score(X, np.zeros(50, dtype=int), mode=mode)['valor'] == 0.0
+
+    def test_one_row_per_cluster(self, engine):
+        """Test: k == n (cada fila es su propio cluster) devuelve 0"""
+        X = np.random.default_rng(1).normal(size=(4, 2))
+        labels = np.arange(4)
+
+        for mode in ('exacto', 'muestreo', 'simplificado'):
+            assert engine.score(X, labels, mode=mode)['valor'] == 0.0
+        assert engine.score_sample(X, labels, np.ones(4, dtype=int))['valor'] == 0.0
+
+    def test_invalid_mode(self, engine):
+        """Test: Modo inválido"""
+        with pytest.raises(ValueError):
+            SilhouetteEngine('otro')
+
+        with pytest.raises(ValueError):
+            engine.resolve_mode(10, 'otro')
@@ -0,0 +1,87 @@
+"""
+Tests para el módulo de Índice de Similitud
+"""
+
+import time
+import pytest
+import numpy as np
+from backend.similarity_index import SimilarityIndex
+
+@pytest.fixture
+def points():
+    """Features normalizadas de estudiantes"""
+    return np.random.default_rng(0).normal(size=(5000, 4))
+
+@pytest.fixture
+def index(points):
+    """Índice construido con tres centroides"""
+    centroids = np.array([[1.0, 0, 0, 0], [-1.0, 0, 0, 0], [0, 2.0, 0, 0]])
+    return SimilarityIndex().build(points, centroids)
+
+def brute_force(points, x, n, exclude=None):
+    distances = np.linalg.norm(points - x, axis=1)
+    if exclude is not None:
+        distances[exclude] = np.inf
+    order = np.argsort(distances)[:n]
+    return order, distances[order]
+
+class TestSimilarityIndex:
+
+    def test_query_matches_brute_force(self, index, points):
+        """Test: Vecinos iguales a la búsqueda exhaustiva"""
+        positions, distances = index.query(points[10], n_neighbors=5, exclude=10)
+        expected, expected_distances = brute_force(points, points[10], 5, exclude=10)
+
+        assert np.array_equal(positions, expected)
+        assert np.allclose(distances, expected_distances)
+
+    def test_nearest_centroid(self, index):
+        """Test: Centroide más cercano"""
+        cluster, distance = index.nearest_centroid([0.1, 1.8, 0, 0])
+
+        assert cluster == 2
+        assert np.isclose(distance, np.linalg.norm([0.1, -0.2]))
+
+    def test_incremental_update(self, index, points):
+        """Test: Filas modificadas y agregadas se consultan sin reconstruir"""
+        updated = points.copy()
+        updated[3] = [5.0, 5.0, 5.0, 5.0]
+        added = np.array([[5.1, 5.0, 5.0, 5.0]])
+        index.update([3, 5000], np.vstack([updated[3], added]))
+
+        assert index.rebuilds == 1
+        assert index.size == 5001
+
+        positions, _ = index.query([5.0, 5.0, 5.0, 5.0], n_neighbors=2)
+        assert list(positions) == [3, 5000]
+
+        # La versión vieja de la fila 3 ya no aparece cerca de su lugar original
+        positions, _ = index.query(points[3], n_neighbors=10)
+        assert 3 not in positions
+
+    def test_rebuild_after_many_updates(self, index, points):
+        """Test: Reconstrucción cuando el buffer supera el umbral"""
+        new_rows = points[:600] + 0.01
+        index.update(np.arange(600), new_rows)
+
+        assert index.rebuilds == 2
+        assert index.pending == {}
+        assert np.allclose(index.vector(5), new_rows[5])
+
+        all_points = points.copy()
+        all_points[:600] = new_rows
+        positions, _ = index.query(all_points[7], n_neighbors=3)
+        assert np.array_equal(positions, brute_force(all_points, all_points[7], 3)[0])
+
+    def test_query_speed(self, index, points):
+        """Test: Consulta en menos de un milisegundo"""
+        index.query(points[0])
+        start = time.perf_counter()
+        for i in range(100):
+            index.query(points[i], n_neighbors=5)
+        assert (time.perf_counter() - start) / 100 < 1e-3
+
+    def test_not_built(self):
+        """Test: Consulta sin construir el índice"""
+        with pytest.raises(ValueError):
+            SimilarityIndex().query([0, 0, 0, 0])
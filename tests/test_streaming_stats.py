@@ -0,0 +1,107 @@
+"""
+Tests para el módulo de Estadísticas Incrementales
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+from backend.streaming_stats import RunningMoments, QuantileSketch, StatisticsAccumulator
+
+@pytest.fixture
+def values():
+    """Valores sesgados similares a tiempo en plataforma"""
+    rng = np.random.default_rng(42)
+    return rng.lognormal(3, 1, 20000)
+
+class TestRunningMoments:
+
+    def test_chunked_update(self, values):
+        """Test: Momentos por bloques iguales a los de numpy"""
+        moments = RunningMoments()
+        for chunk in np.array_split(values, 7):
+            moments.update(chunk)
+
+        assert moments.count == len(values)
+        assert np.isclose(moments.mean, values.mean())
+        assert np.isclose(moments.std(), values.std(ddof=1))
+
+    def test_merge(self, values):
+        """Test: Combinar acumuladores de distintos procesos"""
+        left, right = RunningMoments(), RunningMoments()
+        left.update(values[:5000])
+        right.update(values[5000:])
+        left.merge(right)
+
+        assert np.isclose(left.mean, values.mean())
+        assert np.isclose(left.std(), values.std(ddof=1))
+
+    def test_remove(self, values):
+        """Test: Quitar un bloque deja los momentos del resto"""
+        moments = RunningMoments()
+        moments.update(values)
+        moments.remove(values[:3000])
+
+        assert moments.count == len(values) - 3000
+        assert np.isclose(moments.mean, values[3000:].mean())
+        assert np.isclose(moments.std(), values[3000:].std(ddof=1))
+
+class TestQuantileSketch:
+
+    def test_exact_for_small_data(self):
+        """Test: Mediana exacta mientras no se compacta"""
+        sketch = QuantileSketch()
+        data = np.array([5.0, 1.0, 4.0, 2.0])
+        sketch.update(data)
+
+        assert sketch.quantile(0.5) == np.median(data)
+
+    def test_approximate_quantiles(self, values):
+        """Test: Error de rango acotado en datos grandes"""
+        sketch = QuantileSketch()
+        for chunk in np.array_split(values, 20):
+            sketch.update(chunk)
+
+        sorted_values = np.sort(values)
+        for q in (0.1, 0.5, 0.9):
+            rank = np.searchsorted(sorted_values, sketch.quantile(q)) / len(values)
+            assert abs(rank - q) < 0.03
+
+    def test_merge(self, values):
+        """Test: Sketches combinados aproximan al conjunto completo"""
+        left, right = QuantileSketch(), QuantileSketch(seed=1)
+        left.update(values[:10000])
+        right.update(values[10000:])
+        left.merge(right)
+
+        rank = np.searchsorted(np.sort(values), left.quantile(0.5)) / len(values)
+        assert left.count == len(values)
+        assert abs(rank - 0.5) < 0.03
+
+class TestStatisticsAccumulator:
+
+    def test_matches_pandas_on_small_data(self):
+        """Test: Coincide con pandas en datasets chicos"""
+        df = pd.DataFrame({'a': [1, 2, 3, 10], 'b': [0.5, 0.25, 0.0, 1.0]})
+        stats = StatisticsAccumulator(['a', 'b'])
+        stats.update(df.iloc[:2])
+        stats.update(df.iloc[2:])
+
+        assert stats.rows == 4
+        for col in ('a', 'b'):
+            assert np.isclose(stats.mean(col), df[col].mean())
+            assert np.isclose(stats.std(col), df[col].std())
+            assert stats.median(col) == df[col].median()
+
+    def test_replace_rows(self):
+        """Test: Reemplazo de filas modificadas"""
+        df = pd.DataFrame({'a': [1.0, 2.0, 3.0, 4.0]})
+        stats = StatisticsAccumulator(['a'])
+        stats.update(df)
+
+        updated = df.copy()
+        updated.loc[1, 'a'] = 20.0
+        stats.replace(df.iloc[[1]], updated.iloc[[1]], updated)
+
+        assert np.isclose(stats.mean('a'), updated['a'].mean())
+        assert np.isclose(stats.std('a'), updated['a'].std())
+        assert stats.median('a') == updated['a'].median()